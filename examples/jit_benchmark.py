@@ -0,0 +1,81 @@
+"""Formula kernel backend benchmark
+
+Compares the NumPy and numba (see :mod:`ultrafast.jit`) formula kernel
+backends for the refractive index and GVD of representative dispersion
+formulas:
+
+	python jit_benchmark.py [points] [repeats]
+
+Compilation happens on first use, and is excluded from the timings.
+
+This file is part of ultrafast. ultrafast is free software: you can
+redistribute it and/or modify it under the terms of the GNU General Public
+License as published by the Free Software Foundation, either version 3 of the
+License, or any later version. ultrafast is distributed in the hope that it
+will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty
+of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General
+Public License for more details. You should have received a copy of the GNU
+General Public License along with ultrafast. If not, see
+<http://www.gnu.org/licenses/>.
+
+Copyright © 2016 Marcelo J P Alcocer
+"""
+
+import os
+import sys
+import tempfile
+from timeit import repeat
+import numpy
+import ultrafast
+import ultrafast.jit
+
+entries = {
+	1: "0 0.6961663 0.0684043 0.4079426 0.1162414 0.8974794 9.896161",
+	2: (
+		"0 1.03961212 0.00600069867 0.231792344 0.0200179144 1.01046945 "
+		"103.560653"
+	),
+	4: "2.7359 0.01878 0 0.01822 1 0 0 0 0 -0.01471 2 0.0006081 4",
+	7: "1.4 0.01 0.001 -0.002 0.0001",
+	9: "2.1 0.02 0.01 0.3 0.2 0.5",
+}
+"""Benchmark coefficients, keyed by formula number"""
+
+
+def material(directory, formula):
+	"""Benchmark material of a formula"""
+	path = os.path.join(directory, "formula{}.yml".format(formula))
+	with open(path, "w") as file:
+		file.write(
+			"DATA:\n  - type: formula {}\n    range: 0.4 1.5\n"
+			"    coefficients: {}\n".format(formula, entries[formula])
+		)
+	return(ultrafast.RIIDMaterial(path))
+
+
+def main(points=1000000, repeats=5):
+	print("numba available: {}".format(ultrafast.jit.available))
+	print("{:>8} {:>12} {:>12} {:>12} {:>8}".format(
+		"formula", "quantity", "numpy (ms)", "numba (ms)", "speedup"
+	))
+	with tempfile.TemporaryDirectory() as directory:
+		for formula in entries:
+			mat = material(directory, formula)
+			omega = numpy.linspace(*mat.range_, points)[points // 100:-points // 100]
+			for quantity in ("n", "gvd"):
+				function = getattr(mat, quantity)
+				timings = {}
+				for backend in ("numpy", "numba"):
+					ultrafast.jit.use(backend, mat)
+					function(omega)
+					timings[backend] = 1e3 * min(repeat(
+						lambda: function(omega), number=1, repeat=repeats
+					))
+				print("{:>8} {:>12} {:>12.2f} {:>12.2f} {:>7.1f}x".format(
+					formula, quantity, timings["numpy"], timings["numba"],
+					timings["numpy"] / timings["numba"]
+				))
+
+
+if __name__ == "__main__":
+	main(*(int(x) for x in sys.argv[1:]))
@@ -0,0 +1,67 @@
+"""Thin-film stack benchmark
+
+Measures the evaluation time of the amplitude coefficients (see
+:meth:`ultrafast.multilayer.Stack.amplitudes`) of a quarter-wave mirror (two
+distinct layers, repeated) and of a chirped mirror (all layer thicknesses
+distinct) on a large frequency grid:
+
+	python multilayer_benchmark.py [points] [layers] [repeats]
+
+Refractive indices are cached by the stack, and excluded from the timings.
+Periodic stacks cost one sine and cosine per distinct layer, such that the
+quarter-wave mirror is dominated by the characteristic matrix products and
+the chirped mirror by the trigonometric functions. On a single core, 10^5
+frequencies and 200 layers take about 0.1 s (quarter-wave) and 0.6 s (chirped).
+
+This file is part of ultrafast. ultrafast is free software: you can
+redistribute it and/or modify it under the terms of the GNU General Public
+License as published by the Free Software Foundation, either version 3 of the
+License, or any later version. ultrafast is distributed in the hope that it
+will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty
+of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General
+Public License for more details. You should have received a copy of the GNU
+General Public License along with ultrafast. If not, see
+<http://www.gnu.org/licenses/>.
+
+Copyright © 2016 Marcelo J P Alcocer
+"""
+
+import sys
+from timeit import repeat
+import numpy
+import ultrafast
+import ultrafast.multilayer
+
+range_ = (ultrafast.frequency(2), ultrafast.frequency(0.2))
+"""Benchmark material frequency range"""
+
+
+def constant(n):
+	"""Non-dispersive benchmark material"""
+	return(ultrafast.Material(lambda omega: n + 0 * omega, range_))
+
+
+def main(points=100000, layers=200, repeats=5):
+	high, low = constant(2.3), constant(1.45)
+	materials = [high, low] * (layers // 2)
+	quarter = numpy.array([0.8 / (4 * layer.n(1)) for layer in materials])
+	stack = ultrafast.multilayer.Stack(
+		materials, quarter, constant(1.5), incident=constant(1.0)
+	)
+	omega = ultrafast.frequency(numpy.linspace(0.6, 1.0, points))
+	print("points: {}, layers: {}".format(points, len(materials)))
+	print("{:>12} {:>10}".format("stack", "time (ms)"))
+	for name, thicknesses in (
+		("quarter-wave", quarter),
+		("chirped", quarter * numpy.linspace(0.8, 1.2, len(materials)))
+	):
+		stack.thicknesses = thicknesses
+		stack.amplitudes(omega)
+		timing = 1e3 * min(repeat(
+			lambda: stack.amplitudes(omega), number=1, repeat=repeats
+		))
+		print("{:>12} {:>10.1f}".format(name, timing))
+
+
+if __name__ == "__main__":
+	main(*(int(x) for x in sys.argv[1:]))
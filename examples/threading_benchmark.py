@@ -0,0 +1,90 @@
+"""Concurrent material evaluation benchmark
+
+Measures the throughput of the refractive index and GVD of a frozen material
+(see :meth:`ultrafast.core.Material.freeze`) shared between an increasing
+number of threads, each evaluating large frequency grids:
+
+	python threading_benchmark.py [points] [repeats] [backend]
+
+Evaluation spends its time in GIL releasing NumPy (or numba, see
+:mod:`ultrafast.jit`) kernels, such that throughput scales with the number of
+cores until memory bandwidth is saturated.
+
+This file is part of ultrafast. ultrafast is free software: you can
+redistribute it and/or modify it under the terms of the GNU General Public
+License as published by the Free Software Foundation, either version 3 of the
+License, or any later version. ultrafast is distributed in the hope that it
+will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty
+of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General
+Public License for more details. You should have received a copy of the GNU
+General Public License along with ultrafast. If not, see
+<http://www.gnu.org/licenses/>.
+
+Copyright © 2016 Marcelo J P Alcocer
+"""
+
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+import numpy
+import ultrafast
+import ultrafast.jit
+
+bk7 = ultrafast.RIIDMaterial.from_entry({"DATA": [{
+	"type": "formula 2",
+	"range": "0.3 2.5",
+	"coefficients": (
+		"0 1.03961212 0.00600069867 0.231792344 0.0200179144 1.01046945 "
+		"103.560653"
+	)
+}]}, name="BK7")
+"""Benchmark material (Schott catalogue coefficients)"""
+
+
+def counts():
+	"""Thread counts (powers of 2 up to the number of cores)"""
+	cores = os.cpu_count() or 1
+	result = [1]
+	while(result[-1] * 2 < cores):
+		result.append(result[-1] * 2)
+	if(result[-1] != cores):
+		result.append(cores)
+	return(result)
+
+
+def main(points=1000000, repeats=3, backend="numpy"):
+	ultrafast.jit.use(backend, bk7)
+	frozen = bk7.freeze()
+	omega = numpy.linspace(*frozen.range_, points)[points // 100:-points // 100]
+	threads = counts()
+	tasks = 4 * threads[-1]
+	print("cores: {}, backend: {}".format(os.cpu_count(), backend))
+	print("{:>8} {:>8} {:>16} {:>8} {:>10}".format(
+		"quantity", "threads", "throughput (M/s)", "speedup", "efficiency"
+	))
+	for quantity in ("n", "gvd"):
+		function = getattr(frozen, quantity)
+		function(omega)
+		reference = None
+		for count in threads:
+			with ThreadPoolExecutor(count) as executor:
+				timings = []
+				for _ in range(repeats):
+					start = perf_counter()
+					list(executor.map(lambda _: function(omega), range(tasks)))
+					timings.append(perf_counter() - start)
+			throughput = tasks * omega.size / min(timings)
+			if(reference is None):
+				reference = throughput
+			print("{:>8} {:>8} {:>16.1f} {:>7.2f}x {:>9.0%}".format(
+				quantity, count, throughput / 1e6, throughput / reference,
+				throughput / (reference * count)
+			))
+
+
+if __name__ == "__main__":
+	main(
+		*(int(x) for x in sys.argv[1:3]),
+		*sys.argv[3:4]
+	)
@@ -1,6 +1,6 @@
 #!/usr/bin/env python
 
-from distutils.core import setup
+from setuptools import setup
 
 setup(
 	name="ultrafast",
@@ -10,6 +10,13 @@ setup(
 	author_email="marcelo.j.p.alcocer@gmail.com",
 	url="https://github.com/marceloalcocer/ultrafast",
 	packages=["ultrafast"],
-	requires=["pyyaml", "scipy"],
-	provides=["ultrafast"]
+	requires=["pyyaml", "scipy", "numpy"],
+	install_requires=["pyyaml", "scipy", "numpy"],
+	extras_require={"hdf5": ["h5py"], "jit": ["numba"]},
+	provides=["ultrafast"],
+	entry_points={
+		"console_scripts": [
+			"ultrafast-dispersion = ultrafast.cli:main",
+		],
+	}
 )
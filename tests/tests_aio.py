@@ -0,0 +1,176 @@
+"""Tests for aio functionality"""
+
+import unittest
+import ultrafast
+import ultrafast.aio
+import ultrafast.registry
+import asyncio
+import http.server
+import os
+import tempfile
+import threading
+import time
+import urllib.error
+
+entry = (
+	"DATA:\n  - type: formula 1\n    range: 0.21 6.7\n"
+	"    coefficients: 0 0.6961663 0.0684043 0.4079426 0.1162414 "
+	"0.8974794 9.896161\n"
+)
+
+
+class Handler(http.server.BaseHTTPRequestHandler):
+	'''Database stand-in, serving any path ending in .yml after a delay'''
+
+	delay = 0.05
+	requests = []
+	active = 0
+	peak = 0
+	lock = threading.Lock()
+
+	def do_GET(self):
+		cls = type(self)
+		with cls.lock:
+			cls.requests.append(self.path)
+			cls.active += 1
+			cls.peak = max(cls.peak, cls.active)
+		parts = self.path.split("/")
+		time.sleep(float(parts[1]) if len(parts) > 2 else cls.delay)
+		with cls.lock:
+			cls.active -= 1
+		if(not self.path.endswith(".yml")):
+			self.send_error(404)
+			return
+		body = entry.encode()
+		self.send_response(200)
+		self.send_header("Content-Length", str(len(body)))
+		self.end_headers()
+		self.wfile.write(body)
+
+	def log_message(self, *args):
+		pass
+
+
+class TestAioLoader(unittest.TestCase):
+
+	@classmethod
+	def setUpClass(cls):
+		'''Start local HTTP server'''
+		cls.server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+		cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+		cls.thread.start()
+		cls.url = "http://127.0.0.1:{}".format(cls.server.server_address[1])
+
+	@classmethod
+	def tearDownClass(cls):
+		cls.server.shutdown()
+		cls.server.server_close()
+
+	def setUp(self):
+		ultrafast.registry.clear()
+		Handler.requests = []
+		Handler.peak = 0
+
+	def test_dedupe(self):
+		'''Test concurrent requests share loads'''
+
+		url = self.url + "/FusedSilica.yml"
+
+		async def main():
+			loader = ultrafast.aio.Loader()
+			return(await loader.gather([url] * 50))
+
+		materials = asyncio.run(main())
+		self.assertEqual(len(Handler.requests), 1)
+		self.assertTrue(all(material is materials[0] for material in materials))
+		self.assertIsInstance(materials[0], ultrafast.RIIDMaterial)
+		self.assertIs(ultrafast.registry.get(url), materials[0])
+		self.assertAlmostEqual(
+			materials[0].n(ultrafast.frequency(0.5876)), 1.4585, 4
+		)
+
+		# Registered materials are not fetched again
+		self.assertIs(asyncio.run(ultrafast.aio.load(url)), materials[0])
+		self.assertEqual(len(Handler.requests), 1)
+
+	def test_limit(self):
+		'''Test concurrency limit'''
+
+		urls = [self.url + "/{}.yml".format(i) for i in range(12)]
+
+		async def main():
+			loader = ultrafast.aio.Loader(limit=3)
+
+			# Event loop not blocked by loads
+			ticks = 0
+			task = asyncio.ensure_future(loader.gather(urls))
+			while(not task.done()):
+				await asyncio.sleep(0.01)
+				ticks += 1
+			self.assertGreater(ticks, 5)
+			return(task.result())
+
+		materials = asyncio.run(main())
+		self.assertEqual(len(set(map(id, materials))), 12)
+		self.assertEqual(len(Handler.requests), 12)
+		self.assertLessEqual(Handler.peak, 3)
+
+	def test_timeout(self):
+		'''Test timeout and cancellation'''
+
+		url = self.url + "/0.5/Slow.yml"
+
+		async def main():
+			loader = ultrafast.aio.Loader()
+			first = asyncio.ensure_future(loader.get(url))
+			await asyncio.sleep(0.05)
+			with self.assertRaises(asyncio.TimeoutError):
+				await loader.get(url, timeout=0.05)
+			first.cancel()
+			with self.assertRaises(asyncio.CancelledError):
+				await first
+
+			# Load continues for other requests
+			return(await loader.get(url, timeout=5))
+
+		self.assertIsInstance(asyncio.run(main()), ultrafast.RIIDMaterial)
+		self.assertEqual(len(Handler.requests), 1)
+
+	def test_sync(self):
+		'''Test synchronous load completing during an asynchronous load'''
+
+		url = self.url + "/0.2/Shared.yml"
+		results = []
+		thread = threading.Thread(
+			target=lambda: results.append(ultrafast.registry.get(url))
+		)
+
+		async def main():
+			task = asyncio.ensure_future(ultrafast.aio.load(url))
+			thread.start()
+			return(await task)
+
+		material = asyncio.run(main())
+		thread.join()
+		self.assertIs(results[0], material)
+		self.assertIs(ultrafast.registry.get(url), material)
+
+	def test_errors(self):
+		'''Test failed and local loads'''
+
+		async def main(source):
+			return(await ultrafast.aio.load(source))
+
+		with self.assertRaises(urllib.error.HTTPError):
+			asyncio.run(main(self.url + "/Missing.txt"))
+		with tempfile.TemporaryDirectory() as directory:
+			path = os.path.join(directory, "FusedSilica.yml")
+			with open(path, "w") as file:
+				file.write(entry)
+			material = asyncio.run(main(path))
+			self.assertEqual(material.formula, 1)
+			self.assertIs(ultrafast.registry.get(path), material)
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,73 @@
+"""Tests for atmosphere functionality"""
+
+import unittest
+import ultrafast
+import ultrafast.atmosphere
+import numpy
+
+
+class TestAtmosphere(unittest.TestCase):
+
+	def setUp(self):
+		'''Instantiate test grid'''
+		self.omega = ultrafast.frequency(numpy.linspace(0.4, 1.6, 50))
+
+	def test_standard_air(self):
+		'''Test standard air'''
+
+		# Equal to standard air RIID entry
+		numpy.testing.assert_allclose(
+			ultrafast.atmosphere.ciddor().n(self.omega),
+			ultrafast.RIIDMaterial("../examples/Ciddor.yml").n(self.omega),
+			rtol=1e-12
+		)
+
+	def test_refractive_index(self):
+		'''Test moist air refractive index'''
+
+		# Reference value (633 nm, 20 °C, 101325 Pa, 50% RH, 450 ppm)
+		self.assertAlmostEqual(
+			ultrafast.atmosphere.refractive_index(
+				ultrafast.frequency(0.633), 20, 101325, 0.5, 450
+			) - 1,
+			2.71373e-4,
+			delta=2e-9
+		)
+
+		# Decreasing with temperature and humidity, increasing with pressure
+		omega = ultrafast.frequency(0.8)
+		n = ultrafast.atmosphere.refractive_index
+		self.assertLess(n(omega, temperature=25), n(omega, temperature=15))
+		self.assertLess(n(omega, humidity=0.8), n(omega, humidity=0))
+		self.assertGreater(n(omega, pressure=102000), n(omega, pressure=101000))
+
+	def test_ciddor(self):
+		'''Test air material factory'''
+
+		# Cached instances
+		self.assertIs(
+			ultrafast.atmosphere.ciddor(21, 100000, 0.4),
+			ultrafast.atmosphere.ciddor(21.0, 100000.0, 0.4)
+		)
+
+		# Broadcast conditions
+		temperature = numpy.linspace(18, 24, 7)[:, None]
+		humidity = numpy.linspace(0.2, 0.6, 7)[:, None]
+		air = ultrafast.atmosphere.ciddor(temperature, humidity=humidity)
+		n = air.n(self.omega)
+		self.assertEqual(n.shape, (7, 50))
+		numpy.testing.assert_allclose(
+			n[3],
+			ultrafast.atmosphere.ciddor(21.0, humidity=0.4).n(self.omega)
+		)
+
+		# Fail on frequency out of range
+		self.assertRaises(
+			ultrafast.RangeError,
+			air.n,
+			ultrafast.frequency(2)
+		)
+
+
+if __name__ == "__main__":
+	unittest.main()
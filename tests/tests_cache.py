@@ -0,0 +1,109 @@
+"""Tests for cache functionality"""
+
+import unittest
+import ultrafast
+import ultrafast.cache
+import numpy
+import os
+import tempfile
+
+
+class TestDiskCache(unittest.TestCase):
+
+	def setUp(self):
+		'''Write test database entry (fused silica) and create cache'''
+
+		self.directory = tempfile.TemporaryDirectory()
+		path = os.path.join(self.directory.name, "FusedSilica.yml")
+		with open(path, "w") as file:
+			file.write(
+				"DATA:\n  - type: formula 1\n    range: 0.21 6.7\n"
+				"    coefficients: 0 0.6961663 0.0684043 0.4079426 0.1162414 "
+				"0.8974794 9.896161\n"
+			)
+		self.path = path
+		self.mat = ultrafast.RIIDMaterial(path)
+		self.omega = ultrafast.frequency(numpy.linspace(0.4, 1.6, 101))
+		self.cache = ultrafast.cache.DiskCache(
+			os.path.join(self.directory.name, "cache")
+		)
+
+	def tearDown(self):
+		'''Remove test database entry and cache'''
+		self.directory.cleanup()
+
+	def test_evaluate(self):
+		'''Test cached evaluation'''
+
+		for quantity in ultrafast.cache.quantities:
+			expected = getattr(self.mat, quantity)(self.omega)
+			numpy.testing.assert_array_equal(
+				self.cache.evaluate(self.mat, quantity, self.omega), expected
+			)
+
+			# Hits are read-only memory maps
+			values = self.cache.evaluate(self.mat, quantity, self.omega)
+			self.assertIsInstance(values, numpy.memmap)
+			self.assertFalse(values.flags.writeable)
+			numpy.testing.assert_array_equal(values, expected)
+		self.assertEqual(
+			len(self.cache.entries()), len(ultrafast.cache.quantities)
+		)
+
+		with self.assertRaises(ultrafast.UltrafastError):
+			self.cache.evaluate(self.mat, "phase", self.omega)
+
+	def test_key(self):
+		'''Test key stability'''
+
+		key = self.cache.key(self.mat, "n", self.omega)
+
+		# Equal definitions (e.g. across sessions)
+		self.assertEqual(
+			self.cache.key(ultrafast.RIIDMaterial(self.path), "n", self.omega), key
+		)
+
+		# Quantity, grid and coefficients
+		self.assertNotEqual(self.cache.key(self.mat, "gvd", self.omega), key)
+		self.assertNotEqual(self.cache.key(self.mat, "n", self.omega[1:]), key)
+		self.assertNotEqual(
+			self.cache.key(self.mat, "n", self.omega.astype(numpy.float32)), key
+		)
+		self.mat.coefficients = self.mat.coefficients * 1.01
+		self.assertNotEqual(self.cache.key(self.mat, "n", self.omega), key)
+
+		# Unknown definition
+		material = ultrafast.Material(lambda omega: 1.5 + 0 * omega, (1, 5))
+		self.assertIsNone(self.cache.key(material, "n", self.omega))
+		self.assertIsNotNone(self.cache.key(material, "n", self.omega, "n=1.5"))
+		values = self.cache.evaluate(material, "n", self.omega)
+		self.assertNotIsInstance(values, numpy.memmap)
+		self.assertEqual(len(self.cache.entries()), 0)
+
+	def test_evict(self):
+		'''Test least recently used eviction'''
+
+		keys = []
+		for i, quantity in enumerate(("n", "group_index", "gvd")):
+			self.cache.evaluate(self.mat, quantity, self.omega)
+			keys.append(self.cache.key(self.mat, quantity, self.omega))
+			os.utime(self.cache._path(keys[-1]), (i, i))
+
+		# Use first result
+		self.cache.load(keys[0])
+		size = sum(entry[1] for entry in self.cache.entries())
+		self.cache.evict(size - 1)
+		self.assertEqual(
+			sorted(entry[0] for entry in self.cache.entries()),
+			sorted((keys[0], keys[2]))
+		)
+		self.assertIsNone(self.cache.load(keys[1]))
+
+		# Size bound on store
+		self.cache.size = 0
+		self.cache.evaluate(self.mat, "tod", self.omega)
+		self.assertEqual(self.cache.entries(), [])
+
+
+if __name__ == '__main__':
+	unittest.main()
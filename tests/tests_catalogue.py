@@ -0,0 +1,183 @@
+"""Tests for catalogue functionality"""
+
+import unittest
+import numpy
+import ultrafast
+import ultrafast.catalogue
+import os
+import tempfile
+
+glasses = {
+	"fused silica": (
+		"formula 1", "0.21 6.7",
+		"0 0.6961663 0.0684043 0.4079426 0.1162414 0.8974794 9.896161"
+	),
+	"BK7": (
+		"formula 2", "0.3 2.5",
+		"0 1.03961212 0.00600069867 0.231792344 0.0200179144 1.01046945 "
+		"103.560653"
+	),
+	"SF10": (
+		"formula 2", "0.38 2.5",
+		"0 1.62153902 0.0122241457 0.256287842 0.0595736775 1.64447552 "
+		"147.468793"
+	),
+}
+"""Test glasses (Malitson and Schott catalogue coefficients)"""
+
+
+class TestCatalogueIndex(unittest.TestCase):
+
+	def setUp(self):
+		'''Write test database entries and instantiate index'''
+
+		self.directory = tempfile.TemporaryDirectory()
+		self.paths = {}
+		for name, (type_, range_, coefficients) in glasses.items():
+			path = os.path.join(self.directory.name, name + ".yml")
+			with open(path, "w") as file:
+				file.write(
+					"DATA:\n  - type: {}\n    range: {}\n    coefficients: {}\n".format(
+						type_, range_, coefficients
+					)
+				)
+			self.paths[name] = path
+		self.index = ultrafast.catalogue.Index(self.paths)
+
+	def tearDown(self):
+		'''Remove test database entries'''
+		self.directory.cleanup()
+
+	def test_values(self):
+		'''Test precomputed quantities'''
+
+		values = dict(zip(self.index.keys, self.index.values("n", 0.5875618)))
+		self.assertAlmostEqual(values["BK7"], 1.5168, places=4)
+
+		values = dict(zip(self.index.keys, self.index.values("abbe")))
+		self.assertAlmostEqual(values["BK7"], 64.17, places=1)
+		self.assertAlmostEqual(values["fused silica"], 67.8, places=1)
+
+		values = dict(zip(self.index.keys, self.index.values("zero_gvd")))
+		self.assertAlmostEqual(values["fused silica"], 1.27, places=2)
+
+		values = dict(zip(self.index.keys, self.index.values("gvd", 0.8)))
+		self.assertAlmostEqual(values["fused silica"], 0.0362, places=3)
+
+		# Outside range
+		values = dict(zip(self.index.keys, self.index.values("n", 0.25)))
+		self.assertNotEqual(values["BK7"], values["BK7"])
+
+		# Fail on unknown quantity
+		self.assertRaises(
+			ultrafast.UltrafastError,
+			self.index.values,
+			"foo"
+		)
+
+	def test_query(self):
+		'''Test range query'''
+
+		self.assertEqual(
+			self.index.query(0.8, n=(1.7, None)),
+			["SF10"]
+		)
+		self.assertEqual(
+			sorted(self.index.query(0.8, gvd=(None, 0.05), abbe=(60, None))),
+			["BK7", "fused silica"]
+		)
+		self.assertEqual(self.index.query(0.25, n=(None, None)), ["fused silica"])
+
+	def test_nearest(self):
+		'''Test nearest-neighbour query'''
+
+		self.assertEqual(self.index.nearest(0.8, n=1.5), ["BK7"])
+		self.assertEqual(
+			self.index.nearest(0.8, k=5, gvd=0.0),
+			["fused silica", "BK7", "SF10"]
+		)
+
+	def test_poles(self):
+		'''Test entries with poles within range'''
+
+		# Fused silica up to 20 um (Sellmeier pole at 9.896 um)
+		infrared = ultrafast.RIIDMaterial.from_entry({"DATA": [{
+			"type": "formula 1",
+			"range": "0.3 20",
+			"coefficients": glasses["fused silica"][2]
+		}]})
+		self.assertEqual(len(infrared.validity), 2)
+		self.index.add("infrared", infrared)
+		self.assertEqual(
+			sorted(self.index.query(0.8, n=(1.0, None))),
+			["BK7", "SF10", "fused silica", "infrared"]
+		)
+		values = dict(zip(self.index.keys, self.index.values("n", 12.0)))
+		self.assertAlmostEqual(values["infrared"], infrared.n(
+			ultrafast.frequency(12.0)
+		), places=3)
+		values = dict(zip(self.index.keys, self.index.values("n", 9.0)))
+		self.assertNotEqual(values["infrared"], values["infrared"])
+
+		# Entries invalid everywhere match no query
+		infrared.n = lambda omega: float("nan") + omega
+		self.assertEqual(infrared.validity, [])
+		self.assertNotIn("infrared", self.index.query(0.8, n=(None, None)))
+
+	def test_incremental(self):
+		'''Test incremental rebuild'''
+
+		self.index.keys
+		calls = []
+
+		def n(omega):
+			calls.append(omega)
+			return(1.9 + 0 * omega)
+
+		self.index.add("dummy", ultrafast.Material(n, (1, 5)))
+		self.assertEqual(self.index.query(0.8, n=(1.8, None)), ["dummy"])
+		self.assertEqual(len(self.index), 4)
+		evaluations = len(calls)
+		self.index.query(0.8, n=(1.8, None))
+		self.assertEqual(len(calls), evaluations)
+
+		# Material modification detected
+		self.index["dummy"].n = lambda omega: 1.5 + 0 * omega
+		self.assertEqual(self.index.query(0.8, n=(1.8, None)), [])
+
+		self.index.remove("dummy")
+		self.assertNotIn("dummy", self.index)
+		self.assertEqual(self.index.query(0.8, n=(1.8, None)), [])
+
+	def test_failures(self):
+		'''Test indexing of entries failing to load'''
+
+		path = os.path.join(self.directory.name, "malformed.yml")
+		with open(path, "w") as file:
+			file.write("DATA: [\n")
+		self.index.add("malformed", path)
+		self.index.add(
+			"missing", os.path.join(self.directory.name, "missing.yml")
+		)
+		self.index.add("invalid", os.path.join(
+			os.path.dirname(__file__), "..", "examples", "BadFormula.yml"
+		))
+		self.assertEqual(len(self.index.keys), 6)
+		self.assertEqual(
+			self.index.query(0.8, n=(None, None)), ["fused silica", "BK7", "SF10"]
+		)
+		self.assertTrue(numpy.isnan(self.index.values("n", 0.8)[3:]).all())
+
+		# Failed loads retried on update
+		with open(path, "w") as file:
+			file.write(
+				"DATA:\n  - type: {}\n    range: {}\n    coefficients: {}\n".format(
+					*glasses["BK7"]
+				)
+			)
+		self.index.update("malformed")
+		self.assertIn("malformed", self.index.query(0.8, n=(None, None)))
+
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,179 @@
+"""Tests for command line functionality"""
+
+import unittest
+import ultrafast
+import ultrafast.cli
+import numpy
+import os
+import tempfile
+
+try:
+	import h5py
+except ImportError:
+	h5py = None
+
+
+class TestCLI(unittest.TestCase):
+
+	def setUp(self):
+		'''Create output directory'''
+
+		self.directory = tempfile.TemporaryDirectory()
+		self.source = "../examples/Ciddor.yml"
+		self.mat = ultrafast.RIIDMaterial(self.source)
+		self.omega = ultrafast.frequency(numpy.linspace(0.4, 1.6, 101))
+
+	def tearDown(self):
+		'''Remove output directory'''
+		self.directory.cleanup()
+
+	def output(self, ext):
+		'''Output path template'''
+		return(os.path.join(self.directory.name, "{name}." + ext))
+
+	def test_grid(self):
+		'''Test chunked grid generator'''
+
+		chunks = list(ultrafast.cli.grid(0.4, 1.6, 101, 16))
+		self.assertEqual(len(chunks), 7)
+		numpy.testing.assert_allclose(
+			numpy.concatenate(chunks),
+			numpy.linspace(0.4, 1.6, 101)
+		)
+
+	def test_npy(self):
+		'''Test .npy output'''
+
+		status = ultrafast.cli.main([
+			self.source, "--wavelength", "0.4", "1.6", "101",
+			"--chunk", "16", "--output", self.output("npy")
+		])
+		self.assertEqual(status, 0)
+		table = numpy.load(os.path.join(self.directory.name, "Ciddor.npy"))
+		numpy.testing.assert_allclose(
+			table,
+			ultrafast.cli.table(self.mat, self.omega)
+		)
+
+	def test_csv(self):
+		'''Test CSV output'''
+
+		copy = os.path.join(self.directory.name, "Copy.yml")
+		with open(self.source) as source, open(copy, "w") as file:
+			file.write(source.read())
+		status = ultrafast.cli.main([
+			self.source, copy, "--frequency", "1.2", "4.7", "50",
+			"--format", "csv", "--output",
+			os.path.join(self.directory.name, "{name}-{ext}.txt"),
+			"--jobs", "1"
+		])
+		self.assertEqual(status, 0)
+		table = numpy.loadtxt(
+			os.path.join(self.directory.name, "Ciddor-csv.txt"),
+			delimiter=","
+		)
+		self.assertEqual(table.shape, (50, len(ultrafast.cli.columns)))
+		numpy.testing.assert_allclose(
+			table[:, 2],
+			self.mat.n(numpy.linspace(1.2, 4.7, 50))
+		)
+		numpy.testing.assert_array_equal(table, numpy.loadtxt(
+			os.path.join(self.directory.name, "Copy-csv.txt"), delimiter=","
+		))
+
+	def test_range(self):
+		'''Test full declared range (derivative stencils past range edges)'''
+
+		path = os.path.join(self.directory.name, "Ciddor.csv")
+		status = ultrafast.cli.main([
+			self.source, "--wavelength", "0.23", "1.69", "100",
+			"--format", "csv", "--output", path
+		])
+		self.assertEqual(status, 0)
+		table = numpy.loadtxt(path, delimiter=",")
+		self.assertTrue(numpy.isfinite(table[:, :3]).all())
+		for column in (3, 4, 5):
+			self.assertTrue(numpy.isnan(table[[0, -1], column]).all())
+			self.assertTrue(numpy.isfinite(table[1:-1, column]).all())
+		numpy.testing.assert_allclose(
+			table[1:-1, 4], self.mat.gvd(table[1:-1, 0])
+		)
+
+		# Fail outside range
+		self.assertEqual(
+			ultrafast.cli.main([
+				self.source, "--wavelength", "0.2", "1.69", "100",
+				"--output", self.output("npy")
+			]),
+			1
+		)
+
+	@unittest.skipIf(h5py is None, "h5py not installed")
+	def test_hdf5(self):
+		'''Test HDF5 output'''
+
+		status = ultrafast.cli.main([
+			self.source, "--wavelength", "0.4", "1.6", "101",
+			"--format", "hdf5", "--output", self.output("h5")
+		])
+		self.assertEqual(status, 0)
+		with h5py.File(os.path.join(self.directory.name, "Ciddor.h5")) as file:
+			numpy.testing.assert_allclose(
+				file["dispersion"][:, 2],
+				self.mat.n(self.omega)
+			)
+
+	def test_errors(self):
+		'''Test error handling'''
+
+		# Standard output requires CSV
+		self.assertEqual(
+			ultrafast.cli.main([
+				self.source, "--wavelength", "0.4", "1.6", "11", "--output", "-"
+			]),
+			2
+		)
+
+		# Sources resolving to the same output path
+		self.assertEqual(
+			ultrafast.cli.main([
+				self.source, "./" + self.source, "--wavelength", "0.4", "1.6",
+				"11", "--output", self.output("npy")
+			]),
+			2
+		)
+
+		# Bad database entry
+		self.assertEqual(
+			ultrafast.cli.main([
+				"../examples/BadFormula.yml", "--wavelength", "0.4", "1.6", "11",
+				"--output", self.output("npy")
+			]),
+			1
+		)
+
+		# Invalid number of points
+		for num in ("-5", "0", "2.5"):
+			self.assertEqual(
+				ultrafast.cli.main([
+					self.source, "--wavelength", "0.4", "1.6", num,
+					"--output", self.output("npy")
+				]),
+				2
+			)
+
+		# Malformed database entry
+		path = os.path.join(self.directory.name, "Malformed.yml")
+		with open(path, "w") as file:
+			file.write("DATA: [\n")
+		self.assertEqual(
+			ultrafast.cli.main([
+				path, "--wavelength", "0.4", "1.6", "11",
+				"--output", self.output("npy")
+			]),
+			1
+		)
+
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,154 @@
+"""Tests for compensation functionality"""
+
+import unittest
+import ultrafast
+import ultrafast.catalogue
+import ultrafast.compensation
+import numpy
+
+glasses = {
+	"fused silica": (
+		"formula 1", "0.21 6.7",
+		"0 0.6961663 0.0684043 0.4079426 0.1162414 0.8974794 9.896161"
+	),
+	"BK7": (
+		"formula 2", "0.3 2.5",
+		"0 1.03961212 0.00600069867 0.231792344 0.0200179144 1.01046945 "
+		"103.560653"
+	),
+	"SF10": (
+		"formula 2", "0.38 2.5",
+		"0 1.62153902 0.0122241457 0.256287842 0.0595736775 1.64447552 "
+		"147.468793"
+	),
+	"CaF2": (
+		"formula 1", "0.23 9.7",
+		"0 0.5675888 0.050263605 0.4710914 0.1003909 3.8484723 34.649040"
+	),
+	"UV": (
+		"formula 1", "0.2 0.5",
+		"0 0.6961663 0.0684043 0.4079426 0.1162414 0.8974794 9.896161"
+	),
+}
+"""Test glasses (Malitson, Schott and Li catalogue coefficients)"""
+
+
+class TestCompensator(unittest.TestCase):
+
+	def setUp(self):
+		'''Instantiate materials and residual phase of known compensation'''
+		self.materials = {
+			name: ultrafast.RIIDMaterial.from_entry(
+				{"DATA": [{
+					"type": type_, "range": range_, "coefficients": coefficients
+				}]},
+				name=name
+			)
+			for name, (type_, range_, coefficients) in glasses.items()
+		}
+		self.omega = ultrafast.frequency(numpy.linspace(0.7, 0.9, 256))
+		self.weights = numpy.exp(-numpy.power((self.omega - 2.35) / 0.2, 2))
+		self.phase = (
+			-2000 * self.materials["BK7"].wavevector(self.omega) -
+			1000 * self.materials["SF10"].wavevector(self.omega) +
+			5 + 30 * self.omega
+		)
+		self.compensator = ultrafast.compensation.Compensator(
+			self.materials, self.omega, self.weights
+		)
+
+	def test_solve(self):
+		'''Test least squares thicknesses'''
+
+		self.assertEqual(self.compensator.skipped, ["UV"])
+		self.assertNotIn("UV", self.compensator.keys)
+		thicknesses, residual = self.compensator.solve(
+			self.phase, ["BK7", "SF10"]
+		)
+		self.assertAlmostEqual(thicknesses["BK7"], 2000, places=3)
+		self.assertAlmostEqual(thicknesses["SF10"], 1000, places=3)
+		self.assertLess(residual, 1e-6)
+
+		# Non-negative
+		thicknesses, residual = self.compensator.solve(-self.phase, ["BK7"])
+		self.assertEqual(thicknesses["BK7"], 0)
+		with self.assertRaises(ultrafast.UltrafastError):
+			self.compensator.solve(self.phase, ["UV"])
+
+	def test_empty(self):
+		'''Test search without valid candidates'''
+
+		for materials in ({"UV": self.materials["UV"]}, {}):
+			compensator = ultrafast.compensation.Compensator(
+				materials, self.omega, self.weights
+			)
+			self.assertEqual(compensator.skipped, list(materials))
+			self.assertEqual(compensator.keys, [])
+			self.assertEqual(compensator.search(self.phase, jobs=1), [])
+			thicknesses, residual = compensator.solve(self.phase, [])
+			self.assertEqual(thicknesses, {})
+			self.assertGreater(residual, 0)
+
+	def test_search(self):
+		'''Test combinatorial search'''
+
+		solutions = self.compensator.search(self.phase, size=3, results=5, jobs=1)
+		thicknesses, residual = solutions[0]
+		self.assertEqual(set(thicknesses), {"BK7", "SF10"})
+		numpy.testing.assert_allclose(
+			[thicknesses["BK7"], thicknesses["SF10"]], [2000, 1000], rtol=1e-6
+		)
+		residuals = [residual for _, residual in solutions]
+		self.assertEqual(residuals, sorted(residuals))
+
+		# Solutions agree with direct solve
+		for thicknesses, residual in solutions:
+			self.assertTrue(all(x > 0 for x in thicknesses.values()))
+			expected = self.compensator.solve(self.phase, list(thicknesses))
+			self.assertAlmostEqual(residual, expected[1], places=6)
+
+		# Parallel and beam searches
+		self.assertEqual(
+			[set(x) for x, _ in self.compensator.search(self.phase, jobs=2)],
+			[set(x) for x, _ in self.compensator.search(self.phase, jobs=1)]
+		)
+		beam = self.compensator.search(self.phase, size=3, beam=1, jobs=1)
+		self.assertEqual(set(beam[0][0]), {"BK7", "SF10"})
+
+		# Thickness limit
+		for thicknesses, _ in self.compensator.search(
+			self.phase, limit=2500, jobs=1
+		):
+			self.assertLessEqual(sum(thicknesses.values()), 2500)
+
+	def test_system(self):
+		'''Test compensating system'''
+
+		thicknesses, _ = self.compensator.search(self.phase, jobs=1)[0]
+		system = self.compensator.system(thicknesses)
+		compensated = self.phase + system.phase()
+		fit = numpy.polyval(
+			numpy.polyfit(self.omega, compensated, 1), self.omega
+		)
+		self.assertLess(numpy.abs(compensated - fit).max(), 1e-6)
+
+	def test_catalogue(self):
+		'''Test catalogue candidates and re-evaluation of modified materials'''
+
+		index = ultrafast.catalogue.Index(self.materials)
+		compensator = ultrafast.compensation.Compensator(index, self.omega)
+		self.assertEqual(set(compensator.keys), set(self.materials) - {"UV"})
+		self.assertEqual(
+			set(compensator.search(self.phase, jobs=1)[0][0]), {"BK7", "SF10"}
+		)
+
+		material = self.materials["BK7"]
+		coefficients = material.coefficients.copy()
+		coefficients[1] *= 1.01
+		material.coefficients = coefficients
+		thicknesses, _ = compensator.solve(self.phase, ["BK7", "SF10"])
+		self.assertGreater(abs(thicknesses["BK7"] - 2000), 1)
+
+
+if __name__ == '__main__':
+	unittest.main()
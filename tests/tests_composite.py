@@ -0,0 +1,205 @@
+"""Tests for composite functionality"""
+
+import unittest
+import ultrafast
+import ultrafast.composite
+import numpy
+
+
+def constant(n, range_=(1, 5)):
+	'''Non-dispersive test material'''
+	return(ultrafast.Material(lambda omega: n + 0 * omega, range_))
+
+
+class TestCompositeRelativeMaterial(unittest.TestCase):
+
+	def setUp(self):
+		'''Instantiate test materials'''
+
+		self.glass = ultrafast.Material(lambda omega: 1.5 + 0.01 * omega, (1, 5))
+		self.water = constant(1.33, (2, 6))
+		self.mat = ultrafast.composite.RelativeMaterial(self.glass, self.water)
+		self.omega = numpy.linspace(2, 5, 11)
+
+	def test_n(self):
+		'''Test relative refractive index'''
+
+		numpy.testing.assert_allclose(
+			self.mat.n(self.omega),
+			self.glass.n(self.omega) / self.water.n(self.omega)
+		)
+
+		# Default surrounding material
+		self.assertIs(
+			ultrafast.composite.RelativeMaterial(self.glass).components[1],
+			ultrafast.air
+		)
+
+	def test_range_(self):
+		'''Test range intersection'''
+
+		self.assertEqual(self.mat.range_, (2, 5))
+		self.assertRaises(ultrafast.RangeError, self.mat.n, 1.5)
+		self.assertRaises(
+			ultrafast.UltrafastError,
+			ultrafast.composite.RelativeMaterial,
+			self.glass, constant(1.33, (6, 7))
+		)
+
+	def test_version(self):
+		'''Test component modification'''
+
+		version = self.mat.version
+		self.water.n = lambda omega: 1.0 + 0 * omega
+		self.assertNotEqual(self.mat.version, version)
+		numpy.testing.assert_allclose(
+			self.mat.n(self.omega), self.glass.n(self.omega)
+		)
+
+	def test_validity(self):
+		'''Test component validity'''
+
+		# Fused silica (complex refractive index below 9.9 um pole)
+		silica = ultrafast.RIIDMaterial.from_entry({"DATA": [{
+			"type": "formula 1",
+			"range": "0.21 10",
+			"coefficients": (
+				"0 0.6961663 0.0684043 0.4079426 0.1162414 0.8974794 9.896161"
+			)
+		}]})
+		water = constant(1.33, (0.1, 10))
+		omega = ultrafast.frequency(numpy.array([9, 1]))
+		for mat in (
+			ultrafast.composite.RelativeMaterial(silica, water),
+			ultrafast.composite.Mixture((silica, water), (0.5, 0.5))
+		):
+			self.assertRaises(ultrafast.RangeError, mat.n, omega[0])
+			numpy.testing.assert_array_equal(mat.valid_mask(omega), [False, True])
+			self.assertTrue(numpy.isfinite(mat.gvd(omega[1])))
+
+		# Range follows component modification
+		water.range_ = (0.1, 2)
+		self.assertEqual(mat.range_[1], 2)
+		self.assertRaises(ultrafast.RangeError, mat.n, 3)
+
+class TestCompositeMixture(unittest.TestCase):
+
+	def setUp(self):
+		'''Instantiate test materials'''
+
+		self.high = constant(2.0)
+		self.low = constant(1.2)
+		self.omega = numpy.linspace(2, 3, 5)
+
+	def test_identical(self):
+		'''Test mixtures of identical materials'''
+
+		for model in ultrafast.composite.models:
+			mixture = ultrafast.composite.Mixture(
+				(self.high, self.high), (0.3, 0.7), model=model
+			)
+			numpy.testing.assert_allclose(mixture.n(self.omega), 2.0)
+
+	def test_models(self):
+		'''Test mixing rules'''
+
+		def mixture(fractions, model, materials=None):
+			return(ultrafast.composite.Mixture(
+				materials or (self.high, self.low), fractions, model=model
+			).n(self.omega))
+
+		# Linear
+		numpy.testing.assert_allclose(mixture((0.25, 0.75), "linear"), 1.4)
+
+		# Lorentz-Lorenz
+		a = 0.25 * 3 / 6 + 0.75 * 0.44 / 3.44
+		numpy.testing.assert_allclose(
+			mixture((0.25, 0.75), "lorentz-lorenz"),
+			numpy.sqrt((1 + 2 * a) / (1 - a))
+		)
+
+		# Maxwell-Garnett: no inclusions yields host
+		numpy.testing.assert_allclose(mixture((1, 0), "maxwell-garnett"), 2.0)
+
+		# Bruggeman: closed form satisfies the Bruggeman condition
+		epsilon = numpy.power(mixture((0.25, 0.75), "bruggeman"), 2)
+		numpy.testing.assert_allclose(
+			0.25 * (4 - epsilon) / (4 + 2 * epsilon) +
+			0.75 * (1.44 - epsilon) / (1.44 + 2 * epsilon),
+			0,
+			atol=1e-14
+		)
+
+		# Bruggeman: Newton iteration agrees with closed form
+		numpy.testing.assert_allclose(
+			mixture(
+				(0.25, 0.5, 0.25), "bruggeman", (self.high, self.low, self.low)
+			),
+			numpy.sqrt(epsilon)
+		)
+
+		# Maxwell-Garnett and Bruggeman agree for dilute inclusions
+		numpy.testing.assert_allclose(
+			mixture((0.999, 0.001), "maxwell-garnett"),
+			mixture((0.999, 0.001), "bruggeman"),
+			rtol=1e-6
+		)
+
+	def test_fractions(self):
+		'''Test volume fractions'''
+
+		mixture = ultrafast.composite.Mixture(
+			(self.high, self.low), (0.5, 0.5), model="linear"
+		)
+		version = mixture.version
+		mixture.fractions = (1, 0)
+		self.assertNotEqual(mixture.version, version)
+		numpy.testing.assert_allclose(mixture.n(self.omega), 2.0)
+
+		# Failures
+		with self.assertRaises(ultrafast.PropertySetError):
+			mixture.fractions = (0.5, 0.6)
+		with self.assertRaises(ultrafast.PropertySetError):
+			mixture.fractions = (1,)
+		self.assertRaises(
+			ultrafast.UltrafastError,
+			ultrafast.composite.Mixture,
+			(self.high, self.low), (0.5, 0.5), "unknown"
+		)
+
+
+class TestCompositeDopedMaterial(unittest.TestCase):
+
+	def setUp(self):
+		'''Instantiate test materials (Ciddor air with modified coefficients)'''
+
+		self.host = ultrafast.RIIDMaterial("../examples/Ciddor.yml")
+		self.doped = ultrafast.RIIDMaterial("../examples/Ciddor.yml")
+		coefficients = self.doped.coefficients.copy()
+		coefficients[1] *= 3
+		self.doped.coefficients = coefficients
+		self.omega = ultrafast.frequency(numpy.linspace(0.5, 1.5, 11))
+
+	def test_n(self):
+		'''Test coefficient interpolation'''
+
+		mat = ultrafast.composite.DopedMaterial(self.host, self.doped, 0)
+		numpy.testing.assert_allclose(mat.n(self.omega), self.host.n(self.omega))
+		mat.concentration = 1
+		numpy.testing.assert_allclose(mat.n(self.omega), self.doped.n(self.omega))
+
+		# Formula 6 is linear in B_1
+		mat.concentration = 0.5
+		numpy.testing.assert_allclose(
+			mat.n(self.omega),
+			(self.host.n(self.omega) + self.doped.n(self.omega)) / 2
+		)
+
+		# Failures
+		with self.assertRaises(ultrafast.PropertySetError):
+			mat.concentration = 2
+		self.assertRaises(
+			ultrafast.UltrafastError,
+			ultrafast.composite.DopedMaterial,
+			self.host, constant(1.5), 0.5
+		)
@@ -2,7 +2,10 @@
 
 import unittest
 import ultrafast
+import ultrafast.composite
 import math
+import threading
+import numpy
 from scipy.constants import speed_of_light
 
 
@@ -181,6 +184,13 @@ class TestCoreRIIDMaterial(TestCoreMaterial):
 			"../examples/BadFormula.yml"
 		)
 
+		# Fail on formula without number
+		self.assertRaises(
+			ultrafast.UltrafastError,
+			ultrafast.RIIDMaterial.from_entry,
+			{"DATA": [{"type": "formula", "range": "0.3 2.5", "coefficients": "0"}]}
+		)
+
 		# Tabulated dispersion
 		#
 		# 	Fails until tabulated dispersions are handled properly
@@ -205,6 +215,363 @@ class TestCoreRIIDMaterial(TestCoreMaterial):
 		# Comments extraction
 		self.assertIsNotNone(self.mat.comments)
 
+	def test_coefficients(self):
+		'''Test mutable coefficients'''
+
+		omega = ultrafast.frequency(0.8)
+		n = self.mat.n(omega)
+		version = self.mat.version
+
+		# Read-only view
+		with self.assertRaises(ValueError):
+			self.mat.coefficients[1] = 0
+
+		# Update picked up by dispersion function without reconstruction
+		function = self.mat.n
+		coefficients = self.mat.coefficients.copy()
+		coefficients[1] *= 2
+		self.mat.coefficients = coefficients
+		self.assertIs(self.mat.n, function)
+		self.assertNotEqual(self.mat.version, version)
+		self.assertAlmostEqual(self.mat.n(omega) - 1, 2 * (n - 1), delta=1e-4)
+
+		# Fail on number of coefficients
+		with self.assertRaises(ultrafast.PropertySetError):
+			self.mat.coefficients = coefficients[:-1]
+
+	def test_poles(self):
+		'''Test dispersion formula poles'''
+
+		# Ciddor (formula 6) poles at B_i^{-1/2}
+		poles = ultrafast.wavelength(self.mat.poles)
+		self.assertEqual(len(poles), 2)
+		self.assertAlmostEqual(poles[0], 57.362 ** -0.5, places=12)
+		self.assertAlmostEqual(poles[1], 238.0185 ** -0.5, places=12)
+		self.assertTrue((self.mat.poles > self.mat.range_[1]).all())
+
+	def test_validity(self):
+		'''Test validity analysis'''
+
+		# Well behaved material valid over whole range
+		self.assertEqual(self.mat.validity, [tuple(self.mat.range_)])
+
+		# Sellmeier pole at 1 um, complex index from 1 / sqrt(1.5) um
+		mat = ultrafast.RIIDMaterial.from_entry({"DATA": [{
+			"type": "formula 1",
+			"range": "0.4 1.5",
+			"coefficients": "0 0.5 1.0"
+		}]})
+		validity = mat.validity
+		self.assertEqual(len(validity), 2)
+		self.assertEqual(validity[0][0], mat.range_[0])
+		self.assertAlmostEqual(
+			ultrafast.wavelength(validity[0][1]), 1, places=5
+		)
+		self.assertAlmostEqual(
+			ultrafast.wavelength(validity[1][0]), 1.5 ** -0.5, places=10
+		)
+		self.assertEqual(validity[1][1], mat.range_[1])
+
+		# Never NaN within valid intervals
+		omega = numpy.concatenate([
+			numpy.linspace(*interval, 1001) for interval in validity
+		])
+		self.assertTrue(numpy.isfinite(mat.n(omega)).all())
+		self.assertTrue(numpy.isfinite(mat.n(omega, check=False)).all())
+
+		# Fail within range, outside valid intervals
+		with self.assertRaises(ultrafast.RangeError):
+			mat.n(ultrafast.frequency(0.9))
+		with self.assertRaises(ultrafast.RangeError):
+			mat.wavevector(numpy.array([validity[0][1] * 1.01, validity[1][1]]))
+
+		# Analysis follows modification
+		mat.coefficients = [0, 0.5, 0.1]
+		self.assertEqual(mat.validity, [tuple(mat.range_)])
+		mat.n(ultrafast.frequency(0.9))
+
+	def test_valid_mask(self):
+		'''Test valid frequency mask and verified grids'''
+
+		# Fused silica Sellmeier pole at 9.896 um within range
+		mat = ultrafast.RIIDMaterial.from_entry({"DATA": [{
+			"type": "formula 1",
+			"range": "0.3 20",
+			"coefficients": (
+				"0 0.6961663 0.0684043 0.4079426 0.1162414 0.8974794 9.896161"
+			)
+		}]})
+		self.assertEqual(len(mat.validity), 2)
+		omega = numpy.geomspace(*mat.range_, 1001)
+		mask = mat.valid_mask(omega)
+		self.assertFalse(mask.all())
+		self.assertTrue(mask[[0, -1]].all())
+		self.assertTrue(numpy.isfinite(mat.n(omega[mask])).all())
+		with self.assertRaises(ultrafast.RangeError):
+			mat.n(omega)
+		with self.assertRaises(ultrafast.RangeError):
+			mat.verify(omega)
+		self.assertEqual(ultrafast.Material(abs, (1, 2)).valid_mask(
+			[0.5, 1, 1.5, 2, 2.5]
+		).tolist(), [False, True, True, True, False])
+
+		# Verified grid, asserted again once the pole moves
+		grid = mat.verify(omega[mask])
+		with self.assertRaises(ValueError):
+			grid[0] = 0
+		self.assertTrue(mat._verified_grid(grid))
+		self.assertFalse(mat._verified_grid(grid.copy()))
+		coefficients = mat.coefficients.copy()
+		coefficients[6] = 9
+		mat.coefficients = coefficients
+		self.assertFalse(mat._verified_grid(grid))
+		self.assertAlmostEqual(
+			ultrafast.wavelength(mat.validity[0][1]), 9, places=4
+		)
+
+		# Closed form re-analysis (real between poles) keeps grid verified
+		self.assertTrue(mat._sampled)
+		self.assertFalse(self.mat._sampled)
+		omega = numpy.linspace(*self.mat.range_, 101)
+		grid = self.mat.verify(omega)
+		coefficients = self.mat.coefficients.copy()
+		coefficients[1] *= 1.01
+		self.mat.coefficients = coefficients
+		self.assertTrue(self.mat._verified_grid(grid))
+		numpy.testing.assert_array_equal(
+			self.mat.n(grid), self.mat.n(omega, check=False)
+		)
+
+		# Complex refractive index after update detected (BK7, n^2 < 0)
+		mat = ultrafast.RIIDMaterial.from_entry({"DATA": [{
+			"type": "formula 2",
+			"range": "0.3 2.5",
+			"coefficients": (
+				"0 1.03961212 0.00600069867 0.231792344 0.0200179144 "
+				"1.01046945 103.560653"
+			)
+		}]})
+		self.assertFalse(mat._sampled)
+		omega = numpy.linspace(*mat.range_, 101)
+		coefficients = mat.coefficients.copy()
+		coefficients[0] = -2.5
+		mat.coefficients = coefficients
+		self.assertEqual(mat.validity, [])
+		with self.assertRaises(ultrafast.RangeError):
+			mat.n(omega)
+		with self.assertRaises(ultrafast.RangeError):
+			mat.gvd(omega[1:-1])
+		coefficients[0] = 0
+		mat.coefficients = coefficients
+		self.assertEqual(mat.validity, [tuple(mat.range_)])
+
+
+class TestCoreUniaxialMaterial(unittest.TestCase):
+
+	def setUp(self):
+		'''Instantiate test uniaxial material'''
+
+		range_ = (1, 10)
+		self.mat = ultrafast.UniaxialMaterial(
+			ultrafast.Material(lambda omega: 1.6 + 0 * omega, range_),
+			ultrafast.Material(lambda omega: 1.5 + 0 * omega, (2, 20))
+		)
+
+	def test_range_(self):
+		'''Test range intersection'''
+
+		self.assertEqual(tuple(self.mat.range_), (2, 10))
+
+		# Fail on disjoint ranges
+		self.assertRaises(
+			ultrafast.UltrafastError,
+			ultrafast.UniaxialMaterial,
+			ultrafast.Material(abs, (1, 2)),
+			ultrafast.Material(abs, (3, 4))
+		)
+
+	def test_indices(self):
+		'''Test eigenindices'''
+
+		omega = numpy.array([3, 4, 5])
+
+		# Along optic axis
+		slow, fast = self.mat.indices(omega, 0)
+		numpy.testing.assert_allclose(slow, 1.6)
+		numpy.testing.assert_allclose(fast, 1.6)
+
+		# Perpendicular to optic axis
+		slow, fast = self.mat.indices(omega, math.pi / 2)
+		numpy.testing.assert_allclose(slow, 1.6)
+		numpy.testing.assert_allclose(fast, 1.5)
+
+		# Extraordinary index
+		theta = numpy.linspace(0, math.pi / 2, 5)
+		numpy.testing.assert_allclose(
+			self.mat.indices(3, theta)[1],
+			self.mat.n_e(3, theta)
+		)
+
+
+class TestCoreDispersion(unittest.TestCase):
+
+	def setUp(self):
+		'''Instantiate linearly dispersive test material'''
+
+		self.mat = ultrafast.Material(lambda omega: 1 + 0.1 * omega, (1, 10))
+		self.omega = numpy.array([2, 3, 4])
+
+	def test_group_index(self):
+		'''Test group index method'''
+		numpy.testing.assert_allclose(
+			self.mat.group_index(self.omega),
+			1 + 0.2 * self.omega
+		)
+
+	def test_gvd(self):
+		'''Test group velocity dispersion method'''
+		numpy.testing.assert_allclose(
+			self.mat.gvd(self.omega),
+			0.2 / ultrafast.c,
+			rtol=1e-6
+		)
+
+	def test_tod(self):
+		'''Test third order dispersion method'''
+		numpy.testing.assert_allclose(
+			self.mat.tod(self.omega),
+			0,
+			atol=1e-6
+		)
+
+
+class TestCorePrecision(unittest.TestCase):
+
+	def setUp(self):
+		'''Instantiate test RIID material (air) and grid'''
+
+		self.mat = ultrafast.RIIDMaterial("../examples/Ciddor.yml")
+		self.omega = numpy.linspace(*self.mat.range_, 20001)
+
+	def test_dtype(self):
+		'''Test evaluation precision'''
+
+		n = self.mat.n(self.omega)
+		for dtype in (numpy.float32, numpy.complex64, numpy.complex128):
+			values = self.mat.n(self.omega, dtype=dtype)
+			self.assertEqual(values.dtype, dtype)
+			numpy.testing.assert_allclose(values, n, rtol=0, atol=3e-7)
+		self.assertEqual(
+			self.mat.wavevector(self.omega, dtype=numpy.float32).dtype,
+			numpy.float32
+		)
+
+	def test_out(self):
+		'''Test output buffer'''
+
+		# Double precision (bit identical)
+		out = numpy.empty(self.omega.shape)
+		self.assertIs(self.mat.n(self.omega, out=out), out)
+		numpy.testing.assert_array_equal(out, self.mat.n(self.omega))
+		self.assertIs(self.mat.wavevector(self.omega, out=out), out)
+		numpy.testing.assert_array_equal(out, self.mat.wavevector(self.omega))
+
+		# Single precision
+		out = numpy.empty(self.omega.shape, dtype=numpy.float32)
+		self.mat.n(self.omega, out=out)
+		numpy.testing.assert_allclose(
+			out, self.mat.n(self.omega), rtol=0, atol=3e-7
+		)
+
+		# Broadcast into buffer
+		out = numpy.empty((2, 3))
+		self.mat.n(self.omega[:3], out=out)
+		numpy.testing.assert_array_equal(out[1], self.mat.n(self.omega[:3]))
+
+		# Frequency assertion
+		self.assertRaises(
+			ultrafast.RangeError, self.mat.n, numpy.array([0.1]), out=out
+		)
+
+
+class TestCoreThreading(unittest.TestCase):
+
+	def setUp(self):
+		'''Instantiate test RIID material (air) and grid'''
+
+		self.mat = ultrafast.RIIDMaterial("../examples/Ciddor.yml")
+		self.omega = numpy.linspace(*self.mat.range_, 20001)
+
+	def test_freeze(self):
+		'''Test frozen snapshots'''
+
+		n = self.mat.n(self.omega)
+		gvd = self.mat.gvd(self.omega[100:-100])
+		frozen = self.mat.freeze()
+		self.assertTrue(frozen.frozen)
+		self.assertFalse(self.mat.frozen)
+		self.assertIs(frozen.freeze(), frozen)
+		self.assertEqual(frozen.version, self.mat.version)
+		numpy.testing.assert_array_equal(frozen.n(self.omega), n)
+		numpy.testing.assert_array_equal(frozen.gvd(self.omega[100:-100]), gvd)
+
+		# Immutable
+		with self.assertRaises(ultrafast.PropertySetError):
+			frozen.coefficients = self.mat.coefficients
+		with self.assertRaises(ultrafast.PropertySetError):
+			frozen.range_ = self.mat.range_
+		with self.assertRaises(ultrafast.PropertySetError):
+			frozen.n = self.mat.n
+		with self.assertRaises(ValueError):
+			frozen._coefficients[1] = 0
+
+		# Unaffected by modification of the original
+		coefficients = self.mat.coefficients.copy()
+		coefficients[1] *= 2
+		self.mat.coefficients = coefficients
+		self.mat.range_ = (self.mat.range_[0], self.mat.range_[1] / 2)
+		numpy.testing.assert_array_equal(frozen.n(self.omega), n)
+		self.assertNotEqual(frozen.version, self.mat.version)
+
+		# Materials depending on other materials
+		relative = ultrafast.composite.RelativeMaterial(self.mat)
+		with self.assertRaises(ultrafast.UltrafastError):
+			relative.freeze()
+
+	def test_concurrent(self):
+		'''Test evaluation concurrent with modification'''
+
+		coefficients = self.mat.coefficients.copy()
+		modified = coefficients.copy()
+		modified[1] *= 2
+		expected = [self.mat.n(self.omega)]
+		self.mat.coefficients = modified
+		expected.append(self.mat.n(self.omega))
+		version = self.mat.version
+		stop = threading.Event()
+		results = []
+
+		def write():
+			for i in range(200):
+				self.mat.coefficients = (coefficients, modified)[i % 2]
+			stop.set()
+
+		def read():
+			while(not stop.is_set()):
+				results.append(self.mat.n(self.omega))
+
+		threads = [threading.Thread(target=read) for _ in range(3)]
+		threads.append(threading.Thread(target=write))
+		for thread in threads:
+			thread.start()
+		for thread in threads:
+			thread.join()
+		self.assertEqual(self.mat.version, version + 200)
+		for result in results:
+			self.assertTrue(any(
+				numpy.array_equal(result, values) for values in expected
+			))
+
 
 class TestErrors(unittest.TestCase):
 
@@ -232,6 +599,16 @@ class TestCoreFunctions(unittest.TestCase):
 			ultrafast.c * 2 * math.pi
 		)
 
+		# Precision and output buffer
+		value = numpy.array([1.0, 2.0])
+		self.assertEqual(
+			ultrafast.core._converter(value, dtype=numpy.float32).dtype,
+			numpy.float32
+		)
+		out = numpy.empty(2)
+		self.assertIs(ultrafast.core._converter(value, out=out), out)
+		numpy.testing.assert_array_equal(out, ultrafast.core._converter(value))
+
 	def test_frequency(self):
 		'''Test frequency function'''
 
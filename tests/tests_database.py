@@ -0,0 +1,137 @@
+"""Tests for database functionality"""
+
+import unittest
+import ultrafast
+import ultrafast.database
+import numpy
+import os
+import tarfile
+import tempfile
+import zipfile
+
+library = """\
+- SHELF: main
+  name: "MAIN - simple inorganic materials"
+  content:
+    - DIVIDER: "Oxides"
+    - BOOK: SiO2
+      name: "SiO2 (Silicon dioxide, Silica, Quartz)"
+      content:
+        - DIVIDER: "Bulk"
+        - PAGE: Malitson
+          name: "Malitson 1965: n 0.21-6.7 µm"
+          data: "main/SiO2/Malitson.yml"
+        - PAGE: Tabulated
+          name: "Tabulated: n 0.4-1.5 µm"
+          data: "main/SiO2/Tabulated.yml"
+        - PAGE: Untyped
+          data: "main/SiO2/Untyped.yml"
+- SHELF: glass
+  name: "GLASS - glasses"
+  content:
+    - BOOK: BK7
+      name: "BK7"
+      content:
+        - PAGE: 1970
+          data: "glass/BK7.yml"
+        - PAGE: Missing
+          data: "glass/Missing.yml"
+"""
+
+entries = {
+	"main/SiO2/Malitson.yml": (
+		"REFERENCES: \"Malitson 1965\"\nDATA:\n  - type: formula 1\n"
+		"    range: 0.21 6.7\n    coefficients: 0 0.6961663 0.0684043 "
+		"0.4079426 0.1162414 0.8974794 9.896161\n"
+	),
+	"main/SiO2/Tabulated.yml": (
+		"DATA:\n  - type: tabulated n\n    data: |\n        0.4 1.47\n"
+		"        1.5 1.44\n"
+	),
+	"main/SiO2/Untyped.yml": (
+		"DATA:\n  - type: formula\n    range: 0.21 6.7\n"
+		"    coefficients: 0 0.6961663 0.0684043\n"
+	),
+	"glass/BK7.yml": (
+		"COMMENTS: \"Schott\"\nDATA:\n  - type: formula 2\n"
+		"    range: 0.3 2.5\n    coefficients: 0 1.03961212 0.00600069867 "
+		"0.231792344 0.0200179144 1.01046945 103.560653\n"
+	),
+}
+
+
+class TestDatabase(unittest.TestCase):
+
+	def setUp(self):
+		'''Build database archives'''
+		self.directory = tempfile.TemporaryDirectory()
+		root = os.path.join(self.directory.name, "database")
+		for name, document in entries.items():
+			path = os.path.join(root, "data", name)
+			os.makedirs(os.path.dirname(path), exist_ok=True)
+			with open(path, "w") as file:
+				file.write(document)
+		with open(os.path.join(root, "library.yml"), "w") as file:
+			file.write(library)
+		self.zip = os.path.join(self.directory.name, "database.zip")
+		with zipfile.ZipFile(self.zip, "w") as archive:
+			for base, _, files in os.walk(root):
+				for name in files:
+					path = os.path.join(base, name)
+					archive.write(path, os.path.relpath(path, self.directory.name))
+		self.tar = os.path.join(self.directory.name, "database.tar.gz")
+		with tarfile.open(self.tar, "w:gz") as archive:
+			archive.add(root, "database")
+		self.reference = os.path.join(root, "data", "main/SiO2/Malitson.yml")
+
+	def tearDown(self):
+		self.directory.cleanup()
+
+	def test_read(self):
+		'''Test archive import'''
+
+		for path in (self.zip, self.tar):
+			materials, skipped = ultrafast.database.read(path, jobs=1)
+			self.assertEqual(
+				sorted(materials), ["glass/BK7/1970", "main/SiO2/Malitson"]
+			)
+			self.assertEqual(
+				skipped, ["main/SiO2/Tabulated", "main/SiO2/Untyped"]
+			)
+
+			# Equivalent to file based entry
+			material = materials["main/SiO2/Malitson"]
+			reference = ultrafast.RIIDMaterial(self.reference)
+			omega = numpy.linspace(2, 3, 11)
+			numpy.testing.assert_array_equal(material.n(omega), reference.n(omega))
+			self.assertEqual(material.range_, reference.range_)
+			self.assertEqual(material.references, "Malitson 1965")
+			self.assertEqual(materials["glass/BK7/1970"].comments, "Schott")
+			self.assertEqual(materials["glass/BK7/1970"].formula, 2)
+
+	def test_load(self):
+		'''Test parallel import to index'''
+
+		index = ultrafast.database.load(self.tar, jobs=2, chunk=1)
+		self.assertIsInstance(index, ultrafast.catalogue.Index)
+		self.assertEqual(len(index), 2)
+		self.assertEqual(index["main/SiO2/Malitson"].name, "main/SiO2/Malitson")
+		self.assertAlmostEqual(
+			index["glass/BK7/1970"].n(ultrafast.frequency(0.5876)), 1.5168, 4
+		)
+
+	def test_invalid(self):
+		'''Test invalid archives'''
+
+		with open(self.reference, "rb") as file:
+			path = os.path.join(self.directory.name, "entry.zip")
+			with zipfile.ZipFile(path, "w") as archive:
+				archive.writestr("entry.yml", file.read())
+		with self.assertRaises(ultrafast.UltrafastError):
+			ultrafast.database.read(path)
+		with self.assertRaises(ultrafast.UltrafastError):
+			ultrafast.database.read(self.reference)
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,113 @@
+"""Tests for optical elements functionality"""
+
+import unittest
+import ultrafast
+import ultrafast.elements
+import numpy
+
+
+class TestElements(unittest.TestCase):
+
+	def setUp(self):
+		'''Instantiate test material and grid'''
+
+		self.calls = 0
+
+		def n(omega):
+			'''Dummy refractive index function'''
+			self.calls += 1
+			return(1.5 + 0.01 * omega ** 2)
+
+		self.mat = ultrafast.Material(n, (1, 5))
+		self.omega = numpy.linspace(2, 3, 101)
+
+	def test_slab(self):
+		'''Test slab element'''
+
+		slab = ultrafast.elements.Slab(self.mat, 1000)
+
+		# Correct return value
+		numpy.testing.assert_allclose(
+			slab.phase(self.omega),
+			1000 * self.mat.wavevector(self.omega)
+		)
+
+		# Thickness change does not re-evaluate material
+		calls = self.calls
+		slab.thickness = 2000
+		numpy.testing.assert_allclose(
+			slab.phase(self.omega),
+			2000 * self.mat.wavevector(self.omega)
+		)
+		self.assertEqual(self.calls, calls + 1)
+
+		# Material modification invalidates phase
+		version = slab.version
+		self.mat.range_ = (1, 6)
+		self.assertNotEqual(slab.version, version)
+		calls = self.calls
+		slab.phase(self.omega)
+		self.assertEqual(self.calls, calls + 1)
+
+	def test_taylor_phase(self):
+		'''Test Taylor phase element'''
+
+		element = ultrafast.elements.TaylorPhase(2.5, (0, 100, 300))
+		numpy.testing.assert_allclose(
+			element.gdd(self.omega)[2:-2],
+			100 + 300 * (self.omega[2:-2] - 2.5)
+		)
+
+	def test_system(self):
+		'''Test system phase accumulation'''
+
+		slabs = [ultrafast.elements.Slab(self.mat, 100 * i) for i in range(5)]
+		compressor = ultrafast.elements.TaylorPhase(2.5, (0, -500))
+		system = ultrafast.elements.System(
+			slabs + [compressor],
+			omega=self.omega
+		)
+
+		def reference():
+			return(sum(
+				element.phase(self.omega) for element in system.elements
+			))
+
+		# Correct return value
+		numpy.testing.assert_allclose(system.phase(), reference())
+
+		# Cached return value
+		self.assertIs(system.phase(), system.phase())
+
+		# Incremental update
+		slabs[2].thickness = 1234
+		compressor.coefficients = (0, -800)
+		numpy.testing.assert_allclose(system.phase(), reference())
+
+		# No accumulated rounding over long parameter sweeps
+		for thickness in numpy.linspace(1e3, 1e5, 2000):
+			slabs[3].thickness = thickness
+			system.phase()
+		fresh = numpy.zeros(self.omega.shape)
+		for element in system.elements:
+			fresh = fresh + element.phase(self.omega)
+		numpy.testing.assert_array_equal(system.phase(), fresh)
+
+		# Nested systems
+		outer = ultrafast.elements.System([system, slabs[0]])
+		numpy.testing.assert_allclose(
+			outer.phase(self.omega),
+			reference() + slabs[0].phase(self.omega)
+		)
+		system.append(ultrafast.elements.Slab(self.mat, 10))
+		numpy.testing.assert_allclose(
+			outer.phase(self.omega),
+			reference() + slabs[0].phase(self.omega)
+		)
+
+		# Derivatives
+		self.assertEqual(system.tod().shape, self.omega.shape)
+
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,122 @@
+"""Tests for grids functionality"""
+
+import unittest
+import ultrafast
+import ultrafast.grids
+import numpy
+import os
+import tempfile
+
+
+class TestGridsAdaptiveGrid(unittest.TestCase):
+
+	def setUp(self):
+		'''Write test database entry (fused silica) and instantiate material'''
+
+		self.directory = tempfile.TemporaryDirectory()
+		path = os.path.join(self.directory.name, "FusedSilica.yml")
+		with open(path, "w") as file:
+			file.write(
+				"DATA:\n  - type: formula 1\n    range: 0.21 6.7\n"
+				"    coefficients: 0 0.6961663 0.0684043 0.4079426 0.1162414 "
+				"0.8974794 9.896161\n"
+			)
+		self.mat = ultrafast.RIIDMaterial(path)
+		self.air = ultrafast.RIIDMaterial("../examples/Ciddor.yml")
+
+	def tearDown(self):
+		'''Remove test database entry'''
+		self.directory.cleanup()
+
+	def assertInterpolates(self, omega, material, tolerance):
+		'''Assert interpolation error on a dense grid is within tolerance'''
+		dense = numpy.linspace(omega[0], omega[-1], 200001)
+		error = numpy.abs(
+			numpy.interp(dense, omega, material.n(omega)) - material.n(dense)
+		).max()
+		self.assertLess(error, 1.5 * tolerance)
+
+	def test_adaptive_grid(self):
+		'''Test single material grid'''
+
+		tolerance = 1e-7
+		omega = ultrafast.grids.adaptive_grid(self.mat, tolerance)
+		self.assertEqual(omega[0], self.mat.range_[0])
+		self.assertEqual(omega[-1], self.mat.range_[1])
+		self.assertTrue((numpy.diff(omega) > 0).all())
+		self.assertInterpolates(omega, self.mat, tolerance)
+
+		# Far fewer points than the uniform grid of equal worst-case accuracy
+		spacing = numpy.diff(omega).min()
+		uniform = (omega[-1] - omega[0]) / spacing
+		self.assertLess(len(omega), uniform / 10)
+
+		# Denser towards the infrared pole
+		spacing = numpy.diff(omega)
+		self.assertLess(spacing[0], spacing[len(spacing) // 2])
+
+	def test_multiple_materials(self):
+		'''Test grid over common range of multiple materials'''
+
+		tolerance = 1e-8
+		omega = ultrafast.grids.adaptive_grid((self.mat, self.air), tolerance)
+		self.assertEqual(omega[0], self.air.range_[0])
+		self.assertEqual(omega[-1], self.air.range_[1])
+		self.assertInterpolates(omega, self.mat, tolerance)
+		self.assertInterpolates(omega, self.air, tolerance)
+
+		# Explicit range
+		omega = ultrafast.grids.adaptive_grid(self.mat, 1e-6, range_=(2, 3))
+		self.assertEqual((omega[0], omega[-1]), (2, 3))
+
+	def test_poles(self):
+		'''Test grid split at a pole within range'''
+
+		mat = ultrafast.RIIDMaterial.from_entry({"DATA": [{
+			"type": "formula 1",
+			"range": "0.3 20",
+			"coefficients": (
+				"0 0.6961663 0.0684043 0.4079426 0.1162414 0.8974794 9.896161"
+			)
+		}]})
+		tolerance = 1e-5
+		omega = ultrafast.grids.adaptive_grid(mat, tolerance)
+		self.assertTrue((numpy.diff(omega) > 0).all())
+		self.assertTrue(mat.valid_mask(omega).all())
+		self.assertEqual((omega[0], omega[-1]), tuple(mat.range_))
+		for low, high in mat.validity:
+			inside = omega[(omega >= low) & (omega <= high)]
+			self.assertEqual((inside[0], inside[-1]), (low, high))
+			self.assertInterpolates(inside, mat, tolerance)
+
+		# Denser towards the pole
+		low, high = mat.validity[0]
+		spacing = numpy.diff(omega[omega <= high])
+		self.assertLess(spacing[-1], spacing[0] / 100)
+
+		# Derived quantities within stencil margins
+		omega = ultrafast.grids.adaptive_grid(mat, 10, quantity="gvd")
+		self.assertTrue(mat.valid_mask(omega, 1e-4).all())
+		self.assertTrue(numpy.isfinite(mat.gvd(omega)).all())
+
+	def test_errors(self):
+		'''Test failures'''
+
+		self.assertRaises(
+			ultrafast.UltrafastError,
+			ultrafast.grids.adaptive_grid, self.mat, 0
+		)
+		self.assertRaises(
+			ultrafast.UltrafastError,
+			ultrafast.grids.adaptive_grid, self.mat, 1e-12, max_points=100
+		)
+
+		# Undefined values never converge
+		mat = ultrafast.Material(
+			lambda omega: numpy.where(omega > 3, numpy.nan, 1.5 + 0 * omega),
+			(1, 5)
+		)
+		self.assertRaises(
+			ultrafast.UltrafastError,
+			ultrafast.grids.adaptive_grid, mat, 1e-3, max_points=1000
+		)
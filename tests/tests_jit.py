@@ -0,0 +1,107 @@
+"""Tests for jit functionality"""
+
+import unittest
+import ultrafast
+import ultrafast.jit
+import numpy
+import os
+import tempfile
+
+coefficients = {
+	1: "0.1 0.6961663 0.0684043 0.4079426 0.1162414 0.8974794 9.896161",
+	2: (
+		"0.1 1.03961212 0.00600069867 0.231792344 0.0200179144 1.01046945 "
+		"103.560653"
+	),
+	3: "2.7405 0.0184 -1 -0.0155 2.5",
+	4: "2.7359 0.01878 0.5 0.01822 1 0 0 0 0 -0.01471 2 0.0006081 4",
+	5: "1.4 0.003 -2 0.0001 -4",
+	6: "0 0.05792105 238.0185 0.00167917 57.362",
+	7: "1.4 0.01 0.001 -0.002 0.0001",
+	8: "0.3 0.01 0.02 0.001",
+	9: "2.1 0.02 0.01 0.3 0.2 0.5",
+}
+"""Test dispersion formula coefficients"""
+
+
+class TestJit(unittest.TestCase):
+
+	def setUp(self):
+		'''Write test database entries and instantiate materials'''
+
+		self.directory = tempfile.TemporaryDirectory()
+		self.materials = {}
+		for formula, values in coefficients.items():
+			path = os.path.join(self.directory.name, "{}.yml".format(formula))
+			with open(path, "w") as file:
+				file.write(
+					"DATA:\n  - type: formula {}\n    range: 0.4 1.5\n"
+					"    coefficients: {}\n".format(formula, values)
+				)
+			self.materials[formula] = ultrafast.RIIDMaterial(path)
+		self.omega = numpy.linspace(1.3, 4.6, 1001)
+
+	def tearDown(self):
+		'''Remove test database entries and restore default backend'''
+		self.directory.cleanup()
+		ultrafast.jit.use("numpy")
+
+	def test_backends(self):
+		'''Test backends agree'''
+
+		for formula, mat in self.materials.items():
+			expected = [
+				getattr(mat, quantity)(self.omega)
+				for quantity in ("n", "group_index", "gvd")
+			]
+			ultrafast.jit.use("numba", mat)
+			self.assertEqual(mat.backend, "numba")
+			numpy.testing.assert_allclose(
+				mat.n(self.omega), expected[0], rtol=1e-14
+			)
+			numpy.testing.assert_allclose(
+				mat.group_index(self.omega), expected[1], rtol=1e-9
+			)
+			numpy.testing.assert_allclose(
+				mat.gvd(self.omega), expected[2], rtol=1e-4,
+				atol=1e-6 * numpy.abs(expected[2]).max()
+			)
+
+			# Scalar input
+			self.assertAlmostEqual(mat.n(self.omega[0]), expected[0][0])
+			self.assertAlmostEqual(
+				float(mat.group_index(self.omega[0])), expected[1][0]
+			)
+
+	def test_use(self):
+		'''Test backend selection'''
+
+		mat = self.materials[1]
+		ultrafast.jit.use("numba")
+		self.assertIs(mat._kernels(), ultrafast.core._backends["numba"])
+		ultrafast.jit.use("numpy", mat)
+		self.assertIs(mat._kernels(), ultrafast.core._formulas)
+		ultrafast.jit.use(None, mat)
+		self.assertIsNone(mat.backend)
+
+		# Failures
+		self.assertRaises(ultrafast.UltrafastError, ultrafast.jit.use, "unknown")
+		self.assertRaises(
+			ultrafast.UltrafastError,
+			ultrafast.jit.use, "numba", ultrafast.Material(abs, (1, 2))
+		)
+
+	def test_range(self):
+		'''Test range assertion of fused derivatives'''
+
+		mat = self.materials[2]
+		ultrafast.jit.use("numba", mat)
+		self.assertRaises(ultrafast.RangeError, mat.gvd, mat.range_[1])
+
+	@unittest.skipUnless(ultrafast.jit.available, "numba not installed")
+	def test_compiled(self):
+		'''Test compiled kernels are registered'''
+
+		kernels = ultrafast.core._backends["numba"]
+		self.assertIsNot(kernels[1], ultrafast.core._formulas[1])
+		self.assertIn((1, 2), kernels)
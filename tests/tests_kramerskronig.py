@@ -0,0 +1,91 @@
+"""Tests for Kramers-Kronig functionality"""
+
+import unittest
+import ultrafast
+import ultrafast.kramerskronig
+import numpy
+
+
+def lorentz(omega, omega0=3.0, omegap=2.0, gamma=0.1):
+	'''Complex refractive index of a Lorentz oscillator'''
+	index = numpy.sqrt(
+		1 + omegap ** 2 / (omega0 ** 2 - omega ** 2 - 1j * gamma * omega)
+	)
+	return((index.real, index.imag))
+
+
+class TestKramersKronig(unittest.TestCase):
+
+	def setUp(self):
+		'''Lorentz oscillator on grid from zero frequency'''
+		self.omega = numpy.linspace(0, 30, 20001)
+		self.n, self.k = lorentz(self.omega)
+		self.interior = (self.omega > 1) & (self.omega < 10)
+
+	def test_transforms(self):
+		'''Test transforms reproduce causal dispersion'''
+
+		n = ultrafast.kramerskronig.n_from_k(self.omega, self.k)
+		k = ultrafast.kramerskronig.k_from_n(self.omega, self.n)
+		numpy.testing.assert_allclose(
+			n[self.interior], self.n[self.interior], atol=1e-5
+		)
+		numpy.testing.assert_allclose(
+			k[self.interior], self.k[self.interior], atol=1e-3
+		)
+
+	def test_anchors(self):
+		'''Test subtractive transforms on truncated grid'''
+
+		omega = numpy.linspace(1.5, 6, 4501)
+		n, k = lorentz(omega)
+		anchors = (1.8, 5.5)
+		for transform, values, expected, index in (
+			(ultrafast.kramerskronig.n_from_k, k, n, 0),
+			(ultrafast.kramerskronig.k_from_n, n, k, 1),
+		):
+			error = numpy.abs(transform(omega, values) - expected).max()
+			anchored = transform(omega, values, [
+				(x, lorentz(x)[index]) for x in anchors
+			])
+			self.assertLess(numpy.abs(anchored - expected).max(), error / 10)
+
+			# Anchors reproduced
+			numpy.testing.assert_allclose(
+				numpy.interp(anchors, omega, anchored),
+				[lorentz(x)[index] for x in anchors], atol=1e-9
+			)
+
+	def test_material(self):
+		'''Test material extinction and causality residual'''
+
+		material = ultrafast.Material(lambda omega: lorentz(omega)[0], (0, 30))
+		k = ultrafast.kramerskronig.extinction(material, self.omega)
+		numpy.testing.assert_allclose(
+			k[self.interior], self.k[self.interior], atol=1e-3
+		)
+		residual = ultrafast.kramerskronig.residual(material, self.omega, self.k)
+		self.assertLess(numpy.abs(residual[self.interior]).max(), 1e-5)
+
+		# Non-causal (dispersionless absorber)
+		residual = ultrafast.kramerskronig.residual(
+			ultrafast.Material(lambda omega: 1 + 0 * omega, (0, 30)),
+			self.omega, self.k
+		)
+		self.assertGreater(numpy.abs(residual[self.interior]).max(), 0.1)
+
+	def test_grid(self):
+		'''Test grid assertion'''
+
+		for omega in (
+			numpy.geomspace(1, 10, 11),
+			numpy.linspace(10, 1, 11),
+			numpy.linspace(-1, 1, 11),
+			numpy.array([1.0, 2.0]),
+		):
+			with self.assertRaises(ultrafast.UltrafastError):
+				ultrafast.kramerskronig.n_from_k(omega, numpy.ones(len(omega)))
+
+
+if __name__ == '__main__':
+	unittest.main()
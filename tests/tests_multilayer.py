@@ -0,0 +1,169 @@
+"""Tests for multilayer functionality"""
+
+import unittest
+import ultrafast
+import ultrafast.multilayer
+import numpy
+
+
+def constant(n):
+	'''Non-dispersive test material'''
+	return(ultrafast.Material(
+		lambda omega: n + 0 * omega,
+		(ultrafast.frequency(2), ultrafast.frequency(0.2))
+	))
+
+
+class TestMultilayerStack(unittest.TestCase):
+
+	def setUp(self):
+		'''Instantiate quarter-wave test stack'''
+
+		self.lambda_ = 0.8
+		self.high = constant(2.3)
+		self.low = constant(1.45)
+		self.glass = constant(1.5)
+		self.vacuum = constant(1.0)
+		self.periods = 8
+		layers = [self.high, self.low] * self.periods
+		self.stack = ultrafast.multilayer.Stack(
+			layers,
+			[self.lambda_ / (4 * layer.n(1)) for layer in layers],
+			self.glass,
+			incident=self.vacuum
+		)
+		self.omega = ultrafast.frequency(
+			numpy.linspace(0.6, 1.0, 101)
+		)
+
+	def test_thicknesses(self):
+		'''Test thicknesses attribute'''
+
+		# Fail on bad length
+		def set_bad_thicknesses():
+			self.stack.thicknesses = [1, 2]
+		self.assertRaises(
+			ultrafast.PropertySetError,
+			set_bad_thicknesses
+		)
+
+	def test_fresnel(self):
+		'''Test single interface'''
+
+		self.stack.thicknesses = numpy.zeros(len(self.stack.layers))
+		r, t = self.stack.amplitudes(self.omega)
+		numpy.testing.assert_allclose(r, (1.0 - 1.5) / (1.0 + 1.5))
+
+	def test_quarter_wave(self):
+		'''Test quarter-wave mirror reflectance'''
+
+		# Reflectance at design wavelength
+		omega = ultrafast.frequency(self.lambda_)
+		y = (2.3 / 1.45) ** (2 * self.periods) * 1.5
+		self.assertAlmostEqual(
+			float(self.stack.reflectance(omega)),
+			((1.0 - y) / (1.0 + y)) ** 2
+		)
+
+	def test_energy_conservation(self):
+		'''Test R + T = 1 for lossless stacks'''
+
+		theta = numpy.linspace(0, 1.2, 5)[:, None]
+		for polarization in ("s", "p"):
+			numpy.testing.assert_allclose(
+				self.stack.reflectance(self.omega, theta, polarization) +
+				self.stack.transmittance(self.omega, theta, polarization),
+				1
+			)
+
+		# Fail on unknown polarization
+		self.assertRaises(
+			ultrafast.UltrafastError,
+			self.stack.reflectance,
+			self.omega, 0, "x"
+		)
+
+	def test_gd(self):
+		'''Test group delay of a matched layer'''
+
+		# Index-matched layer on a perfect phase reference
+		thickness = 10
+		stack = ultrafast.multilayer.Stack(
+			[self.glass, self.high],
+			[thickness, self.lambda_ / (4 * 2.3)],
+			self.vacuum,
+			incident=self.glass
+		)
+		gd = stack.gd(self.omega) - ultrafast.multilayer.Stack(
+			[self.glass, self.high],
+			[0, self.lambda_ / (4 * 2.3)],
+			self.vacuum,
+			incident=self.glass
+		).gd(self.omega)
+		numpy.testing.assert_allclose(
+			gd,
+			2 * thickness * 1.5 / ultrafast.c
+		)
+
+		# Group delay dispersion of a non-dispersive layer vanishes
+		numpy.testing.assert_allclose(
+			numpy.gradient(gd, self.omega),
+			0,
+			atol=1e-6
+		)
+
+	def test_cache(self):
+		'''Test refractive index caching'''
+
+		calls = []
+
+		def n(omega):
+			calls.append(omega)
+			return(1.5 + 0 * omega)
+
+		material = ultrafast.Material(n, self.glass.range_)
+		stack = ultrafast.multilayer.Stack(
+			[material, self.high, material],
+			[0.1, 0.1, 0.1],
+			self.glass,
+			incident=self.vacuum
+		)
+		stack.reflectance(self.omega)
+		stack.thicknesses = [0.2, 0.2, 0.2]
+		stack.reflectance(self.omega)
+		self.assertEqual(len(calls), 1)
+
+		# Material modification re-evaluates only that material
+		material.n = n
+		stack.reflectance(self.omega)
+		self.assertEqual(len(calls), 2)
+		stack.reflectance(self.omega)
+		self.assertEqual(len(calls), 2)
+
+	def test_lossless(self):
+		'''Test blocked real arithmetic against complex arithmetic'''
+
+		# Repeated and distinct layers, several blocks, (angle, frequency) grid
+		thicknesses = self.stack.thicknesses.copy()
+		thicknesses[::3] *= 1.1
+		self.stack.thicknesses = thicknesses
+		omega = ultrafast.frequency(numpy.linspace(0.6, 1.0, 10001))
+		theta = numpy.array([[0.0], [0.4]])
+		complex_ = ultrafast.multilayer.Stack(
+			self.stack.layers,
+			thicknesses,
+			ultrafast.Material(
+				lambda omega: 1.5 + 0j * omega, self.glass.range_
+			),
+			incident=self.vacuum
+		)
+		for polarization in ("s", "p"):
+			numpy.testing.assert_allclose(
+				self.stack.amplitudes(omega, theta, polarization),
+				complex_.amplitudes(omega, theta, polarization),
+				rtol=1e-12, atol=1e-12
+			)
+
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,137 @@
+"""Tests for phase-matching functionality"""
+
+import unittest
+import ultrafast
+import ultrafast.phasematching
+import math
+import numpy
+
+
+def bbo():
+	'''Beta barium borate (Eimerl 1987)'''
+
+	def n_o(omega):
+		lambda_ = ultrafast.wavelength(omega)
+		return(numpy.sqrt(
+			2.7405 + 0.0184 / (lambda_ ** 2 - 0.0179) - 0.0155 * lambda_ ** 2
+		))
+
+	def n_e(omega):
+		lambda_ = ultrafast.wavelength(omega)
+		return(numpy.sqrt(
+			2.3730 + 0.0128 / (lambda_ ** 2 - 0.0156) - 0.0044 * lambda_ ** 2
+		))
+
+	range_ = (ultrafast.frequency(0.19), ultrafast.frequency(3.5))
+	return(ultrafast.UniaxialMaterial(
+		ultrafast.Material(n_o, range_),
+		ultrafast.Material(n_e, range_),
+		name="BBO"
+	))
+
+
+class TestPhaseMatching(unittest.TestCase):
+
+	def setUp(self):
+		'''Instantiate test crystal'''
+		self.crystal = bbo()
+		self.omega = ultrafast.frequency(0.8)
+
+	def test_delta_k(self):
+		'''Test wavevector mismatch'''
+
+		# Type I SHG: o + o -> e
+		theta = 0.5
+		n_o = self.crystal.ordinary.n(self.omega)
+		n_e = self.crystal.n_e(2 * self.omega, theta)
+		self.assertAlmostEqual(
+			ultrafast.phasematching.delta_k(
+				self.crystal, 2 * self.omega, self.omega, theta
+			),
+			2 * self.omega * (n_e - n_o) / ultrafast.c
+		)
+
+		# Fail on unknown type
+		self.assertRaises(
+			ultrafast.UltrafastError,
+			ultrafast.phasematching.delta_k,
+			self.crystal, 2 * self.omega, self.omega, theta, 0, "III"
+		)
+
+	def test_delta_k_map(self):
+		'''Test wavevector mismatch map'''
+
+		theta = numpy.linspace(0.3, 0.7, 4)
+		omega_p = ultrafast.frequency(numpy.linspace(0.39, 0.41, 5))
+		omega_s = ultrafast.frequency(numpy.linspace(0.7, 0.9, 6))
+		map_ = ultrafast.phasematching.delta_k_map(
+			self.crystal, theta, omega_p, omega_s
+		)
+
+		# Correct shape
+		self.assertEqual(map_.shape, (4, 5, 6))
+
+		# Correct element
+		self.assertAlmostEqual(
+			map_[1, 2, 3],
+			ultrafast.phasematching.delta_k(
+				self.crystal, omega_p[2], omega_s[3], theta[1]
+			)
+		)
+
+	def test_angle(self):
+		'''Test phase-matching angle'''
+
+		# Type I SHG of 800 nm in BBO at ~29.2 degrees
+		theta = ultrafast.phasematching.shg_angle(self.crystal, self.omega)
+		self.assertAlmostEqual(math.degrees(theta), 29.2, places=0)
+		self.assertAlmostEqual(
+			ultrafast.phasematching.delta_k(
+				self.crystal, 2 * self.omega, self.omega, theta
+			),
+			0,
+			places=6
+		)
+
+		# Vectorized tuning curve
+		omega_s = ultrafast.frequency(numpy.linspace(1.1, 1.5, 7))
+		theta = ultrafast.phasematching.angle(
+			self.crystal, self.omega, omega_s
+		)
+		self.assertEqual(theta.shape, (7,))
+		numpy.testing.assert_allclose(
+			ultrafast.phasematching.delta_k(
+				self.crystal, self.omega, omega_s, theta
+			),
+			0,
+			atol=1e-6
+		)
+
+		# Not phase-matchable
+		theta = ultrafast.phasematching.shg_angle(
+			self.crystal, self.omega, bracket=(0, 0.1)
+		)
+		self.assertTrue(numpy.isnan(theta))
+
+	def test_acceptance(self):
+		'''Test acceptance bandwidth'''
+
+		theta = ultrafast.phasematching.shg_angle(self.crystal, self.omega)
+
+		# Inversely proportional to length
+		widths = ultrafast.phasematching.acceptance(
+			self.crystal, 2 * self.omega, self.omega, theta,
+			numpy.array([100, 200])
+		)
+		self.assertAlmostEqual(widths[0] / widths[1], 2)
+
+		# Fail on unknown parameter
+		self.assertRaises(
+			ultrafast.UltrafastError,
+			ultrafast.phasematching.acceptance,
+			self.crystal, 2 * self.omega, self.omega, theta, 100, 0, "I", "foo"
+		)
+
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,91 @@
+"""Tests for profiling functionality"""
+
+import unittest
+import ultrafast
+import ultrafast.profiling
+import numpy
+
+
+class TestProfiling(unittest.TestCase):
+
+	def setUp(self):
+		'''Instantiate test material'''
+
+		def n(omega):
+			'''Dummy refractive index function'''
+			return(omega)
+
+		self.mat = ultrafast.Material(n, (1, 10), name="Test material")
+		self.omega = numpy.linspace(2, 3, 100)
+
+	def tearDown(self):
+		'''Restore default state'''
+		ultrafast.profiling.disable()
+		ultrafast.profiling.reset()
+
+	def test_disabled(self):
+		'''Test disabled instrumentation'''
+
+		self.assertFalse(ultrafast.profiling.enabled)
+		self.mat.n(self.omega)
+		self.assertEqual(ultrafast.profiling.snapshot(), {})
+
+	def test_profile(self):
+		'''Test scoped profiling'''
+
+		with ultrafast.profiling.profile() as profile:
+			self.assertTrue(ultrafast.profiling.enabled)
+			self.mat.n(self.omega)
+			self.mat.wavevector(self.omega)
+			self.mat.brewster(self.omega, self.mat)
+			self.assertRaises(ultrafast.RangeError, self.mat.n, 20)
+		self.assertFalse(ultrafast.profiling.enabled)
+
+		snapshot = profile.snapshot()["Test material"]
+
+		# Call and point counts
+		self.assertEqual(snapshot["n"]["calls"], 5)
+		self.assertEqual(snapshot["n"]["points"], 401)
+		self.assertEqual(snapshot["wavevector"]["calls"], 1)
+		self.assertEqual(snapshot["brewster"]["points"], 100)
+
+		# Failure counts
+		self.assertEqual(snapshot["n"]["failures"], 1)
+		self.assertEqual(snapshot["assert_frequency"]["failures"], 1)
+
+		# Cumulative time
+		self.assertGreater(snapshot["n"]["time"], 0)
+
+		# Scoped statistics are not recorded process-wide
+		self.assertEqual(ultrafast.profiling.snapshot(), {})
+
+	def test_enable(self):
+		'''Test process-wide recording'''
+
+		ultrafast.profiling.enable()
+		self.mat.n(self.omega)
+		self.assertEqual(
+			ultrafast.profiling.snapshot()["Test material"]["n"]["calls"],
+			1
+		)
+		ultrafast.profiling.reset()
+		self.assertEqual(ultrafast.profiling.snapshot(), {})
+
+	def test_load_phases(self):
+		'''Test RIIDMaterial load phase recording'''
+
+		db = "../examples/Ciddor.yml"
+		with ultrafast.profiling.profile() as profile:
+			ultrafast.RIIDMaterial(db)
+			self.assertRaises(
+				ultrafast.RangeError,
+				ultrafast.RIIDMaterial,
+				"../examples/BadFormula.yml"
+			)
+		snapshot = profile.snapshot()
+		for operation in ("fetch", "parse", "coefficients"):
+			self.assertEqual(snapshot[db][operation]["calls"], 1)
+
+
+if __name__ == "__main__":
+	unittest.main()
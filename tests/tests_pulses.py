@@ -0,0 +1,147 @@
+"""Tests for pulse functionality"""
+
+import unittest
+import ultrafast
+import ultrafast.pulses
+import numpy
+
+bk7 = ultrafast.RIIDMaterial.from_entry({"DATA": [{
+	"type": "formula 2",
+	"range": "0.3 2.5",
+	"coefficients": (
+		"0 1.03961212 0.00600069867 0.231792344 0.0200179144 1.01046945 "
+		"103.560653"
+	)
+}]})
+"""BK7 (Schott catalogue coefficients)"""
+
+
+class TestPulses(unittest.TestCase):
+
+	def setUp(self):
+		'''Gaussian spectrum of 30 nm FWHM at 800 nm'''
+		self.omega_0 = ultrafast.frequency(0.8)
+		self.width = 2 * ultrafast.pi * ultrafast.c * 0.03 / 0.8 ** 2
+		self.omega = self.omega_0 + numpy.linspace(-6, 6, 1024) * self.width
+		self.spectrum = numpy.exp(
+			-4 * numpy.log(2) * numpy.power(
+				(self.omega - self.omega_0) / self.width, 2
+			)
+		)
+
+	def test_gaussian(self):
+		'''Test analytic Gaussian broadening'''
+
+		limit = ultrafast.pulses.transform_limit(0.8, 0.03)
+		self.assertAlmostEqual(limit, 0.441271 * 0.64 / (ultrafast.c * 0.03), 3)
+		duration, gdd, tod, peak = ultrafast.pulses.gaussian(
+			[], [], 0.8, 0.03, gdd=500
+		)
+		expected = limit * numpy.sqrt(
+			1 + numpy.power(4 * numpy.log(2) * 500 / limit ** 2, 2)
+		)
+		self.assertAlmostEqual(duration, expected, 9)
+		self.assertAlmostEqual(peak, 1, 9)
+		self.assertEqual(gdd, 500)
+
+		# Material dispersion and input chirp
+		duration, gdd, tod, peak = ultrafast.pulses.gaussian(
+			[bk7, bk7], [5e3, 5e3], 0.8, 0.03, gdd=-400
+		)
+		self.assertAlmostEqual(gdd, 1e4 * bk7.gvd(self.omega_0) - 400, 6)
+		self.assertAlmostEqual(tod, 1e4 * bk7.tod(self.omega_0), 6)
+		self.assertGreater(peak, 1)
+		duration, _, _, peak = ultrafast.pulses.gaussian([bk7], [1e4], 0.8, 0.03)
+		self.assertAlmostEqual(peak, limit / duration, 9)
+
+		with self.assertRaises(ultrafast.UltrafastError):
+			ultrafast.pulses.gaussian([bk7], [], 0.8, 0.03)
+
+	def test_broadcast(self):
+		'''Test scenario broadcasting'''
+
+		wavelength = numpy.linspace(0.7, 0.9, 3)[:, None, None]
+		bandwidth = numpy.linspace(0.01, 0.04, 4)[:, None]
+		thickness = numpy.linspace(0, 2e4, 5)
+		results = ultrafast.pulses.gaussian(
+			[bk7], [thickness], wavelength, bandwidth
+		)
+		for result in results:
+			self.assertEqual(result.shape, (3, 4, 5))
+		duration = ultrafast.pulses.gaussian(
+			[bk7], [thickness[2]], wavelength[1, 0, 0], bandwidth[3, 0]
+		)[0]
+		self.assertAlmostEqual(results[0][1, 3, 2], duration, 9)
+		numpy.testing.assert_allclose(
+			results[0][..., 0],
+			numpy.broadcast_to(
+				ultrafast.pulses.transform_limit(wavelength, bandwidth)[..., 0],
+				(3, 4)
+			)
+		)
+		self.assertTrue((numpy.diff(results[0], axis=-1) > 0).all())
+
+		# Dispersion evaluated once per distinct centre wavelength
+		calls = []
+		gvd = bk7.gvd
+
+		def counted(omega, *args, **kwargs):
+			calls.append(numpy.size(omega))
+			return(gvd(omega, *args, **kwargs))
+
+		bk7.gvd = counted
+		try:
+			wavelength = numpy.repeat([0.7, 0.8, 0.9], 1000).reshape(3, 1000)
+			results = ultrafast.pulses.gaussian(
+				[bk7], [thickness[:, None, None]], wavelength, 0.03
+			)
+		finally:
+			del bk7.gvd
+		self.assertEqual(calls, [3])
+		self.assertEqual(results[0].shape, (5, 3, 1000))
+		numpy.testing.assert_allclose(
+			results[1][2, :, 0], thickness[2] * bk7.gvd(
+				ultrafast.frequency(numpy.array([0.7, 0.8, 0.9]))
+			)
+		)
+
+	def test_fourier(self):
+		'''Test numerical propagation against analytic results'''
+
+		thickness = numpy.array([0, 1e4, 2e4])
+		duration, gdd, tod, peak = ultrafast.pulses.fourier(
+			[bk7], [thickness], self.omega, self.spectrum
+		)
+		self.assertEqual(duration.shape, (3,))
+		analytic = ultrafast.pulses.gaussian([bk7], [thickness], 0.8, 0.03)
+		numpy.testing.assert_allclose(duration, analytic[0], rtol=2e-3)
+		numpy.testing.assert_allclose(gdd, analytic[1], rtol=1e-3)
+		numpy.testing.assert_allclose(tod, analytic[2], rtol=1e-2)
+		numpy.testing.assert_allclose(peak, analytic[3], rtol=2e-3)
+
+		# Input chirp compensated by material
+		offset = self.omega - self.omega_0
+		duration, gdd, _, peak = ultrafast.pulses.fourier(
+			[bk7], [1e4], self.omega, self.spectrum,
+			phase=-analytic[1][1] * offset ** 2 / 2
+		)
+		self.assertAlmostEqual(gdd, 0, delta=1)
+		self.assertAlmostEqual(duration, analytic[0][0], delta=0.5)
+		self.assertGreater(peak, 1.5)
+
+		# Batched spectra
+		spectra = numpy.stack((self.spectrum, numpy.roll(self.spectrum, 40)))
+		duration = ultrafast.pulses.fourier(
+			[bk7], [thickness[:, None]], self.omega, spectra, block=2
+		)[0]
+		self.assertEqual(duration.shape, (3, 2))
+		numpy.testing.assert_allclose(duration[:, 0], analytic[0], rtol=2e-3)
+
+		with self.assertRaises(ultrafast.UltrafastError):
+			ultrafast.pulses.fourier(
+				[bk7], [1e4], self.omega[::-1], self.spectrum
+			)
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,186 @@
+"""Tests for ray tracing functionality"""
+
+import unittest
+import ultrafast
+import ultrafast.raytracing
+import numpy
+
+sf10 = ultrafast.RIIDMaterial.from_entry({"DATA": [{
+	"type": "formula 2",
+	"range": "0.38 2.5",
+	"coefficients": (
+		"0 1.62153902 0.0122241457 0.256287842 0.0595736775 1.64447552 "
+		"147.468793"
+	)
+}]})
+"""SF10 (Schott catalogue coefficients)"""
+
+
+class TestTracer(unittest.TestCase):
+
+	def setUp(self):
+		'''Brewster prism at minimum deviation'''
+		self.omega = ultrafast.frequency(0.8)
+		n = sf10.n(self.omega) / ultrafast.air.n(self.omega)
+		brewster = numpy.arctan(n)
+		self.apex = ultrafast.pi - 2 * brewster
+		self.rotation = ultrafast.pi / 2 - 2 * brewster
+		self.prism = ultrafast.raytracing.prism(
+			sf10, self.apex, (1e4, 1e3), rotation=self.rotation
+		)
+
+	def test_slab(self):
+		'''Test normal incidence slab against material phase'''
+
+		omega = ultrafast.frequency(numpy.linspace(0.6, 1.2, 7))
+		tracer = ultrafast.raytracing.Tracer(
+			[ultrafast.raytracing.Plane((3e3, 0), 0, ultrafast.air)],
+			material=sf10
+		)
+		numpy.testing.assert_allclose(
+			tracer.phase(omega), 3e3 * sf10.wavevector(omega)
+		)
+		numpy.testing.assert_allclose(
+			tracer.gd(omega), 3e3 * sf10.group_index(omega) / ultrafast.c,
+			rtol=1e-8
+		)
+		numpy.testing.assert_allclose(
+			tracer.gdd(omega), 3e3 * sf10.gvd(omega), rtol=1e-3
+		)
+		numpy.testing.assert_allclose(tracer.angular_dispersion(omega), 0)
+
+	def test_snell(self):
+		'''Test refraction angles and total internal reflection'''
+
+		theta = numpy.linspace(-0.5, 0.5, 5)
+		tracer = ultrafast.raytracing.Tracer(
+			[ultrafast.raytracing.Plane((100, 0), 0.3, sf10)]
+		)
+		n = sf10.n(self.omega) / ultrafast.air.n(self.omega)
+		_, _, angle, _ = tracer.trace(self.omega, theta=theta)
+		numpy.testing.assert_allclose(
+			angle, 0.3 - numpy.arcsin(numpy.sin(0.3 - theta) / n), rtol=1e-12
+		)
+
+		# Exit at the critical angle
+		tracer = ultrafast.raytracing.Tracer(
+			[ultrafast.raytracing.Plane((100, 0), 0, ultrafast.air)],
+			material=sf10
+		)
+		critical = numpy.arcsin(1 / n)
+		_, _, angle, path = tracer.trace(
+			self.omega, theta=[critical - 1e-3, critical + 1e-3]
+		)
+		self.assertTrue(numpy.isfinite(angle[0]))
+		self.assertTrue(numpy.isnan(path[1]))
+
+	def test_lens(self):
+		'''Test thin lens focal length'''
+
+		radius = 5e4
+		tracer = ultrafast.raytracing.Tracer([
+			ultrafast.raytracing.Sphere(0, radius, sf10),
+			ultrafast.raytracing.Sphere(1e3, -radius, ultrafast.air),
+		])
+		x, y, angle, _ = tracer.trace(self.omega, height=10.0)
+		focus = x - y / numpy.tan(angle)
+		n = sf10.n(self.omega) / ultrafast.air.n(self.omega)
+
+		# Thick lens (lensmaker's equation)
+		power = (n - 1) * (2 / radius - (n - 1) * 1e3 / (n * radius ** 2))
+		principal = (n - 1) * 1e3 / (n * radius * power)
+		self.assertAlmostEqual(focus, 1e3 - principal + 1 / power, delta=1)
+
+	def test_tilt(self):
+		'''Test pulse-front tilt against group delay across the beam'''
+
+		x, y, theta, _ = ultrafast.raytracing.Tracer(self.prism).trace(
+			self.omega
+		)
+		point = (x + 2e5 * numpy.cos(theta), y + 2e5 * numpy.sin(theta))
+		tracer = ultrafast.raytracing.Tracer(
+			self.prism +
+			[ultrafast.raytracing.Plane(point, theta, ultrafast.air)]
+		)
+		height = numpy.linspace(-200, 200, 5)
+		x, y, _, _ = tracer.trace(self.omega, height)
+		position = (
+			(y - point[1]) * numpy.cos(theta) - (x - point[0]) * numpy.sin(theta)
+		)
+		slope = numpy.polyfit(
+			position, ultrafast.c * tracer.gd(self.omega, height), 1
+		)[0]
+		self.assertAlmostEqual(
+			slope, numpy.tan(tracer.tilt(self.omega)), places=4
+		)
+		self.assertLess(tracer.angular_dispersion(self.omega), 0)
+
+	def test_pair(self):
+		'''Test prism pair angular dispersion, spatial chirp and GDD'''
+
+		x, y, theta, _ = ultrafast.raytracing.Tracer(self.prism).trace(
+			self.omega
+		)
+
+		def pair(length):
+			apex = (
+				x + length * numpy.cos(theta), y + length * numpy.sin(theta) - 3e3
+			)
+			return(ultrafast.raytracing.Tracer(
+				self.prism +
+				ultrafast.raytracing.prism(
+					sf10, self.apex, apex, rotation=self.rotation, inverted=True
+				) +
+				[ultrafast.raytracing.Plane(
+					(apex[0] + 1e5, 0), 0, ultrafast.air
+				)]
+			))
+
+		short, long_ = pair(2e5), pair(4e5)
+		self.assertAlmostEqual(short.trace(self.omega)[2], 0, places=12)
+		self.assertAlmostEqual(short.angular_dispersion(self.omega), 0, places=9)
+		self.assertLess(
+			long_.spatial_chirp(self.omega), short.spatial_chirp(self.omega)
+		)
+
+		# Angular dispersion GDD (-4 L (dn / dlambda)^2 lambda^3 / 2 pi c^2)
+		lambda_ = 0.8
+		dn = (
+			sf10.n(ultrafast.frequency(lambda_ + 1e-4)) -
+			sf10.n(ultrafast.frequency(lambda_ - 1e-4))
+		) / 2e-4
+		expected = -4 * 2e5 * dn ** 2 * lambda_ ** 3 / (
+			2 * ultrafast.pi * ultrafast.c ** 2
+		)
+		self.assertAlmostEqual(
+			(long_.gdd(self.omega) - short.gdd(self.omega)) / expected, 1,
+			delta=0.05
+		)
+
+	def test_grid(self):
+		'''Test frequency x ray broadcasting'''
+
+		omega = ultrafast.frequency(numpy.linspace(0.7, 0.9, 11))[:, None]
+		height = numpy.linspace(-100, 100, 3)
+		tracer = ultrafast.raytracing.Tracer(self.prism)
+		x, y, theta, path = tracer.trace(omega, height)
+		self.assertEqual(path.shape, (11, 3))
+		self.assertEqual(tracer.gdd(omega, height).shape, (11, 3))
+		numpy.testing.assert_allclose(
+			theta[5], tracer.trace(omega[5, 0], height)[2]
+		)
+		numpy.testing.assert_allclose(
+			tracer.tilt(omega, height)[:, 1], tracer.tilt(omega[:, 0])
+		)
+
+		# Rays missing apertures are lost
+		tracer = ultrafast.raytracing.Tracer([
+			ultrafast.raytracing.Plane((100, 0), 0, sf10, aperture=50)
+		])
+		path = tracer.trace(omega, height)[3]
+		self.assertTrue(numpy.isnan(path[:, [0, 2]]).all())
+		self.assertTrue(numpy.isfinite(path[:, 1]).all())
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,102 @@
+"""Tests for registry functionality"""
+
+import unittest
+import ultrafast
+import ultrafast.registry
+import gc
+import os
+import threading
+import time
+
+
+class TestRegistry(unittest.TestCase):
+
+	def setUp(self):
+		'''Clear registry'''
+		ultrafast.registry.clear()
+		self.path = "../examples/Ciddor.yml"
+
+	def test_normalize(self):
+		'''Test source normalization'''
+
+		self.assertEqual(
+			ultrafast.registry.normalize("../examples/../examples/Ciddor.yml"),
+			ultrafast.registry.normalize(os.path.abspath(self.path))
+		)
+		self.assertEqual(
+			ultrafast.registry.normalize(
+				"HTTP://RefractiveIndex.info/database/other/./mixed gases/air/"
+				"Ciddor.yml#data"
+			),
+			"http://refractiveindex.info/database/other/mixed%20gases/air/"
+			"Ciddor.yml"
+		)
+
+	def test_get(self):
+		'''Test shared instances'''
+
+		material = ultrafast.registry.get(self.path)
+		self.assertIsInstance(material, ultrafast.RIIDMaterial)
+		self.assertIs(
+			ultrafast.registry.get("../examples/./Ciddor.yml"), material
+		)
+
+		# Factory arguments distinguish entries
+		def factory(source, scale=1):
+			return(ultrafast.Material(lambda omega: scale + 0 * omega, (1, 2)))
+
+		self.assertIsNot(
+			ultrafast.registry.get(self.path, factory, scale=2),
+			ultrafast.registry.get(self.path, factory, scale=3)
+		)
+
+		# Standard air
+		self.assertIs(ultrafast.registry.get(ultrafast.air.name), ultrafast.air)
+
+	def test_setdefault(self):
+		'''Test registration if not registered'''
+
+		self.assertIsNone(ultrafast.registry.lookup(self.path))
+		material = ultrafast.RIIDMaterial(self.path)
+		self.assertIs(ultrafast.registry.setdefault(self.path, material), material)
+		self.assertIs(ultrafast.registry.lookup(self.path), material)
+		self.assertIs(
+			ultrafast.registry.setdefault(
+				self.path, ultrafast.RIIDMaterial(self.path)
+			),
+			material
+		)
+		self.assertIs(ultrafast.registry.get(self.path), material)
+
+	def test_weak(self):
+		'''Test unreferenced materials are released'''
+
+		material = ultrafast.registry.get(self.path)
+		key = ultrafast.registry.key(self.path)
+		self.assertIn(key, ultrafast.registry.registered())
+		del material
+		gc.collect()
+		self.assertNotIn(key, ultrafast.registry.registered())
+
+	def test_threads(self):
+		'''Test concurrent requests load once'''
+
+		calls = []
+
+		def factory(source):
+			calls.append(source)
+			time.sleep(0.05)
+			return(ultrafast.RIIDMaterial(source))
+
+		results = []
+
+		def request():
+			results.append(ultrafast.registry.get(self.path, factory))
+
+		threads = [threading.Thread(target=request) for _ in range(8)]
+		for thread in threads:
+			thread.start()
+		for thread in threads:
+			thread.join()
+		self.assertEqual(len(calls), 1)
+		self.assertTrue(all(result is results[0] for result in results))
@@ -0,0 +1,145 @@
+"""Tests for thermal functionality"""
+
+import unittest
+import ultrafast
+import ultrafast.jit
+import ultrafast.thermal
+import numpy
+
+
+class TestThermoOpticMaterial(unittest.TestCase):
+
+	def setUp(self):
+		'''Instantiate test material'''
+
+		self.reference = ultrafast.RIIDMaterial("../examples/Ciddor.yml")
+		self.mat = ultrafast.thermal.ThermoOpticMaterial(
+			self.reference,
+			(1e-5, 1e-8),
+			temperature0=20,
+			temperature_range=(0, 200)
+		)
+		self.omega = ultrafast.frequency(numpy.linspace(0.5, 1.5, 11))
+
+	def test_n(self):
+		'''Test refractive index method'''
+
+		# Reference temperature
+		numpy.testing.assert_allclose(
+			self.mat.n(self.omega),
+			self.reference.n(self.omega)
+		)
+
+		# Correct return value
+		numpy.testing.assert_allclose(
+			self.mat.n(self.omega, 30),
+			self.reference.n(self.omega) + 1e-5 * 10 + 1e-8 * 100
+		)
+
+		# Frequency x temperature grid
+		temperature = numpy.linspace(20, 100, 5)
+		self.assertEqual(
+			self.mat.n(self.omega[:, None], temperature).shape,
+			(11, 5)
+		)
+
+		# Forwarded by wavevector
+		numpy.testing.assert_allclose(
+			self.mat.wavevector(self.omega, 30),
+			self.omega * self.mat.n(self.omega, 30) / ultrafast.c
+		)
+
+		# Fail on temperature out of range
+		self.assertRaises(
+			ultrafast.RangeError,
+			self.mat.n,
+			self.omega,
+			300
+		)
+
+
+class TestTemperatureSellmeierMaterial(unittest.TestCase):
+
+	def setUp(self):
+		'''Instantiate test material (temperature dependent Ciddor air)'''
+
+		self.reference = ultrafast.RIIDMaterial("../examples/Ciddor.yml")
+		coefficients = numpy.zeros((len(self.reference.coefficients), 2))
+		coefficients[:, 0] = self.reference.coefficients
+		coefficients[1, 1] = -1e-4
+		self.mat = ultrafast.thermal.TemperatureSellmeierMaterial(
+			6,
+			coefficients,
+			self.reference.range_,
+			temperature0=15
+		)
+		self.omega = ultrafast.frequency(numpy.linspace(0.5, 1.5, 11))
+
+	def test_n(self):
+		'''Test refractive index method'''
+
+		# Reference temperature
+		numpy.testing.assert_allclose(
+			self.mat.n(self.omega),
+			self.reference.n(self.omega)
+		)
+
+		# Frequency x temperature grid
+		temperature = numpy.linspace(15, 55, 5)
+		n = self.mat.n(self.omega[:, None], temperature)
+		self.assertEqual(n.shape, (11, 5))
+		numpy.testing.assert_allclose(n[:, 2], self.mat.n(self.omega, 35))
+		self.assertTrue(numpy.all(numpy.diff(n, axis=1) < 0))
+
+		# Fail on bad formula
+		self.assertRaises(
+			ultrafast.RangeError,
+			ultrafast.thermal.TemperatureSellmeierMaterial,
+			10,
+			[1, 2],
+			self.reference.range_
+		)
+
+	def test_formula_coefficients(self):
+		'''Test coefficient caching'''
+
+		coefficients = self.mat.formula_coefficients(35)
+		numpy.testing.assert_allclose(
+			coefficients[1],
+			self.reference.coefficients[1] - 1e-4 * 20
+		)
+		self.assertIs(self.mat.formula_coefficients(35), coefficients)
+		self.assertEqual(
+			self.mat.formula_coefficients(numpy.array([20, 30])).shape,
+			(5, 2)
+		)
+
+		# Coefficient update clears cache
+		version = self.mat.version
+		values = self.mat.coefficients.copy()
+		values[1, 1] = -2e-4
+		self.mat.coefficients = values
+		self.assertNotEqual(self.mat.version, version)
+		numpy.testing.assert_allclose(
+			self.mat.formula_coefficients(35)[1],
+			self.reference.coefficients[1] - 2e-4 * 20
+		)
+
+	def test_backend(self):
+		'''Test per material backend selection'''
+
+		omega = ultrafast.frequency(numpy.linspace(0.5, 1.5, 101))
+		expected = self.mat.n(omega)
+		try:
+			ultrafast.jit.use("numba", self.mat)
+			self.assertIs(self.mat._kernels(), ultrafast.core._backends["numba"])
+			numpy.testing.assert_allclose(self.mat.n(omega), expected, rtol=1e-14)
+			ultrafast.jit.use("numba")
+			ultrafast.jit.use("numpy", self.mat)
+			self.assertIs(self.mat._kernels(), ultrafast.core._formulas)
+		finally:
+			ultrafast.jit.use("numpy")
+
+
+if __name__ == "__main__":
+	unittest.main()
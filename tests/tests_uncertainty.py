@@ -0,0 +1,89 @@
+"""Tests for uncertainty functionality"""
+
+import unittest
+import ultrafast
+import ultrafast.uncertainty
+import numpy
+import os
+import tempfile
+
+
+class TestUncertaintyEnsemble(unittest.TestCase):
+
+	def setUp(self):
+		'''Write test database entry (fused silica) and instantiate material'''
+
+		self.directory = tempfile.TemporaryDirectory()
+		path = os.path.join(self.directory.name, "FusedSilica.yml")
+		with open(path, "w") as file:
+			file.write(
+				"DATA:\n  - type: formula 1\n    range: 0.21 6.7\n"
+				"    coefficients: 0 0.6961663 0.0684043 0.4079426 0.1162414 "
+				"0.8974794 9.896161\n"
+			)
+		self.mat = ultrafast.RIIDMaterial(path)
+		self.omega = ultrafast.frequency(numpy.linspace(0.4, 1.6, 7))
+
+	def tearDown(self):
+		'''Remove test database entry'''
+		self.directory.cleanup()
+
+	def test_nominal(self):
+		'''Test zero covariance ensemble reproduces nominal material'''
+
+		ensemble = ultrafast.uncertainty.Ensemble(
+			self.mat, samples=5, covariance=numpy.zeros(7)
+		)
+		self.assertEqual(len(ensemble), 5)
+		for method in ("n", "wavevector", "group_index", "gvd", "tod"):
+			values = getattr(ensemble, method)(self.omega)
+			self.assertEqual(values.shape, (5, 7))
+			numpy.testing.assert_allclose(
+				values,
+				numpy.broadcast_to(getattr(self.mat, method)(self.omega), (5, 7)),
+				rtol=1e-9, atol=1e-12
+			)
+
+		# Scalar frequency
+		self.assertEqual(ensemble.gvd(self.omega[0]).shape, (5,))
+
+	def test_propagation(self):
+		'''Test sampled spread against linear error propagation'''
+
+		sigma = numpy.zeros(7)
+		sigma[1] = 1e-4
+		self.mat.covariance = numpy.diag(sigma ** 2)
+		ensemble = ultrafast.uncertainty.Ensemble(self.mat, 20000, seed=0)
+		self.assertEqual(ensemble.coefficients.shape, (20000, 7))
+
+		# dn/dB_1 = lambda^2 / (2 n (lambda^2 - C_1^2))
+		lambda_ = ultrafast.wavelength(self.omega)
+		dndB = lambda_ ** 2 / (
+			2 * self.mat.n(self.omega) * (lambda_ ** 2 - 0.0684043 ** 2)
+		)
+		numpy.testing.assert_allclose(
+			ensemble.n(self.omega).std(axis=0), sigma[1] * dndB, rtol=0.03
+		)
+		numpy.testing.assert_allclose(
+			ensemble.gvd(self.omega).mean(axis=0), self.mat.gvd(self.omega),
+			rtol=1e-3
+		)
+
+	def test_errors(self):
+		'''Test failures'''
+
+		# No covariance
+		self.assertRaises(
+			ultrafast.UltrafastError,
+			ultrafast.uncertainty.Ensemble, self.mat
+		)
+
+		# Covariance shape
+		self.assertRaises(
+			ultrafast.UltrafastError,
+			ultrafast.uncertainty.Ensemble, self.mat, 10, numpy.eye(3)
+		)
+
+		# Frequency range
+		ensemble = ultrafast.uncertainty.Ensemble(self.mat, 10, numpy.zeros(7))
+		self.assertRaises(ultrafast.RangeError, ensemble.n, 100.0)
@@ -0,0 +1,141 @@
+"""Tests for waveguide functionality"""
+
+import unittest
+import ultrafast
+import ultrafast.waveguides
+import numpy
+
+
+class TestCapillary(unittest.TestCase):
+
+	def setUp(self):
+		'''Instantiate air-filled capillary'''
+		self.capillary = ultrafast.waveguides.Capillary(radius=125)
+		self.omega = ultrafast.frequency(numpy.linspace(0.4, 1.6, 7))
+
+	def test_vacuum(self):
+		'''Test evacuated capillary against analytic dispersion'''
+
+		capillary = ultrafast.waveguides.Capillary(
+			ultrafast.Material(lambda omega: 1 + 0 * omega, (1, 10)), radius=50
+		)
+		omega = numpy.linspace(2, 5, 4)
+		q = 2.404825557695773 / 50
+		beta = numpy.sqrt(numpy.power(omega / ultrafast.c, 2) - q ** 2)
+		numpy.testing.assert_allclose(capillary.beta(omega), beta, rtol=1e-12)
+		numpy.testing.assert_allclose(
+			capillary.group_index(omega), omega / (ultrafast.c * beta), rtol=1e-6
+		)
+		numpy.testing.assert_allclose(
+			capillary.gvd(omega), -q ** 2 / (ultrafast.c ** 2 * beta ** 3),
+			rtol=1e-2
+		)
+
+	def test_gas(self):
+		'''Test gas pressure and temperature scaling'''
+
+		n = ultrafast.air.n(self.omega)
+		numpy.testing.assert_allclose(self.capillary.n(self.omega), n)
+		numpy.testing.assert_allclose(
+			self.capillary.n(self.omega, pressure=0), 1
+		)
+		numpy.testing.assert_allclose(
+			self.capillary.n(self.omega, pressure=2 * 101325.0) - 1,
+			2 * (n - 1), rtol=1e-3
+		)
+		numpy.testing.assert_allclose(
+			self.capillary.n(self.omega, temperature=2 * 288.15 - 273.15) - 1,
+			(n - 1) / 2, rtol=1e-3
+		)
+
+	def test_grid(self):
+		'''Test frequency x pressure x radius evaluation'''
+
+		pressure = numpy.array([0.5e5, 1e5, 2e5])[:, None, None]
+		radius = numpy.array([75.0, 125.0])[:, None]
+		gvd = self.capillary.gvd(self.omega, pressure, radius)
+		self.assertEqual(gvd.shape, (3, 2, 7))
+		numpy.testing.assert_allclose(
+			gvd[1, 1], self.capillary.gvd(self.omega, 1e5, 125.0)
+		)
+
+		# Gas normal, waveguide anomalous
+		self.assertTrue((numpy.diff(gvd, axis=0) > 0).all())
+		self.assertTrue((numpy.diff(gvd, axis=1) > 0).all())
+
+	def test_loss(self):
+		'''Test Marcatili-Schmeltzer loss'''
+
+		epsilon = 1.45 ** 2
+		loss = (
+			2 * (2.404825557695773 / (2 * ultrafast.pi)) ** 2 *
+			ultrafast.wavelength(self.omega) ** 2 *
+			(epsilon + 1) / (2 * numpy.sqrt(epsilon - 1)) / 125 ** 3
+		)
+		numpy.testing.assert_allclose(self.capillary.loss(self.omega), loss)
+		numpy.testing.assert_allclose(
+			self.capillary.loss(self.omega, radius=250), loss / 8
+		)
+		te = ultrafast.waveguides.Capillary(mode=("TE", 0, 1), radius=125)
+		numpy.testing.assert_allclose(
+			te.loss(self.omega) / loss,
+			(3.8317059702075125 / 2.404825557695773) ** 2 *
+			2 / (epsilon + 1)
+		)
+
+		with self.assertRaises(ultrafast.UltrafastError):
+			ultrafast.waveguides.Capillary(mode=("TE", 1, 1))
+
+	def test_zero_dispersion(self):
+		'''Test zero dispersion frequency and pressure'''
+
+		pressure = numpy.array([0.5e5, 1e5, 2e5])[:, None]
+		radius = numpy.array([75.0, 125.0])
+		omega = self.capillary.zero_dispersion(pressure, radius)
+		self.assertEqual(omega.shape, (3, 2))
+		numpy.testing.assert_allclose(
+			self.capillary.gvd(omega, pressure, radius), 0, atol=1e-8
+		)
+
+		# Higher pressure, lower zero dispersion frequency
+		self.assertTrue((numpy.diff(omega, axis=0) < 0).all())
+
+		# Operating pressure for zero dispersion frequency
+		# (to finite difference GVD precision)
+		operating = self.capillary.zero_dispersion_pressure(omega, radius)
+		numpy.testing.assert_allclose(
+			self.capillary.gvd(omega, operating, radius), 0, atol=1e-8
+		)
+		numpy.testing.assert_allclose(
+			operating, pressure * numpy.ones((1, 2)), rtol=1e-4
+		)
+
+		# No zero dispersion
+		self.assertTrue(numpy.isnan(self.capillary.zero_dispersion(1e5, 1e4)))
+		self.assertTrue(numpy.isnan(self.capillary.zero_dispersion_pressure(
+			ultrafast.frequency(1.0), 125.0, bounds=(2e5, 3e5)
+		)))
+
+		# Terminates at float resolution, fails without positive tolerance
+		numpy.testing.assert_allclose(
+			self.capillary.zero_dispersion_pressure(
+				omega[0, 0], radius[0], tolerance=1e-300
+			),
+			operating[0, 0], rtol=1e-6
+		)
+		with self.assertRaises(ultrafast.UltrafastError):
+			self.capillary.zero_dispersion_pressure(
+				omega[0, 0], radius[0], tolerance=0
+			)
+		numpy.testing.assert_allclose(
+			self.capillary.zero_dispersion(
+				pressure[0, 0], radius[0], tolerance=1e-300
+			),
+			omega[0, 0], rtol=1e-6
+		)
+		with self.assertRaises(ultrafast.UltrafastError):
+			self.capillary.zero_dispersion(tolerance=0)
+
+
+if __name__ == '__main__':
+	unittest.main()
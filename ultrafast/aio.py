@@ -0,0 +1,194 @@
+"""Ultrafast aio module
+
+This module contains an asyncio interface for loading
+:class:`ultrafast.core.RIIDMaterial` instances without blocking the event loop,
+e.g. in asyncio based services:
+
+	>>> material = await ultrafast.aio.load(
+	... 	"https://refractiveindex.info/database/data/glass/schott/N-BK7.yml",
+	... 	timeout=10
+	... )
+
+Fetching (HTTP or local file) and YAML parsing are run in an executor (by
+default that of the event loop), a bounded number of entries at a time.
+Concurrent requests for the same entry share a single load, and loaded
+materials are registered in :mod:`ultrafast.registry` (i.e. shared with
+synchronous code). Cancelling or timing out a request does not cancel the load
+shared by other requests for the same entry.
+
+This file is part of ultrafast. ultrafast is free software: you can
+redistribute it and/or modify it under the terms of the GNU General Public
+License as published by the Free Software Foundation, either version 3 of the
+License, or any later version. ultrafast is distributed in the hope that it
+will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty
+of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General
+Public License for more details. You should have received a copy of the GNU
+General Public License along with ultrafast. If not, see
+<http://www.gnu.org/licenses/>.
+
+Copyright © 2016 Marcelo J P Alcocer
+"""
+
+# Imports
+import asyncio
+from urllib.parse import urlparse
+import urllib.request
+import weakref
+import yaml
+from .core import RIIDMaterial
+from . import core
+from . import profiling
+from . import registry
+
+
+def _read(source, timeout):
+	"""Fetch and parse database entry *source* (blocking)"""
+	with profiling.phase(source, "fetch"):
+		if(urlparse(source).scheme != ""):
+			with urllib.request.urlopen(source, timeout=timeout) as file:
+				document = file.read()
+		else:
+			with open(source, "rb") as file:
+				document = file.read()
+	with profiling.phase(source, "parse"):
+		return(yaml.load(document, Loader=core._Loader))
+
+
+def _resolve(source):
+	"""Registry key and registered material (or None) of *source* (blocking)"""
+	return((registry.key(source), registry.lookup(source)))
+
+
+def _build(source, timeout):
+	"""Load and register database entry *source* (blocking)"""
+	material = registry.lookup(source)
+	if(material is None):
+		material = registry.setdefault(
+			source, RIIDMaterial.from_entry(_read(source, timeout), name=source)
+		)
+	return(material)
+
+
+class Loader:
+	"""Asynchronous material loader class"""
+
+	limit = None
+	"""Maximum number of concurrent loads"""
+
+	timeout = None
+	"""Default request (and HTTP fetch) timeout in seconds"""
+
+	executor = None
+	"""Executor of blocking operations"""
+
+	def __init__(self, limit=16, timeout=None, executor=None):
+		"""Loader class init
+
+		:param limit:	Maximum number of concurrent loads
+		:type limit:	int
+		:param timeout:	Default request timeout in seconds
+		:type timeout:	float
+		:param executor:	Executor of blocking operations
+		:type executor:	:class:`concurrent.futures.Executor`
+
+		Class describing a loader of RefractiveIndex.info database entries,
+		fetching and parsing at most *limit* entries at a time in *executor* (by
+		default that of the event loop). HTTP fetches time out after *timeout*
+		seconds, which is also the default request timeout. A loader may be used
+		from several event loops.
+		"""
+		self.limit = limit
+		self.timeout = timeout
+		self.executor = executor
+		self._loops = weakref.WeakKeyDictionary()
+
+	def _state(self):
+		"""(semaphore, in-flight loads) of the running event loop"""
+		loop = asyncio.get_running_loop()
+		state = self._loops.get(loop)
+		if(state is None):
+			state = (asyncio.Semaphore(self.limit), {})
+			self._loops[loop] = state
+		return(state)
+
+	async def _load(self, source, semaphore):
+		"""Load database entry *source*"""
+		async with semaphore:
+			return(await asyncio.get_running_loop().run_in_executor(
+				self.executor, _build, source, self.timeout
+			))
+
+	async def get(self, source, timeout=None):
+		"""Load material
+
+		:param source:	Database entry (path or URL)
+		:type source:	string
+		:param timeout:	Request timeout in seconds
+		:type timeout:	float
+
+		Returns the :class:`ultrafast.core.RIIDMaterial` of the database entry
+		*source*, as :func:`ultrafast.registry.get`. Raises
+		:class:`asyncio.TimeoutError` if not loaded within *timeout* (by default
+		:attr:`timeout`) seconds, in which case the load continues for other
+		requests of the same entry.
+
+		Path resolution, registry lookup, fetching, parsing and building all run
+		in :attr:`executor`, such that the event loop never blocks on I/O.
+		"""
+		if(timeout is None):
+			timeout = self.timeout
+		key, material = await asyncio.get_running_loop().run_in_executor(
+			self.executor, _resolve, source
+		)
+		if(material is not None):
+			return(material)
+
+		# Share in-flight load
+		semaphore, loads = self._state()
+		task = loads.get(key)
+		if(task is None):
+			task = asyncio.ensure_future(
+				self._load(source, semaphore)
+			)
+			loads[key] = task
+
+			def done(task):
+				if(loads.get(key) is task):
+					del loads[key]
+				if(not task.cancelled()):
+					task.exception()	# Retrieved (e.g. after all requests time out)
+			task.add_done_callback(done)
+		return(await asyncio.wait_for(asyncio.shield(task), timeout))
+
+	async def gather(self, sources, timeout=None):
+		"""Load materials
+
+		:param sources:	Database entries (paths or URLs)
+		:type sources:	list of string
+		:param timeout:	Request timeout in seconds
+		:type timeout:	float
+
+		Returns the list of materials of the database entries *sources* (see
+		:meth:`get`), loaded concurrently.
+		"""
+		return(list(await asyncio.gather(*(
+			self.get(source, timeout) for source in sources
+		))))
+
+
+_loader = Loader()
+"""Default loader"""
+
+
+async def load(source, timeout=None):
+	"""Load material
+
+	:param source:	Database entry (path or URL)
+	:type source:	string
+	:param timeout:	Request timeout in seconds
+	:type timeout:	float
+
+	Returns the :class:`ultrafast.core.RIIDMaterial` of the database entry
+	*source*, loaded by the default :class:`Loader`.
+	"""
+	return(await _loader.get(source, timeout))
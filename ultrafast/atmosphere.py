@@ -0,0 +1,248 @@
+"""Ultrafast atmosphere module
+
+This module contains a full implementation of the Ciddor (1996) equations for
+the refractive index of moist air, including the dependence upon temperature,
+pressure, humidity and CO2 content.
+
+:attr:`ultrafast.core.air` describes standard air (dry air at 15 °C, 101325 Pa
+and 450 ppm CO2). Use :func:`ciddor` to describe air under arbitrary lab
+conditions. All arguments are broadcast against each other, such that e.g. a
+log of environmental conditions is evaluated against a spectral grid in one
+call.
+
+This file is part of ultrafast. ultrafast is free software: you can
+redistribute it and/or modify it under the terms of the GNU General Public
+License as published by the Free Software Foundation, either version 3 of the
+License, or any later version. ultrafast is distributed in the hope that it
+will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty
+of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General
+Public License for more details. You should have received a copy of the GNU
+General Public License along with ultrafast. If not, see
+<http://www.gnu.org/licenses/>.
+
+Copyright © 2016 Marcelo J P Alcocer
+"""
+
+# Imports
+from collections import OrderedDict
+import threading
+import numpy
+from .core import Material, frequency, wavelength
+
+references = (
+	"P. E. Ciddor. Refractive index of air: new equations for the visible and "
+	"near infrared, Appl. Optics 35, 1566-1573 (1996)"
+)
+"""Reference string"""
+
+range_ = (frequency(1.69), frequency(0.23))
+"""Frequency range
+
+Range of angular frequencies (:math:`rad/fs`) over which the Ciddor equations
+are valid
+"""
+
+_cache_size = 128
+"""Maximum number of cached condition sets"""
+
+_cache = OrderedDict()
+"""Cached instances, keyed by condition set"""
+
+_cache_lock = threading.Lock()
+"""Cache lock"""
+
+# Dispersion of standard air (k) and standard water vapour (w)
+_k = (238.0185, 5792105, 57.362, 167917)
+_w = (295.235, 2.6422, -0.032380, 0.004028)
+_cf = 1.022
+
+# Saturation vapour pressure (A, B, C, D) and enhancement factor (alpha, beta,
+# gamma)
+_svp = (1.2378847e-5, -1.9121316e-2, 33.93711047, -6.3431645e3)
+_enhancement = (1.00062, 3.14e-8, 5.6e-7)
+
+# Compressibility (a0, a1, a2, b0, b1, c0, c1, d, e)
+_z = (
+	1.58123e-6, -2.9331e-8, 1.1043e-10,
+	5.707e-6, -2.051e-8,
+	1.9898e-4, -2.376e-6,
+	1.83e-11, -0.765e-8
+)
+
+_R = 8.314510
+"""Gas constant in :math:`J / (mol K)`"""
+
+_Mw = 0.018015
+"""Molar mass of water vapour in :math:`kg / mol`"""
+
+
+def _compressibility(p, T, x_w):
+	"""Compressibility of moist air
+
+	:param p:	Pressure in :math:`Pa`
+	:param T:	Temperature in :math:`K`
+	:param x_w:	Molar fraction of water vapour
+	"""
+	a0, a1, a2, b0, b1, c0, c1, d, e = _z
+	t = T - 273.15
+	return(
+		1 -
+		(p / T) * (
+			a0 + a1 * t + a2 * t ** 2 +
+			(b0 + b1 * t) * x_w +
+			(c0 + c1 * t) * x_w ** 2
+		) +
+		(p / T) ** 2 * (d + e * x_w ** 2)
+	)
+
+
+def _density_factors(temperature, pressure, humidity, co2):
+	"""Density factors
+
+	:param temperature:	Temperature in :math:`°C`
+	:param pressure:	Pressure in :math:`Pa`
+	:param humidity:	Relative humidity (0 to 1)
+	:param co2:	CO2 content in :math:`ppm`
+
+	Returns the 2-tuple of factors by which the refractivities of standard dry
+	air and standard water vapour are scaled, i.e.
+	:math:`n - 1 = F_a (n_{as} - 1) + F_w (n_{ws} - 1)`. These depend only upon
+	the conditions, not the frequency.
+	"""
+	t = numpy.asarray(temperature, dtype=float)
+	p = numpy.asarray(pressure, dtype=float)
+	h = numpy.asarray(humidity, dtype=float)
+	x_c = numpy.asarray(co2, dtype=float)
+	T = t + 273.15
+
+	# Molar fraction of water vapour
+	A, B, C, D = _svp
+	alpha, beta, gamma = _enhancement
+	svp = numpy.exp(A * T ** 2 + B * T + C + D / T)
+	x_w = (alpha + beta * p + gamma * t ** 2) * h * svp / p
+
+	# Molar mass of dry air
+	M_a = 1e-3 * (28.9635 + 12.011e-6 * (x_c - 400))
+
+	# Densities of standard dry air and standard water vapour
+	rho_axs = 101325 * M_a / (_compressibility(101325, 288.15, 0) * _R * 288.15)
+	rho_ws = 1333 * _Mw / (_compressibility(1333, 293.15, 1) * _R * 293.15)
+
+	# Densities of dry air and water vapour components
+	Z = _compressibility(p, T, x_w)
+	rho_a = p * M_a * (1 - x_w) / (Z * _R * T)
+	rho_w = p * _Mw * x_w / (Z * _R * T)
+
+	return(
+		(rho_a / rho_axs) * (1 + 0.534e-6 * (x_c - 450)),
+		rho_w / rho_ws
+	)
+
+
+def _refractivities(omega):
+	"""Refractivities of standard dry air and standard water vapour
+
+	:param omega:	Angular frequency in :math:`rad / fs`
+
+	Returns the 2-tuple :math:`(n_{as} - 1, n_{ws} - 1)`.
+	"""
+	sigma2 = numpy.power(wavelength(numpy.asarray(omega, dtype=float)), -2)
+	k0, k1, k2, k3 = _k
+	w0, w1, w2, w3 = _w
+	return(
+		1e-8 * (k1 / (k0 - sigma2) + k3 / (k2 - sigma2)),
+		1e-8 * _cf * (w0 + sigma2 * (w1 + sigma2 * (w2 + sigma2 * w3)))
+	)
+
+
+def refractive_index(
+	omega,
+	temperature=15.0,
+	pressure=101325.0,
+	humidity=0.0,
+	co2=450.0
+):
+	"""Refractive index of moist air
+
+	:param omega:	Angular frequency in :math:`rad / fs`
+	:type omega:	float, array_like
+	:param temperature:	Temperature in :math:`°C`
+	:type temperature:	float, array_like
+	:param pressure:	Pressure in :math:`Pa`
+	:type pressure:	float, array_like
+	:param humidity:	Relative humidity (0 to 1)
+	:type humidity:	float, array_like
+	:param co2:	CO2 content in :math:`ppm`
+	:type co2:	float, array_like
+
+	Returns the refractive index of air according to the full Ciddor (1996)
+	equations. All arguments are broadcast against each other. No range
+	assertion is performed; see :func:`ciddor` for a range-checked
+	:class:`ultrafast.core.Material`.
+	"""
+	factor_a, factor_w = _density_factors(temperature, pressure, humidity, co2)
+	n_as, n_ws = _refractivities(omega)
+	return(1 + factor_a * n_as + factor_w * n_ws)
+
+
+def _key(value):
+	"""Hashable cache key of a scalar or array condition"""
+	value = numpy.asarray(value, dtype=float)
+	if(value.ndim == 0):
+		return(float(value))
+	return((value.shape, value.tobytes()))
+
+
+def ciddor(temperature=15.0, pressure=101325.0, humidity=0.0, co2=450.0):
+	"""Air material factory
+
+	:param temperature:	Temperature in :math:`°C`
+	:type temperature:	float, array_like
+	:param pressure:	Pressure in :math:`Pa`
+	:type pressure:	float, array_like
+	:param humidity:	Relative humidity (0 to 1)
+	:type humidity:	float, array_like
+	:param co2:	CO2 content in :math:`ppm`
+	:type co2:	float, array_like
+
+	Returns an :class:`ultrafast.core.Material` describing air under the given
+	conditions according to the full Ciddor (1996) equations.
+
+	The condition-dependent density factors are evaluated once at construction,
+	such that evaluating the dispersion function only costs the two
+	frequency-dependent terms. Array conditions are broadcast against the
+	frequency, e.g. for logged conditions of shape (M, 1) and a spectral grid of
+	shape (N,), :attr:`ultrafast.core.Material.n` returns an (M, N) array.
+
+	Instances are cached per condition set, such that repeated calls with equal
+	conditions return the same instance.
+	"""
+	key = tuple(_key(x) for x in (temperature, pressure, humidity, co2))
+	with _cache_lock:
+		if(key in _cache):
+			_cache.move_to_end(key)
+			return(_cache[key])
+
+	factor_a, factor_w = _density_factors(temperature, pressure, humidity, co2)
+
+	def n(omega):
+		n_as, n_ws = _refractivities(omega)
+		return(1 + factor_a * n_as + factor_w * n_ws)
+
+	# Name scalar condition sets
+	if(all(isinstance(x, float) for x in key)):
+		name = "Air ({} °C, {} Pa, {:g}% RH, {} ppm CO2)".format(
+			key[0], key[1], 100 * key[2], key[3]
+		)
+	else:
+		name = "Air"
+
+	material = Material(
+		n, range_, name=name, references=references,
+		comments="Ciddor (1996) equations"
+	)
+	with _cache_lock:
+		material = _cache.setdefault(key, material)
+		while(len(_cache) > _cache_size):
+			_cache.popitem(last=False)
+	return(material)
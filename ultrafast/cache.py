@@ -0,0 +1,256 @@
+"""Ultrafast cache module
+
+This module contains a persistent (disk-backed) cache of material evaluations,
+such that the same tables of e.g. refractive index or GVD on the same frequency
+grid are computed once across runs and sessions:
+
+	>>> cache = ultrafast.cache.DiskCache(size=2 ** 30)
+	>>> gvd = cache.evaluate(material, "gvd", omega)
+
+Results are keyed by a stable hash of the material definition (class,
+dispersion formula, coefficients and range), the quantity and the frequency
+grid (shape, type and values). Each result is stored as a NumPy ``.npy`` file,
+loaded on a hit as a read-only memory-mapped array (i.e. without copying or
+reading the file up front). The total size of the cache is bounded, evicting
+least recently used results first.
+
+Cache files are written atomically, such that a cache directory may be shared
+between concurrent processes.
+
+This file is part of ultrafast. ultrafast is free software: you can
+redistribute it and/or modify it under the terms of the GNU General Public
+License as published by the Free Software Foundation, either version 3 of the
+License, or any later version. ultrafast is distributed in the hope that it
+will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty
+of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General
+Public License for more details. You should have received a copy of the GNU
+General Public License along with ultrafast. If not, see
+<http://www.gnu.org/licenses/>.
+
+Copyright © 2016 Marcelo J P Alcocer
+"""
+
+# Imports
+import hashlib
+import os
+import tempfile
+import numpy
+from .core import RIIDMaterial, UltrafastError
+from . import core
+
+quantities = ("n", "wavevector", "group_index", "gvd", "tod")
+"""Cacheable quantities (:class:`ultrafast.core.Material` method names)"""
+
+_format = 1
+"""Cache key format version"""
+
+
+def _definition(material):
+	"""Stable material definition
+
+	Returns the bytes uniquely defining the dispersion of *material*, or None if
+	it cannot be derived (i.e. for materials other than formula based
+	:class:`ultrafast.core.RIIDMaterial` instances).
+	"""
+	if(
+		not isinstance(material, RIIDMaterial) or material.formula is None or
+		material._function is not material._formula_function
+	):
+		return(None)
+	return(b"|".join((
+		type(material).__qualname__.encode(),
+		str(material.formula).encode(),
+		numpy.ascontiguousarray(material._coefficients, dtype=float).tobytes(),
+		numpy.array(material.range_, dtype=float).tobytes(),
+	)))
+
+
+class DiskCache:
+	"""Disk cache class"""
+
+	directory = None
+	"""Cache directory"""
+
+	size = None
+	"""Maximum total size of cached results in bytes"""
+
+	def __init__(self, directory=None, size=2 ** 30):
+		"""DiskCache class init
+
+		:param directory:	Cache directory
+		:type directory:	string
+		:param size:	Maximum total size of cached results in bytes
+		:type size:	int
+
+		Class describing a size bounded, persistent cache of material evaluations
+		stored in *directory* (created if required). By default *directory* is
+		``ultrafast`` in the user cache directory (``$XDG_CACHE_HOME`` or
+		``~/.cache``).
+		"""
+		if(directory is None):
+			directory = os.path.join(
+				os.environ.get("XDG_CACHE_HOME") or
+				os.path.join(os.path.expanduser("~"), ".cache"),
+				"ultrafast"
+			)
+		os.makedirs(directory, exist_ok=True)
+		self.directory = directory
+		self.size = size
+
+	def key(self, material, quantity, omega, definition=None):
+		"""Result key
+
+		:param material:	Material
+		:type material:	:class:`ultrafast.core.Material`
+		:param quantity:	Quantity (see :data:`quantities`)
+		:type quantity:	string
+		:param omega:	Angular frequency in :math:`rad / fs`
+		:type omega:	array_like
+		:param definition:	Material definition
+		:type definition:	bytes, string
+
+		Returns the hexadecimal key of *quantity* of *material* at the angular
+		frequencies *omega*, or None if the material definition is unknown. The
+		*definition* of materials other than formula based
+		:class:`ultrafast.core.RIIDMaterial` instances must be given explicitly,
+		and must change whenever their dispersion does.
+		"""
+		if(quantity not in quantities):
+			raise UltrafastError("Unknown quantity: {}".format(quantity))
+		if(definition is None):
+			definition = _definition(material)
+			if(definition is None):
+				return(None)
+		elif(isinstance(definition, str)):
+			definition = definition.encode()
+		omega = numpy.ascontiguousarray(omega)
+		digest = hashlib.blake2b(digest_size=20)
+		for part in (
+			str(_format).encode(),
+			definition,
+			quantity.encode(),
+			repr(core._stencils).encode() if quantity not in ("n", "wavevector")
+			else b"",
+			omega.dtype.str.encode(),
+			repr(omega.shape).encode(),
+		):
+			digest.update(part)
+			digest.update(b"|")
+		digest.update(omega.tobytes())
+		return(digest.hexdigest())
+
+	def _path(self, key):
+		"""Path of result *key*"""
+		return(os.path.join(self.directory, key + ".npy"))
+
+	def load(self, key):
+		"""Load result
+
+		:param key:	Result key
+		:type key:	string
+
+		Returns the result *key* as a read-only memory-mapped array, or None if not
+		cached. Marks the result as recently used.
+		"""
+		path = self._path(key)
+		try:
+			values = numpy.load(path, mmap_mode="r")
+			os.utime(path)
+		except (FileNotFoundError, ValueError):
+			return(None)
+		return(values)
+
+	def store(self, key, values):
+		"""Store result
+
+		:param key:	Result key
+		:type key:	string
+		:param values:	Result
+		:type values:	array_like
+
+		Stores *values* as the result *key*, evicting least recently used results
+		if the cache size is exceeded.
+		"""
+		descriptor, temporary = tempfile.mkstemp(
+			suffix=".tmp", dir=self.directory
+		)
+		try:
+			with os.fdopen(descriptor, "wb") as file:
+				numpy.save(file, numpy.asarray(values))
+			os.replace(temporary, self._path(key))
+		except BaseException:
+			os.unlink(temporary)
+			raise
+		self.evict()
+
+	def entries(self):
+		"""Cached results
+
+		Returns the list of (key, size in bytes, last use time) 3-tuples of all
+		cached results, least recently used first.
+		"""
+		entries = []
+		with os.scandir(self.directory) as iterator:
+			for entry in iterator:
+				if(not entry.name.endswith(".npy")):
+					continue
+				try:
+					stat = entry.stat()
+				except FileNotFoundError:
+					continue
+				entries.append((entry.name[:-4], stat.st_size, stat.st_mtime))
+		return(sorted(entries, key=lambda entry: entry[2]))
+
+	def evict(self, size=None):
+		"""Evict results
+
+		:param size:	Maximum total size in bytes
+		:type size:	int
+
+		Removes least recently used results until the total size of cached results
+		is at most *size* (by default :attr:`size`).
+		"""
+		if(size is None):
+			size = self.size
+		entries = self.entries()
+		total = sum(entry[1] for entry in entries)
+		for key, bytes_, _ in entries:
+			if(total <= size):
+				break
+			try:
+				os.unlink(self._path(key))
+			except FileNotFoundError:
+				pass
+			total -= bytes_
+
+	def clear(self):
+		"""Remove all cached results"""
+		self.evict(0)
+
+	def evaluate(self, material, quantity, omega, definition=None):
+		"""Cached evaluation
+
+		:param material:	Material
+		:type material:	:class:`ultrafast.core.Material`
+		:param quantity:	Quantity (see :data:`quantities`)
+		:type quantity:	string
+		:param omega:	Angular frequency in :math:`rad / fs`
+		:type omega:	array_like
+		:param definition:	Material definition
+		:type definition:	bytes, string
+
+		Returns *quantity* of *material* at the angular frequencies *omega*, loaded
+		from the cache (as a read-only memory-mapped array) if available, else
+		evaluated and stored. Materials of unknown definition (see :meth:`key`) are
+		evaluated without caching.
+		"""
+		omega = numpy.asarray(omega)
+		key = self.key(material, quantity, omega, definition)
+		if(key is not None):
+			values = self.load(key)
+			if(values is not None):
+				return(values)
+		values = getattr(material, quantity)(omega)
+		if(key is not None):
+			self.store(key, values)
+		return(values)
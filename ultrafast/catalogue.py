@@ -0,0 +1,340 @@
+"""Ultrafast catalogue module
+
+This module contains a search index over catalogues of materials, for choosing
+e.g. prism or window materials by their dispersive properties.
+
+Key quantities (refractive index, group index and GVD on a standard wavelength
+grid, Abbe number, zero-GVD wavelength and valid wavelength range) are
+precomputed once per material. Range and nearest-neighbour queries then reduce
+to vectorized operations across the whole catalogue:
+
+	>>> index = ultrafast.catalogue.Index(materials)
+	>>> index.query(0.8, n=(1.7, None), gvd=(None, 0.05))
+	['SF10', 'SF11', ...]
+
+Entries are (re)computed lazily and incrementally: adding, replacing,
+modifying (see :attr:`ultrafast.core.Material.version`) or removing an entry
+only evaluates the affected material on the next query.
+
+This file is part of ultrafast. ultrafast is free software: you can
+redistribute it and/or modify it under the terms of the GNU General Public
+License as published by the Free Software Foundation, either version 3 of the
+License, or any later version. ultrafast is distributed in the hope that it
+will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty
+of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General
+Public License for more details. You should have received a copy of the GNU
+General Public License along with ultrafast. If not, see
+<http://www.gnu.org/licenses/>.
+
+Copyright © 2016 Marcelo J P Alcocer
+"""
+
+# Imports
+import threading
+import numpy
+import yaml
+from .core import Material, UltrafastError, frequency, wavelength
+from . import registry
+
+grid = numpy.geomspace(0.2, 20, 1024)
+"""Standard wavelength grid
+
+Wavelengths in :math:`\\mu m` at which grid quantities are precomputed
+"""
+
+grid_quantities = ("n", "group_index", "gvd")
+"""Quantities tabulated on the standard grid (interpolated at query wavelength)"""
+
+scalar_quantities = ("abbe", "zero_gvd", "lambda_min", "lambda_max")
+"""Quantities independent of wavelength"""
+
+fraunhofer = {"d": 0.5875618, "F": 0.4861327, "C": 0.6562725}
+"""Fraunhofer line wavelengths in :math:`\\mu m` used for Abbe numbers"""
+
+_margin = 1e-3
+"""Relative margin to valid range edges for finite difference stencils"""
+
+
+def _evaluate(material):
+	"""Precompute index quantities of a material
+
+	Returns a dictionary of grid quantity rows and scalar quantities. Grid
+	points at which *material* is not valid (see
+	:meth:`ultrafast.core.Material.valid_mask`), e.g. outside its range or
+	close to poles, are NaN.
+	"""
+	lambda_min, lambda_max = (wavelength(x) for x in material.range_[::-1])
+	inside = material.valid_mask(frequency(grid), _margin)
+	omega = frequency(grid[inside])
+	row = {"lambda_min": lambda_min, "lambda_max": lambda_max}
+	with numpy.errstate(invalid="ignore", divide="ignore"):
+		for quantity in grid_quantities:
+			values = numpy.full(grid.shape, numpy.nan)
+			values[inside] = getattr(material, quantity)(omega)
+			row[quantity] = numpy.real_if_close(values).astype(float)
+
+		# Abbe number
+		lines = numpy.array([fraunhofer[x] for x in ("d", "F", "C")])
+		if(material.valid_mask(frequency(lines)).all()):
+			n_d, n_F, n_C = material.n(frequency(lines))
+			row["abbe"] = float((n_d - 1) / (n_F - n_C))
+		else:
+			row["abbe"] = numpy.nan
+
+	# Zero-GVD wavelength (first sign change, log-linear interpolation)
+	gvd = row["gvd"]
+	crossings = numpy.nonzero(
+		numpy.isfinite(gvd[:-1]) & numpy.isfinite(gvd[1:]) &
+		(numpy.sign(gvd[:-1]) * numpy.sign(gvd[1:]) < 0)
+	)[0]
+	if(crossings.size):
+		i = crossings[0]
+		x = numpy.log(grid[i:i + 2])
+		row["zero_gvd"] = float(numpy.exp(
+			x[0] - gvd[i] * (x[1] - x[0]) / (gvd[i + 1] - gvd[i])
+		))
+	else:
+		row["zero_gvd"] = numpy.nan
+	return(row)
+
+
+class Index:
+	"""Material catalogue index class"""
+
+	def __init__(self, materials=None):
+		"""Index class init
+
+		:param materials:	Catalogue entries
+		:type materials:	dict
+
+		Class describing a searchable index over a catalogue of materials.
+		*materials* maps entry keys (e.g. material names) to
+		:class:`ultrafast.core.Material` instances or RefractiveIndex.info
+		database entries (paths or URLs), which are loaded on first use through
+		:func:`ultrafast.registry.get` (i.e. shared with the rest of the process).
+		"""
+		self._lock = threading.RLock()
+		self._materials = {}
+		self._rows = {}
+		self._dirty = set()
+		self._tables = None
+		if(materials is not None):
+			for key, material in materials.items():
+				self.add(key, material)
+
+	def __len__(self):
+		return(len(self._materials))
+
+	def __contains__(self, key):
+		return(key in self._materials)
+
+	def __getitem__(self, key):
+		"""Catalogue material of entry *key*"""
+		with self._lock:
+			material = self._materials[key]
+			if(not isinstance(material, Material)):
+				material = registry.get(material)
+				self._materials[key] = material
+			return(material)
+
+	@property
+	def keys(self):
+		"""Entry keys
+
+		List of entry keys, in the order of the arrays returned by
+		:meth:`values`.
+		"""
+		self._refresh()
+		return(list(self._tables["keys"]))
+
+	def add(self, key, material):
+		"""Add or replace entry
+
+		:param key:	Entry key
+		:type key:	hashable
+		:param material:	Material or database entry (path or URL)
+		:type material:	:class:`ultrafast.core.Material`, string
+
+		Adds the entry *key*, replacing any existing entry of the same key. The
+		material is evaluated on the next query.
+		"""
+		with self._lock:
+			self._materials[key] = material
+			self._rows.pop(key, None)
+			self._dirty.add(key)
+			self._tables = None
+
+	def update(self, key):
+		"""Mark entry as changed
+
+		:param key:	Entry key
+		:type key:	hashable
+
+		Re-evaluates the material of entry *key* on the next query. Modifications
+		tracked by :attr:`ultrafast.core.Material.version` are detected
+		automatically; this is only required for untracked modifications.
+		"""
+		with self._lock:
+			if(key not in self._materials):
+				raise KeyError(key)
+			self._rows.pop(key, None)
+			self._dirty.add(key)
+			self._tables = None
+
+	def remove(self, key):
+		"""Remove entry
+
+		:param key:	Entry key
+		:type key:	hashable
+		"""
+		with self._lock:
+			del self._materials[key]
+			self._rows.pop(key, None)
+			self._dirty.discard(key)
+			self._tables = None
+
+	def _refresh(self):
+		"""Evaluate changed entries and rebuild query tables
+
+		Entries whose loading or evaluation fails (e.g. missing or malformed
+		database entries, invalid dispersion data) are indexed with NaN
+		quantities, such that they match no query. Failed loads are retried on
+		:meth:`update`.
+		"""
+		with self._lock:
+
+			# Entries whose material has been modified
+			for key, row in self._rows.items():
+				material = self._materials[key]
+				if(
+					isinstance(material, Material)
+					and row["version"] != material.version
+				):
+					self._dirty.add(key)
+					self._tables = None
+
+			if(self._tables is not None):
+				return
+			for key in list(self._dirty):
+				material = None
+				try:
+					material = self[key]
+					row = _evaluate(material)
+				except (UltrafastError, OSError, yaml.YAMLError):
+					row = {
+						quantity: numpy.full(grid.shape, numpy.nan)
+						for quantity in grid_quantities
+					}
+					row.update(dict.fromkeys(scalar_quantities, numpy.nan))
+				row["version"] = None if material is None else material.version
+				self._rows[key] = row
+				self._dirty.discard(key)
+			keys = list(self._materials)
+			tables = {"keys": keys}
+			for quantity in grid_quantities:
+				tables[quantity] = numpy.array(
+					[self._rows[key][quantity] for key in keys]
+				).reshape(len(keys), len(grid))
+			for quantity in scalar_quantities:
+				tables[quantity] = numpy.array(
+					[self._rows[key][quantity] for key in keys], dtype=float
+				)
+			self._tables = tables
+
+	def values(self, quantity, wavelength=None):
+		"""Quantity across catalogue
+
+		:param quantity:	Quantity name (see :data:`grid_quantities` and
+							:data:`scalar_quantities`)
+		:type quantity:	string
+		:param wavelength:	Wavelength in :math:`\\mu m` (grid quantities only)
+		:type wavelength:	float
+
+		Returns an array of *quantity* for every entry, ordered as :attr:`keys`.
+		Grid quantities are linearly interpolated (in log-wavelength) at
+		*wavelength*, and are NaN for entries whose range excludes it. GVD is in
+		:math:`fs^2 / \\mu m`.
+		"""
+		self._refresh()
+		tables = self._tables
+		if(quantity in scalar_quantities):
+			return(tables[quantity])
+		if(quantity not in grid_quantities):
+			raise UltrafastError("Unknown index quantity: {}".format(quantity))
+		if(wavelength is None):
+			raise UltrafastError(
+				"Wavelength required for quantity: {}".format(quantity)
+			)
+		if(not (grid[0] <= wavelength <= grid[-1])):
+			return(numpy.full(len(tables["keys"]), numpy.nan))
+		i = min(
+			numpy.searchsorted(grid, wavelength, side="right") - 1,
+			len(grid) - 2
+		)
+		weight = (
+			(numpy.log(wavelength) - numpy.log(grid[i])) /
+			(numpy.log(grid[i + 1]) - numpy.log(grid[i]))
+		)
+		table = tables[quantity]
+		return((1 - weight) * table[:, i] + weight * table[:, i + 1])
+
+	def query(self, wavelength=None, **conditions):
+		"""Range query
+
+		:param wavelength:	Wavelength in :math:`\\mu m`
+		:type wavelength:	float
+
+		Returns the list of entry keys satisfying all *conditions*, given as
+		keyword arguments ``quantity=(low, high)``, where either bound may be None.
+		Entries for which a quantity is undefined (NaN) never match.
+		"""
+		self._refresh()
+		match = numpy.ones(len(self._tables["keys"]), dtype=bool)
+		with numpy.errstate(invalid="ignore"):
+			for quantity, (low, high) in conditions.items():
+				values = self.values(quantity, wavelength)
+				match &= numpy.isfinite(values)
+				if(low is not None):
+					match &= values >= low
+				if(high is not None):
+					match &= values <= high
+		keys = self._tables["keys"]
+		return([keys[i] for i in numpy.nonzero(match)[0]])
+
+	def nearest(self, wavelength=None, k=1, scales=None, **targets):
+		"""Nearest-neighbour query
+
+		:param wavelength:	Wavelength in :math:`\\mu m`
+		:type wavelength:	float
+		:param k:	Number of neighbours
+		:type k:	int
+		:param scales:	Distance scale of each quantity
+		:type scales:	dict
+
+		Returns the list of (at most *k*) entry keys closest to the *targets*,
+		given as keyword arguments ``quantity=value``, ordered by increasing
+		distance. Distances are Euclidean in quantities normalized by *scales*,
+		which default to the standard deviation of each quantity across the
+		catalogue. Entries for which a quantity is undefined are excluded.
+		"""
+		self._refresh()
+		scales = {} if scales is None else scales
+		distance = numpy.zeros(len(self._tables["keys"]))
+		for quantity, target in targets.items():
+			values = self.values(quantity, wavelength)
+			if(quantity in scales):
+				scale = scales[quantity]
+			else:
+				finite = values[numpy.isfinite(values)]
+				scale = finite.std() if finite.size else 1.0
+			if(not scale):
+				scale = 1.0
+			distance += numpy.power((values - target) / scale, 2)
+		distance[~numpy.isfinite(distance)] = numpy.inf
+		k = min(k, int(numpy.isfinite(distance).sum()))
+		if(k <= 0):
+			return([])
+		nearest = numpy.argpartition(distance, k - 1)[:k]
+		nearest = nearest[numpy.argsort(distance[nearest])]
+		keys = self._tables["keys"]
+		return([keys[i] for i in nearest])
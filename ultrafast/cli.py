@@ -0,0 +1,316 @@
+"""Ultrafast command line module
+
+This module contains the ``ultrafast-dispersion`` console entry point, which
+tabulates the dispersion of RefractiveIndex.info database entries on a
+wavelength or frequency grid:
+
+.. code-block:: none
+
+	ultrafast-dispersion --wavelength 0.4 1.6 100000 --format npy BK7.yml
+
+For each entry, a table with columns ``omega`` (:math:`rad / fs`),
+``wavelength`` (:math:`\\mu m`), ``n``, ``group_index``, ``gvd``
+(:math:`fs^2 / \\mu m`) and ``tod`` (:math:`fs^3 / \\mu m`) is written as
+``.npy``, CSV or HDF5 (requires h5py). The grid is generated, evaluated and
+written chunk-by-chunk, such that the full table is never held in memory.
+Multiple entries are processed in parallel by a pool of worker processes.
+
+This file is part of ultrafast. ultrafast is free software: you can
+redistribute it and/or modify it under the terms of the GNU General Public
+License as published by the Free Software Foundation, either version 3 of the
+License, or any later version. ultrafast is distributed in the hope that it
+will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty
+of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General
+Public License for more details. You should have received a copy of the GNU
+General Public License along with ultrafast. If not, see
+<http://www.gnu.org/licenses/>.
+
+Copyright © 2016 Marcelo J P Alcocer
+"""
+
+# Imports
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import os
+import posixpath
+import sys
+from urllib.parse import urlparse, unquote
+import numpy
+import yaml
+from .core import (
+	RIIDMaterial, RangeError, UltrafastError, frequency, wavelength
+)
+from . import grids
+
+columns = ("omega", "wavelength", "n", "group_index", "gvd", "tod")
+"""Output table columns"""
+
+extensions = {"npy": "npy", "csv": "csv", "hdf5": "h5"}
+"""Output file extensions, keyed by format"""
+
+
+def grid(start, stop, num, chunk):
+	"""Chunked linear grid
+
+	:param start:	First grid point
+	:type start:	float
+	:param stop:	Last grid point
+	:type stop:	float
+	:param num:	Number of grid points
+	:type num:	int
+	:param chunk:	Maximum number of points per chunk
+	:type chunk:	int
+
+	Generator yielding consecutive chunks of ``numpy.linspace(start, stop,
+	num)`` without constructing the full grid.
+	"""
+	step = (stop - start) / (num - 1) if num > 1 else 0.0
+	for first in range(0, num, chunk):
+		index = numpy.arange(first, min(first + chunk, num))
+		yield(start + step * index)
+
+
+def table(material, omega):
+	"""Dispersion table
+
+	:param material:	Material
+	:type material:	:class:`ultrafast.core.Material`
+	:param omega:	Angular frequency in :math:`rad / fs`
+	:type omega:	array_like
+
+	Returns the dispersion table (see :data:`columns`) of *material* at the
+	angular frequencies *omega*, as an array of shape (len(*omega*), 6).
+
+	Raises RangeError for angular frequencies outside the range of *material*.
+	Within the range, quantities at angular frequencies at which they are not
+	valid (see :meth:`ultrafast.core.Material.valid_mask`) are NaN, e.g. close
+	to poles, or derivatives whose finite difference stencils would extend past
+	the range edges.
+	"""
+	omega = numpy.asarray(omega, dtype=float)
+	if(omega.size and not (
+		material.range_[0] <= omega.min() and omega.max() <= material.range_[1]
+	)):
+		raise RangeError(
+			omega,
+			material.range_,
+			"Angular frequency out of material range"
+		)
+	result = numpy.full((len(omega), len(columns)), numpy.nan)
+	result[:, 0] = omega
+	result[:, 1] = wavelength(omega)
+	for i, quantity in enumerate(columns[2:], 2):
+		valid = material.valid_mask(omega, grids.margin(quantity))
+		result[valid, i] = getattr(material, quantity)(omega[valid])
+	return(result)
+
+
+class _NPYWriter:
+	"""Chunked .npy writer"""
+
+	def __init__(self, path, rows):
+		self._array = numpy.lib.format.open_memmap(
+			path, mode="w+", dtype=float, shape=(rows, len(columns))
+		)
+		self._row = 0
+
+	def write(self, chunk):
+		self._array[self._row:self._row + len(chunk)] = chunk
+		self._array.flush()
+		self._row += len(chunk)
+
+	def close(self):
+		del self._array
+
+
+class _CSVWriter:
+	"""Chunked CSV writer"""
+
+	def __init__(self, path, rows):
+		self._stdout = path == "-"
+		self._file = sys.stdout if self._stdout else open(path, "w")
+		self._file.write("# " + ",".join(columns) + "\n")
+
+	def write(self, chunk):
+		numpy.savetxt(self._file, chunk, delimiter=",", fmt="%.17g")
+		self._file.flush()
+
+	def close(self):
+		if(not self._stdout):
+			self._file.close()
+
+
+class _HDF5Writer:
+	"""Chunked HDF5 writer"""
+
+	def __init__(self, path, rows):
+		try:
+			import h5py
+		except ImportError:
+			raise UltrafastError("HDF5 output requires h5py")
+		self._file = h5py.File(path, "w")
+		self._dataset = self._file.create_dataset(
+			"dispersion", shape=(rows, len(columns)), dtype=float
+		)
+		self._dataset.attrs["columns"] = ",".join(columns)
+		self._row = 0
+
+	def write(self, chunk):
+		self._dataset[self._row:self._row + len(chunk)] = chunk
+		self._row += len(chunk)
+
+	def close(self):
+		self._file.close()
+
+
+_writers = {"npy": _NPYWriter, "csv": _CSVWriter, "hdf5": _HDF5Writer}
+"""Output writers, keyed by format"""
+
+
+def tabulate(source, path, format_, spec, chunk):
+	"""Tabulate a database entry
+
+	:param source:	RefractiveIndex.info database entry (path or URL)
+	:type source:	string
+	:param path:	Output path (``-`` for standard output, CSV only)
+	:type path:	string
+	:param format_:	Output format (``npy``, ``csv`` or ``hdf5``)
+	:type format_:	string
+	:param spec:	Grid specification (quantity, start, stop, num)
+	:type spec:	tuple
+	:param chunk:	Maximum number of rows per chunk
+	:type chunk:	int
+
+	Streams the dispersion table of *source* to *path*. Returns *path*.
+	"""
+	quantity, start, stop, num = spec
+	material = RIIDMaterial(source)
+	writer = _writers[format_](path, num)
+	try:
+		for values in grid(start, stop, num, chunk):
+			omega = frequency(values) if quantity == "wavelength" else values
+			writer.write(table(material, omega))
+	finally:
+		writer.close()
+	return(path)
+
+
+def _name(source):
+	"""Output name of a database entry (file name without extension)"""
+	path = source
+	if(urlparse(source).scheme != ""):
+		path = unquote(urlparse(source).path)
+	return(posixpath.splitext(os.path.basename(path))[0])
+
+
+def parser():
+	"""Command line argument parser"""
+	parser = argparse.ArgumentParser(
+		prog="ultrafast-dispersion",
+		description=(
+			"Tabulate n, group index, GVD and TOD of RefractiveIndex.info "
+			"database entries"
+		)
+	)
+	parser.add_argument(
+		"sources", nargs="+", metavar="SOURCE",
+		help="database entry (YAML path or URL)"
+	)
+	spec = parser.add_mutually_exclusive_group(required=True)
+	spec.add_argument(
+		"--wavelength", nargs=3, type=float, metavar=("START", "STOP", "NUM"),
+		help="linear wavelength grid in um"
+	)
+	spec.add_argument(
+		"--frequency", nargs=3, type=float, metavar=("START", "STOP", "NUM"),
+		help="linear angular frequency grid in rad/fs"
+	)
+	parser.add_argument(
+		"--format", choices=sorted(_writers), default="npy",
+		help="output format (default: npy)"
+	)
+	parser.add_argument(
+		"--output", default="{name}.{ext}",
+		help=(
+			"output path template, formatted with the entry {name} and "
+			"format {ext}; '-' writes CSV to standard output "
+			"(default: {name}.{ext})"
+		)
+	)
+	parser.add_argument(
+		"--chunk", type=int, default=65536,
+		help="rows per chunk (default: 65536)"
+	)
+	parser.add_argument(
+		"--jobs", type=int, default=None,
+		help="worker processes (default: number of CPUs)"
+	)
+	return(parser)
+
+
+def main(argv=None):
+	"""Console entry point
+
+	:param argv:	Command line arguments
+	:type argv:	list
+
+	Returns the process exit status: 0 on success, 1 on failure to tabulate
+	(e.g. missing or malformed database entries) and 2 on invalid arguments
+	(e.g. non-positive number of points, several sources written to one output
+	path).
+	"""
+	args = parser().parse_args(argv)
+	quantity = "wavelength" if args.wavelength is not None else "frequency"
+	start, stop, num = getattr(args, quantity)
+	if(not num >= 1 or num != int(num) or args.chunk < 1):
+		sys.stderr.write(
+			"ultrafast-dispersion: NUM and --chunk must be positive integers\n"
+		)
+		return(2)
+	spec = (quantity, start, stop, int(num))
+
+	# Output paths
+	if(args.output == "-"):
+		if(args.format != "csv" or len(args.sources) != 1):
+			sys.stderr.write(
+				"ultrafast-dispersion: standard output requires CSV format and "
+				"a single source\n"
+			)
+			return(2)
+		paths = ["-"]
+	else:
+		paths = [
+			args.output.format(name=_name(source), ext=extensions[args.format])
+			for source in args.sources
+		]
+		resolved = [os.path.abspath(path) for path in paths]
+		for i, path in enumerate(resolved):
+			if(path in resolved[:i]):
+				sys.stderr.write(
+					"ultrafast-dispersion: several sources resolve to output path "
+					"{}\n".format(paths[i])
+				)
+				return(2)
+
+	# Tabulate
+	jobs = [
+		(source, path, args.format, spec, args.chunk)
+		for source, path in zip(args.sources, paths)
+	]
+	try:
+		if(len(jobs) == 1 or args.jobs == 1):
+			for job in jobs:
+				tabulate(*job)
+		else:
+			with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+				futures = [pool.submit(tabulate, *job) for job in jobs]
+				for future in futures:
+					future.result()
+	except (UltrafastError, OSError, ValueError, yaml.YAMLError) as error:
+		sys.stderr.write("ultrafast-dispersion: {}\n".format(error))
+		return(1)
+	return(0)
+
+
+if __name__ == "__main__":
+	sys.exit(main())
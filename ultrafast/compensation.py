@@ -0,0 +1,440 @@
+"""Ultrafast compensation module
+
+This module contains a dispersion compensation optimizer, searching sets of
+candidate materials (e.g. a loaded :class:`ultrafast.catalogue.Index`) for the
+combinations and thicknesses of windows, plates or prism insertions best
+cancelling a measured residual spectral phase:
+
+	>>> compensator = ultrafast.compensation.Compensator(index, omega)
+	>>> compensator.search(phase, size=2)
+	[({'BK7': 2012.4, 'SF10': 987.1}, 0.0031), ...]
+
+Constant and linear (group delay) phase components are irrelevant and are
+projected out. The wavevector of each candidate is evaluated once on the target
+grid and cached (against its :attr:`ultrafast.core.Material.version`), and the
+weighted least squares problem of every combination reduces to its block of the
+Gram matrix of the cached wavevectors. Combinations are then solved in batches
+of small linear systems independent of the grid size, distributed across worker
+processes.
+
+Combinations whose least squares solution is not strictly positive are pruned,
+as their best physical (non-negative) solution is that of one of their subsets,
+already found at a lower level. Near degenerate combinations (collinear
+wavevectors) are pruned likewise. Larger combinations may optionally be
+restricted to extensions of the best combinations of the level below (beam
+search).
+
+This file is part of ultrafast. ultrafast is free software: you can
+redistribute it and/or modify it under the terms of the GNU General Public
+License as published by the Free Software Foundation, either version 3 of the
+License, or any later version. ultrafast is distributed in the hope that it
+will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty
+of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General
+Public License for more details. You should have received a copy of the GNU
+General Public License along with ultrafast. If not, see
+<http://www.gnu.org/licenses/>.
+
+Copyright © 2016 Marcelo J P Alcocer
+"""
+
+# Imports
+from concurrent.futures import ProcessPoolExecutor
+import threading
+import numpy
+from scipy.optimize import nnls
+from .core import UltrafastError
+from .catalogue import Index
+from . import elements
+
+_state = None
+"""Worker process search state (see :func:`_initialize`)"""
+
+
+def _initialize(state):
+	"""Worker process initializer
+
+	Stores the search *state* (see :func:`_solve`) once per worker process,
+	such that only combinations are sent with each task.
+	"""
+	global _state
+	_state = state
+
+
+def _work(task):
+	"""Worker process task (see :func:`_solve`)"""
+	return(_solve(_expand(*task), _state))
+
+
+def _expand(prefixes, count):
+	"""Expand combinations
+
+	Returns the array of combinations (index rows) extending each row of the
+	array *prefixes* by every index above its last, up to *count*. If *count* is
+	None, returns *prefixes*.
+	"""
+	prefixes = numpy.asarray(prefixes, dtype=numpy.intp)
+	if(count is None):
+		return(prefixes)
+	if(prefixes.shape[1] == 0):
+		return(numpy.arange(count, dtype=numpy.intp)[:, None])
+	lengths = count - 1 - prefixes[:, -1]
+	offsets = numpy.repeat(numpy.cumsum(lengths) - lengths, lengths)
+	last = (
+		numpy.arange(lengths.sum(), dtype=numpy.intp) - offsets +
+		numpy.repeat(prefixes[:, -1] + 1, lengths)
+	)
+	return(numpy.concatenate(
+		(numpy.repeat(prefixes, lengths, axis=0), last[:, None]), axis=1
+	))
+
+
+def _solve(subsets, state):
+	"""Solve combinations
+
+	Solves the least squares problems of the array of combinations (index rows)
+	*subsets*, given the *state* 6-tuple of (Gram matrix, projected target
+	vector, target norm, degeneracy tolerance, total thickness limit, number of
+	solutions kept). Returns the 3-tuple of arrays of the kept (lowest residual)
+	combinations, their thicknesses and squared residuals.
+	"""
+	gram, target, norm, tolerance, limit, keep = state
+	subsets = numpy.asarray(subsets, dtype=numpy.intp)
+	size = subsets.shape[1]
+	blocks = gram[subsets[:, :, None], subsets[:, None, :]]
+	vectors = target[subsets]
+
+	# Degenerate combinations (correlation matrix determinant)
+	scale = numpy.sqrt(numpy.diagonal(blocks, axis1=1, axis2=2))
+	if(size > 1):
+		correlation = blocks / (scale[:, :, None] * scale[:, None, :])
+		valid = numpy.linalg.det(correlation) > tolerance
+	else:
+		valid = numpy.ones(len(subsets), dtype=bool)
+
+	# Solve, keeping strictly positive solutions
+	thicknesses = numpy.zeros(vectors.shape)
+	if(valid.any()):
+		thicknesses[valid] = numpy.linalg.solve(
+			blocks[valid], vectors[valid][:, :, None]
+		)[:, :, 0]
+	valid &= (thicknesses > 0).all(axis=1)
+	if(limit is not None):
+		valid &= thicknesses.sum(axis=1) <= limit
+	residuals = numpy.maximum(norm - (thicknesses * vectors).sum(axis=1), 0)
+
+	# Lowest residuals
+	subsets, thicknesses, residuals = (
+		subsets[valid], thicknesses[valid], residuals[valid]
+	)
+	if(len(residuals) > keep):
+		best = numpy.argpartition(residuals, keep - 1)[:keep]
+		subsets, thicknesses, residuals = (
+			subsets[best], thicknesses[best], residuals[best]
+		)
+	return((subsets, thicknesses, residuals))
+
+
+def _tasks(prefixes, count, chunk):
+	"""Search tasks
+
+	Yields the (prefixes, count) 2-tuples (see :func:`_expand`) splitting the
+	expansion of the array *prefixes* into tasks of about *chunk* combinations.
+	"""
+	if(count is None):
+		lengths = numpy.ones(len(prefixes), dtype=numpy.intp)
+	elif(prefixes.shape[1] == 0):
+		lengths = numpy.full(len(prefixes), count, dtype=numpy.intp)
+	else:
+		lengths = count - 1 - prefixes[:, -1]
+	splits = numpy.searchsorted(
+		numpy.cumsum(lengths), numpy.arange(chunk, lengths.sum(), chunk),
+		side="right"
+	)
+	for rows in numpy.split(prefixes, numpy.unique(splits)):
+		if(len(rows)):
+			yield((rows, count))
+
+
+class Compensator:
+	"""Dispersion compensation optimizer class"""
+
+	omega = None
+	"""Frequency grid
+
+	Angular frequency grid in :math:`rad / fs` on which phases are compensated
+	"""
+
+	def __init__(self, materials, omega, weights=None):
+		"""Compensator class init
+
+		:param materials:	Candidate materials
+		:type materials:	dict, :class:`ultrafast.catalogue.Index`
+		:param omega:	Angular frequency grid in :math:`rad / fs`
+		:type omega:	array_like
+		:param weights:	Spectral weights (e.g. spectral intensity)
+		:type weights:	array_like
+
+		Class describing a search for the combinations of candidate *materials*
+		(mapping keys to :class:`ultrafast.core.Material` instances) and
+		thicknesses compensating spectral phases on the grid *omega*. Residuals
+		are weighted by *weights*, uniform if None.
+
+		Candidates whose range excludes the grid are listed in :attr:`skipped`.
+		"""
+		self._lock = threading.RLock()
+		self._materials = materials
+		self.omega = numpy.asarray(omega, dtype=float)
+		if(self.omega.ndim != 1 or len(self.omega) < 3):
+			raise UltrafastError("Angular frequency grid must be 1-D (3+ points)")
+		if(weights is None):
+			weights = numpy.ones(len(self.omega))
+		weights = numpy.asarray(weights, dtype=float)
+		if(weights.shape != self.omega.shape or (weights < 0).any()):
+			raise UltrafastError(
+				"Weights must be non-negative and match the frequency grid"
+			)
+		self._weights = numpy.sqrt(weights / weights.sum())
+
+		# Weighted constant and linear phase basis
+		self._basis = numpy.linalg.qr(self._weights[:, None] * numpy.stack(
+			(numpy.ones(len(self.omega)), self.omega - self.omega.mean()),
+			axis=1
+		))[0]
+
+		self._columns = {}
+		self._tables = None
+
+	def _project(self, phase):
+		"""Weighted phase without constant and linear components"""
+		phase = self._weights * phase
+		return(phase - self._basis @ (self._basis.T @ phase))
+
+	@property
+	def keys(self):
+		"""Candidate keys
+
+		List of the keys of candidates valid over the grid, in the order of the
+		search.
+		"""
+		self._refresh()
+		return(list(self._tables["keys"]))
+
+	@property
+	def skipped(self):
+		"""Skipped candidates
+
+		List of the keys of candidates whose range excludes the grid.
+		"""
+		self._refresh()
+		return(list(self._tables["skipped"]))
+
+	def _refresh(self):
+		"""Evaluate changed candidates and rebuild Gram matrix"""
+		with self._lock:
+			materials = self._materials
+			if(isinstance(materials, Index)):
+				keys = materials.keys
+			else:
+				keys = list(materials)
+			changed = self._tables is None or self._tables["all"] != keys
+			columns = {}
+			for key in keys:
+				material = materials[key]
+				column = self._columns.get(key)
+				if(
+					column is None or column[0] is not material or
+					column[1] != material.version
+				):
+					try:
+						wavevector = material.wavevector(self.omega)
+						wavevector = self._project(numpy.real(wavevector))
+					except UltrafastError:
+						wavevector = None
+					column = (material, material.version, wavevector)
+					changed = True
+				columns[key] = column
+			self._columns = columns
+			if(not changed):
+				return
+			valid = [key for key in keys if columns[key][2] is not None]
+			matrix = numpy.empty((len(self.omega), len(valid)))
+			for i, key in enumerate(valid):
+				matrix[:, i] = columns[key][2]
+			self._tables = {
+				"all": keys,
+				"keys": valid,
+				"skipped": [key for key in keys if columns[key][2] is None],
+				"matrix": matrix,
+				"gram": matrix.T @ matrix,
+			}
+
+	def _target(self, phase):
+		"""Projected target (negated) phase"""
+		phase = numpy.asarray(phase, dtype=float)
+		if(phase.shape != self.omega.shape):
+			raise UltrafastError("Phase must match the frequency grid")
+		return(-self._project(phase))
+
+	def solve(self, phase, keys):
+		"""Optimal thicknesses
+
+		:param phase:	Spectral phase in :math:`rad`
+		:type phase:	array_like
+		:param keys:	Candidate keys
+		:type keys:	list
+
+		Returns the 2-tuple of the dict of non-negative thicknesses (in
+		:math:`\\mu m`) of the candidates *keys* best compensating *phase*, and the
+		weighted RMS residual phase (in :math:`rad`), after removal of constant
+		and linear components. If *keys* is empty, the residual is that of *phase*.
+		"""
+		self._refresh()
+		tables = self._tables
+		index = {key: i for i, key in enumerate(tables["keys"])}
+		try:
+			columns = [index[key] for key in keys]
+		except KeyError as error:
+			raise UltrafastError("Invalid candidate: {}".format(error.args[0]))
+		target = self._target(phase)
+		if(not columns):
+			return(({}, float(numpy.sqrt(target @ target))))
+		thicknesses, residual = nnls(tables["matrix"][:, columns], target)
+		return((dict(zip(keys, thicknesses.tolist())), float(residual)))
+
+	def search(
+		self,
+		phase,
+		size=2,
+		results=10,
+		limit=None,
+		beam=None,
+		tolerance=1e-10,
+		jobs=None,
+		chunk=16384
+	):
+		"""Search combinations
+
+		:param phase:	Spectral phase in :math:`rad`
+		:type phase:	array_like
+		:param size:	Maximum number of candidates combined
+		:type size:	int
+		:param results:	Number of solutions returned
+		:type results:	int
+		:param limit:	Maximum total thickness in :math:`\\mu m`
+		:type limit:	float
+		:param beam:	Number of combinations extended to the next size
+		:type beam:	int
+		:param tolerance:	Degeneracy (wavevector correlation determinant)
+							tolerance
+		:type tolerance:	float
+		:param jobs:	Number of worker processes
+		:type jobs:	int
+		:param chunk:	Number of combinations per worker task
+		:type chunk:	int
+
+		Returns the list of (at most *results*) best solutions compensating
+		*phase*, each a 2-tuple of the dict of thicknesses (in :math:`\\mu m`) and
+		the weighted RMS residual phase (in :math:`rad`, see :meth:`solve`),
+		ordered by increasing residual.
+
+		All combinations of up to *size* candidates are searched, pruning those
+		without strictly positive thicknesses, of total thickness above *limit*
+		or degenerate within *tolerance*. If *beam* is given, combinations of
+		each size above one only extend the *beam* best combinations of the size
+		below. Combinations are solved in chunks of *chunk* by *jobs* worker
+		processes (by default one per core), or in the calling process if *jobs*
+		is 1. Returns an empty list if no candidate is valid over the grid.
+		"""
+		self._refresh()
+		tables = self._tables
+		keys = tables["keys"]
+		matrix = tables["matrix"]
+		target = self._target(phase)
+		if(not keys):
+			return([])
+		keep = max(results, beam or 0)
+		state = (
+			tables["gram"], matrix.T @ target, float(target @ target), tolerance,
+			limit, keep
+		)
+
+		pool = None
+		if(jobs != 1):
+			pool = ProcessPoolExecutor(
+				max_workers=jobs, initializer=_initialize, initargs=(state,)
+			)
+		try:
+			found = []
+			survivors = None
+			for level in range(1, min(size, len(keys)) + 1):
+
+				# Combinations, by prefix
+				if(survivors is None):
+					prefixes = numpy.empty((1, 0), dtype=numpy.intp)
+					for _ in range(level - 1):
+						prefixes = _expand(prefixes, len(keys))
+					tasks = _tasks(prefixes, len(keys), chunk)
+				else:
+					prefixes = numpy.array(sorted({
+						tuple(sorted(subset + (i,)))
+						for subset in survivors for i in range(len(keys))
+						if i not in subset
+					}), dtype=numpy.intp).reshape(-1, level)
+					tasks = _tasks(prefixes, None, chunk)
+
+				# Solve
+				if(pool is None):
+					solved = (_solve(_expand(*task), state) for task in tasks)
+				else:
+					solved = pool.map(_work, tasks)
+				level_found = []
+				for subset_, thicknesses, residuals in solved:
+					level_found.extend(zip(
+						map(tuple, subset_.tolist()), thicknesses.tolist(),
+						residuals.tolist()
+					))
+					if(len(level_found) > 2 * keep):
+						level_found.sort(key=lambda x: x[2])
+						del level_found[keep:]
+				level_found.sort(key=lambda x: x[2])
+				del level_found[keep:]
+				found.extend(level_found)
+				if(beam is not None):
+					survivors = [subset for subset, _, _ in level_found[:beam]]
+					if(not survivors):
+						break
+		finally:
+			if(pool is not None):
+				pool.shutdown()
+
+		# Exact residuals (Gram residuals lose precision near zero)
+		solutions = []
+		for subset, thicknesses, _ in found:
+			residual = matrix[:, list(subset)] @ thicknesses - target
+			solutions.append((
+				{keys[i]: x for i, x in zip(subset, thicknesses)},
+				float(numpy.sqrt(residual @ residual))
+			))
+		solutions.sort(key=lambda x: x[1])
+		return(solutions[:results])
+
+	def system(self, thicknesses, omega=None):
+		"""Compensating system
+
+		:param thicknesses:	Candidate thicknesses in :math:`\\mu m`
+		:type thicknesses:	dict
+		:param omega:	Angular frequency grid in :math:`rad / fs`
+		:type omega:	array_like
+
+		Returns the :class:`ultrafast.elements.System` of
+		:class:`ultrafast.elements.Slab` elements of the candidates and
+		*thicknesses* (e.g. a solution of :meth:`search`), on the grid *omega*,
+		by default :attr:`omega`.
+		"""
+		return(elements.System(
+			[
+				elements.Slab(self._materials[key], thickness, name=str(key))
+				for key, thickness in thicknesses.items()
+			],
+			omega=self.omega if omega is None else omega
+		))
@@ -0,0 +1,442 @@
+"""Ultrafast composite module
+
+This module contains materials composed of other materials: relative
+refractive indices, volume fraction mixtures (effective medium models) and
+doped glasses.
+
+Composite materials are built lazily from their components, i.e. no component
+is evaluated at construction. The frequency range is the intersection of the
+component ranges, computed once at construction, such that evaluation asserts
+the frequency once and then evaluates the components' dispersion functions
+directly within a single vectorized kernel:
+
+	>>> relative = ultrafast.composite.RelativeMaterial(glass, water)
+	>>> porous = ultrafast.composite.Mixture(
+	... 	(glass, ultrafast.air), (0.7, 0.3), model="bruggeman"
+	... )
+
+Modifications of components (see :attr:`ultrafast.core.Material.version`) are
+picked up on the next evaluation.
+
+This file is part of ultrafast. ultrafast is free software: you can
+redistribute it and/or modify it under the terms of the GNU General Public
+License as published by the Free Software Foundation, either version 3 of the
+License, or any later version. ultrafast is distributed in the hope that it
+will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty
+of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General
+Public License for more details. You should have received a copy of the GNU
+General Public License along with ultrafast. If not, see
+<http://www.gnu.org/licenses/>.
+
+Copyright © 2016 Marcelo J P Alcocer
+"""
+
+# Imports
+import numpy
+from .core import Material, PropertySetError, UltrafastError, wavelength
+from . import core
+
+
+def _linear(n, f):
+	"""Linear (volume weighted refractive index) mixing rule"""
+	return(numpy.sum(f * n, axis=0))
+
+
+def _lorentz_lorenz(n, f):
+	"""Lorentz-Lorenz mixing rule"""
+	epsilon = numpy.power(n, 2)
+	a = numpy.sum(f * (epsilon - 1) / (epsilon + 2), axis=0)
+	return(numpy.sqrt((1 + 2 * a) / (1 - a)))
+
+
+def _maxwell_garnett(n, f):
+	"""Maxwell-Garnett mixing rule (first component is the host)"""
+	epsilon = numpy.power(n, 2)
+	host = epsilon[0]
+	a = numpy.sum(
+		f[1:] * (epsilon[1:] - host) / (epsilon[1:] + 2 * host), axis=0
+	)
+	return(numpy.sqrt(host * (1 + 2 * a) / (1 - a)))
+
+
+def _bruggeman(n, f, iterations=50, tolerance=1e-14):
+	"""Bruggeman mixing rule
+
+	Closed form for two components, Newton iteration (from the linear mixture
+	permittivity) otherwise.
+	"""
+	epsilon = numpy.power(n, 2)
+	if(len(epsilon) == 2):
+		b = (
+			(3 * f[0] - 1) * epsilon[0] +
+			(3 * f[1] - 1) * epsilon[1]
+		)
+		discriminant = numpy.power(b, 2) + 8 * epsilon[0] * epsilon[1]
+		return(numpy.sqrt((b + numpy.sqrt(discriminant)) / 4))
+	effective = numpy.sum(f * epsilon, axis=0)
+	for _ in range(iterations):
+		denominator = epsilon + 2 * effective
+		g = numpy.sum(f * (epsilon - effective) / denominator, axis=0)
+		dg = -3 * numpy.sum(f * epsilon / numpy.power(denominator, 2), axis=0)
+		step = g / dg
+		effective = effective - step
+		if(numpy.all(numpy.abs(step) <= tolerance * numpy.abs(effective))):
+			break
+	return(numpy.sqrt(effective))
+
+
+models = {
+	"linear": _linear,
+	"lorentz-lorenz": _lorentz_lorenz,
+	"maxwell-garnett": _maxwell_garnett,
+	"bruggeman": _bruggeman,
+}
+"""Mixing rules, keyed by model name"""
+
+
+class _CompositeMaterial(Material):
+	"""Composite material base class"""
+
+	components = None
+	"""Component materials
+
+	Tuple of :class:`ultrafast.core.Material` from which the material is composed
+	"""
+
+	_versions = None
+	"""Component versions of the intersected frequency range"""
+
+	_tokens = None
+	"""Validity token (see :meth:`_token`)"""
+
+	def _intersect(self):
+		"""Intersection of component frequency ranges"""
+		range_ = (
+			max(material.range_[0] for material in self.components),
+			min(material.range_[1] for material in self.components)
+		)
+		if(range_[0] > range_[1]):
+			raise UltrafastError("Component material ranges do not overlap")
+		return(range_)
+
+	@Material.range_.getter
+	def range_(self):
+		"""Frequency range
+
+		Intersection of the component frequency ranges (see
+		:attr:`ultrafast.core.Material.range_`), derived again whenever a
+		component is modified.
+		"""
+		versions = tuple(material.version for material in self.components)
+		if(versions != self._versions):
+			with core._lock:
+				self._range_ = self._intersect()
+				self._versions = versions
+		return(self._range_)
+
+	def _assert_frequency(self, omega):
+		"""Frequency assertion
+
+		:param omega:	Angular frequency in :math:`rad / fs`
+		:type omega:	numeric, array_like
+
+		Asserts the angular frequency *omega* is within :attr:`range_` and valid
+		for every component (see
+		:meth:`ultrafast.core.Material._assert_frequency`), e.g. clear of the
+		component absorption poles.
+		"""
+		Material._assert_frequency(self, omega)
+		for material in self.components:
+			material._assert_frequency(omega)
+
+	def valid_mask(self, omega, margin=0.0):
+		"""Valid frequency mask
+
+		:param omega:	Angular frequency in :math:`rad / fs`
+		:type omega:	numeric, array_like
+		:param margin:	Relative margin
+		:type margin:	float
+
+		Returns the boolean array of the elements of the angular frequency
+		*omega* within :attr:`range_` and valid for every component (see
+		:meth:`ultrafast.core.Material.valid_mask`).
+		"""
+		mask = Material.valid_mask(self, omega, margin)
+		for material in self.components:
+			mask &= material.valid_mask(omega, margin)
+		return(mask)
+
+	def _token(self):
+		"""Validity token (identical while the range and all component tokens are
+		unchanged)"""
+		tokens = (self.range_,) + tuple(
+			material._token() for material in self.components
+		)
+		cached = self._tokens
+		if(
+			cached is None or len(cached) != len(tokens) or
+			any(a is not b for a, b in zip(cached, tokens))
+		):
+			self._tokens = cached = tokens
+		return(cached)
+
+	@property
+	def version(self):
+		"""Dispersion version
+
+		Token combining the version of the material and of all components.
+		"""
+		return(
+			(self._version,) +
+			tuple(material.version for material in self.components)
+		)
+
+	def _snapshot(self):
+		"""Refuse snapshot (dispersion held by components)"""
+		raise UltrafastError(
+			"Composite materials cannot be frozen (freeze components)"
+		)
+
+
+class RelativeMaterial(_CompositeMaterial):
+	"""Relative refractive index material class"""
+
+	def __init__(
+		self,
+		material,
+		surrounding=None,
+		name=None,
+		references=None,
+		comments=None
+	):
+		"""RelativeMaterial class init
+
+		:param material:	Material
+		:type material:	:class:`ultrafast.core.Material`
+		:param surrounding:	Surrounding material
+		:type surrounding:	:class:`ultrafast.core.Material`
+		:param name:	Material name
+		:type name:		string
+		:param references:	Reference(s) for material properties
+		:type references:	string
+		:param comments:	Comments
+		:type comments:		string
+
+		Class describing the refractive index of *material* relative to that of
+		the *surrounding* material, :math:`n / n_s`, e.g. for propagation and
+		refraction calculations in immersion media. If None, *surrounding* is
+		assumed to be :attr:`ultrafast.core.air`.
+		"""
+		if(surrounding is None):
+			surrounding = core.air
+		self.components = (material, surrounding)
+
+		def n(omega):
+			return(material._function(omega) / surrounding._function(omega))
+
+		# Call Material constructor
+		Material.__init__(
+			self, n, self._intersect(), name=name,
+			references=references, comments=comments
+		)
+
+
+class Mixture(_CompositeMaterial):
+	"""Effective medium mixture class"""
+
+	_fractions = None
+	"""Volume fractions
+
+	Property attribute. See setter and getter methods for further details.
+	"""
+
+	model = None
+	"""Mixing rule
+
+	Effective medium model name (see :data:`models`)
+	"""
+
+	def __init__(
+		self,
+		materials,
+		fractions,
+		model="lorentz-lorenz",
+		name=None,
+		references=None,
+		comments=None
+	):
+		"""Mixture class init
+
+		:param materials:	Component materials
+		:type materials:	list of :class:`ultrafast.core.Material`
+		:param fractions:	Volume fractions
+		:type fractions:	array_like
+		:param model:	Mixing rule
+		:type model:	string
+		:param name:	Material name
+		:type name:		string
+		:param references:	Reference(s) for material properties
+		:type references:	string
+		:param comments:	Comments
+		:type comments:		string
+
+		Class describing a homogeneous effective medium composed of *materials* in
+		the volume *fractions* (summing to 1). The effective refractive index is
+		given by the mixing rule *model*:
+
+		- ``linear``: volume weighted refractive index, e.g. for compositions
+		  between catalogued glasses
+		- ``lorentz-lorenz``: molecular mixtures (e.g. gases, liquids)
+		- ``maxwell-garnett``: dilute inclusions (all other components) in a host
+		  (first component)
+		- ``bruggeman``: symmetric aggregate of all components (e.g. porous
+		  films)
+
+		All components are evaluated together and combined in one vectorized
+		kernel. :attr:`fractions` may be modified (e.g. during optimization)
+		without rebuilding the material.
+		"""
+		if(model not in models):
+			raise UltrafastError("Unknown mixing rule: {}".format(model))
+		self.components = tuple(materials)
+		self.model = model
+		self.fractions = fractions
+		rule = models[model]
+
+		def n(omega):
+			values = numpy.stack(numpy.broadcast_arrays(*(
+				material._function(omega) for material in self.components
+			)))
+			f = self._fractions.reshape((-1,) + (1,) * (values.ndim - 1))
+			return(rule(values, f))
+
+		# Call Material constructor
+		Material.__init__(
+			self, n, self._intersect(), name=name,
+			references=references, comments=comments
+		)
+
+	@property
+	def fractions(self):
+		"""Volume fractions
+
+		Array of component volume fractions, summing to 1.
+		"""
+		view = self._fractions.view()
+		view.flags.writeable = False
+		return(view)
+
+	@fractions.setter
+	def fractions(self, value):
+		"""Volume fractions setter method
+
+		- Asserts one non-negative fraction per component
+		- Asserts fractions sum to 1
+		- Increments version
+		"""
+		value = numpy.array(value, dtype=float)
+		if(value.shape != (len(self.components),)):
+			raise PropertySetError(
+				"fractions",
+				"Number of fractions does not match number of materials"
+			)
+		if((value < 0).any() or abs(value.sum() - 1) > 1e-9):
+			raise PropertySetError(
+				"fractions",
+				"Fractions must be non-negative and sum to 1"
+			)
+		with core._lock:
+			self._fractions = value
+			self._modified()
+
+
+class DopedMaterial(_CompositeMaterial):
+	"""Doped glass class"""
+
+	_concentration = None
+	"""Relative dopant concentration
+
+	Property attribute. See setter and getter methods for further details.
+	"""
+
+	def __init__(
+		self,
+		host,
+		doped,
+		concentration,
+		name=None,
+		references=None,
+		comments=None
+	):
+		"""DopedMaterial class init
+
+		:param host:	Undoped host material
+		:type host:	:class:`ultrafast.core.RIIDMaterial`
+		:param doped:	Doped material at the reference concentration
+		:type doped:	:class:`ultrafast.core.RIIDMaterial`
+		:param concentration:	Relative dopant concentration
+		:type concentration:	float
+		:param name:	Material name
+		:type name:		string
+		:param references:	Reference(s) for material properties
+		:type references:	string
+		:param comments:	Comments
+		:type comments:		string
+
+		Class describing a doped glass (e.g. germania doped silica) whose
+		dispersion formula coefficients vary linearly with dopant concentration
+		(Fleming) between those of the *host* and *doped* materials, which must
+		share a dispersion formula. The *concentration* is relative to that of
+		*doped*, i.e. 0 for *host* and 1 for *doped*.
+
+		The interpolated coefficients are evaluated by a single dispersion formula
+		kernel call.
+		"""
+		formula = getattr(host, "formula", None)
+		if(
+			formula is None or formula != getattr(doped, "formula", None) or
+			host.coefficients.shape != doped.coefficients.shape
+		):
+			raise UltrafastError(
+				"Host and doped materials must share a dispersion formula"
+			)
+		self.components = (host, doped)
+		self.concentration = concentration
+		kernel = core._formulas[formula]
+
+		def n(omega):
+			x = self._concentration
+			return(kernel(
+				wavelength(omega),
+				(1 - x) * host._coefficients + x * doped._coefficients
+			))
+
+		# Call Material constructor
+		Material.__init__(
+			self, n, self._intersect(), name=name,
+			references=references, comments=comments
+		)
+
+	@property
+	def concentration(self):
+		"""Relative dopant concentration
+
+		Dopant concentration relative to that of the doped material (0 to 1).
+		"""
+		return(self._concentration)
+
+	@concentration.setter
+	def concentration(self, value):
+		"""Relative dopant concentration setter method
+
+		- Asserts concentration within [0, 1]
+		- Increments version
+		"""
+		if(not 0 <= value <= 1):
+			raise PropertySetError(
+				"concentration",
+				"Relative concentration out of range [0, 1]"
+			)
+		with core._lock:
+			self._concentration = float(value)
+			self._modified()
@@ -0,0 +1,238 @@
+"""Ultrafast database module
+
+This module contains an importer of the whole RefractiveIndex.info database,
+read directly from its zip or tar (optionally compressed) archive without
+extraction:
+
+	>>> index = ultrafast.database.load("refractiveindex.info-database.zip")
+	>>> index["glass/schott/N-BK7"].n(2.35)
+
+Entries are named ``shelf/book/page`` by walking the library index
+(``library.yml`` or ``catalog-nk.yml``) of the archive. Entry YAML documents
+are parsed across a process pool (by LibYAML if available) into plain data,
+from which the materials are built in the calling process (see
+:meth:`ultrafast.core.RIIDMaterial.from_entry`). Only entries described by a
+dispersion formula are imported; tabulated entries are skipped without being
+parsed.
+
+This file is part of ultrafast. ultrafast is free software: you can
+redistribute it and/or modify it under the terms of the GNU General Public
+License as published by the Free Software Foundation, either version 3 of the
+License, or any later version. ultrafast is distributed in the hope that it
+will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty
+of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General
+Public License for more details. You should have received a copy of the GNU
+General Public License along with ultrafast. If not, see
+<http://www.gnu.org/licenses/>.
+
+Copyright © 2016 Marcelo J P Alcocer
+"""
+
+# Imports
+from concurrent.futures import ProcessPoolExecutor
+import posixpath
+import re
+import tarfile
+import zipfile
+import yaml
+from .catalogue import Index
+from .core import RIIDMaterial, UltrafastError
+from . import core
+
+indices = ("library.yml", "catalog-nk.yml")
+"""Library index file names, in order of preference"""
+
+data = ("data", "data-nk")
+"""Entry directory names (relative to the library index)"""
+
+_formula = re.compile(rb"type\s*:\s*[\"']?formula")
+"""Formula entry pattern (entry pre-filter)"""
+
+
+class _Archive:
+	"""Database archive reader (zip or tar)"""
+
+	def __init__(self, path):
+		if(zipfile.is_zipfile(path)):
+			self._zip = zipfile.ZipFile(path)
+			self.names = [
+				name for name in self._zip.namelist() if not name.endswith("/")
+			]
+		elif(tarfile.is_tarfile(path)):
+			self._zip = None
+			self._tar = tarfile.open(path)
+			self._members = {
+				member.name: member for member in self._tar.getmembers()
+				if member.isfile()
+			}
+			self.names = list(self._members)
+		else:
+			raise UltrafastError("Not a zip or tar archive: {}".format(path))
+
+	def read(self, name):
+		"""Contents of member *name*"""
+		if(self._zip is not None):
+			return(self._zip.read(name))
+		return(self._tar.extractfile(self._members[name]).read())
+
+	def contents(self, names):
+		"""Contents of members
+
+		Yields the (name, contents) 2-tuples of the members *names*. Tar members
+		are read in archive order, such that compressed archives are read
+		sequentially.
+		"""
+		if(self._zip is not None):
+			for name in names:
+				yield((name, self._zip.read(name)))
+			return
+		names = set(names)
+		for member in self._tar:
+			if(member.name in names):
+				yield((member.name, self._tar.extractfile(member).read()))
+
+	def close(self):
+		(self._zip if self._zip is not None else self._tar).close()
+
+
+def _pages(archive):
+	"""Database entries of *archive*
+
+	Returns the dict of archive member names, keyed by entry name.
+	"""
+	names = set(archive.names)
+
+	# Library index (shallowest)
+	candidates = sorted(
+		(name.count("/"), indices.index(posixpath.basename(name)), name)
+		for name in names if posixpath.basename(name) in indices
+	)
+	if(not candidates):
+		raise UltrafastError("No library index found in database archive")
+	index = candidates[0][2]
+	root = posixpath.dirname(index)
+	library = yaml.load(archive.read(index), Loader=core._Loader) or []
+
+	# Walk shelves, books and pages
+	pages = {}
+	for shelf in library:
+		if("SHELF" not in shelf):
+			continue
+		for book in shelf.get("content") or []:
+			if("BOOK" not in book):
+				continue
+			for page in book.get("content") or []:
+				if("PAGE" not in page or "data" not in page):
+					continue
+				for directory in data:
+					name = posixpath.join(root, directory, page["data"])
+					if(name in names):
+						key = "/".join(
+							str(x) for x in
+							(shelf["SHELF"], book["BOOK"], page["PAGE"])
+						)
+						pages[key] = name
+						break
+	return(pages)
+
+
+def _parse(chunk):
+	"""Parse entries
+
+	Parses the list of (key, YAML document) 2-tuples *chunk* (in a worker
+	process), returning the list of (key, entry) 2-tuples of the plain data
+	required to build each material, or None for entries without a dispersion
+	formula.
+	"""
+	parsed = []
+	for key, document in chunk:
+		entry = None
+		try:
+			document = yaml.load(document, Loader=core._Loader)
+			for datum in document.get("DATA") or []:
+				type_ = str(datum.get("type", ""))
+				if(re.fullmatch(r"formula \d+", type_)):
+					entry = {"DATA": [{
+						"type": type_,
+						"range": str(datum["range"]),
+						"coefficients": str(datum["coefficients"]),
+					}]}
+					for field in ("REFERENCES", "COMMENTS"):
+						if(field in document):
+							entry[field] = document[field]
+				if(type_.startswith(("formula", "tabulated n"))):
+					break
+		except (yaml.YAMLError, AttributeError, KeyError):
+			entry = None
+		parsed.append((key, entry))
+	return(parsed)
+
+
+def read(path, jobs=None, chunk=128):
+	"""Read database archive
+
+	:param path:	Database archive (zip or tar)
+	:type path:	string
+	:param jobs:	Number of worker processes
+	:type jobs:	int
+	:param chunk:	Number of entries per worker task
+	:type chunk:	int
+
+	Returns the 2-tuple of the dict of built materials, keyed by entry name
+	(``shelf/book/page``), and the list of entry names skipped (tabulated,
+	malformed or otherwise unsupported). Entries are parsed by *jobs* worker
+	processes (by default one per core), or in the calling process if *jobs* is
+	1.
+	"""
+	archive = _Archive(path)
+	try:
+		pages = _pages(archive)
+		documents = []
+		skipped = []
+		keys = {name: key for key, name in pages.items()}
+		for name, document in archive.contents(keys):
+			if(_formula.search(document)):
+				documents.append((keys[name], document))
+			else:
+				skipped.append(keys[name])
+	finally:
+		archive.close()
+
+	# Parse
+	chunks = [
+		documents[i:i + chunk] for i in range(0, len(documents), chunk)
+	]
+	if(jobs == 1 or len(chunks) <= 1):
+		results = map(_parse, chunks)
+	else:
+		with ProcessPoolExecutor(max_workers=jobs) as pool:
+			results = list(pool.map(_parse, chunks))
+
+	# Build
+	materials = {}
+	for result in results:
+		for key, entry in result:
+			try:
+				if(entry is None):
+					raise UltrafastError("No dispersion formula")
+				materials[key] = RIIDMaterial.from_entry(entry, name=key)
+			except (UltrafastError, ValueError):
+				skipped.append(key)
+	return((materials, skipped))
+
+
+def load(path, jobs=None, chunk=128):
+	"""Load database archive
+
+	:param path:	Database archive (zip or tar)
+	:type path:	string
+	:param jobs:	Number of worker processes
+	:type jobs:	int
+	:param chunk:	Number of entries per worker task
+	:type chunk:	int
+
+	Returns a :class:`ultrafast.catalogue.Index` of all dispersion formula
+	entries of the database archive *path*, keyed by entry name
+	(``shelf/book/page``). See :func:`read`.
+	"""
+	return(Index(read(path, jobs=jobs, chunk=chunk)[0]))
@@ -0,0 +1,442 @@
+"""Ultrafast elements module
+
+This module contains classes describing optical elements (windows, crystals,
+air paths, compressors) and their composition into optical systems.
+
+Each element describes its spectral phase on a frequency grid. Phases are
+cached per element and only recomputed when a parameter the element depends
+upon changes. An :class:`System` accumulates the phases of its elements
+incrementally, such that changing a single parameter of a long beam line only
+costs the re-evaluation of the affected element.
+
+This file is part of ultrafast. ultrafast is free software: you can
+redistribute it and/or modify it under the terms of the GNU General Public
+License as published by the Free Software Foundation, either version 3 of the
+License, or any later version. ultrafast is distributed in the hope that it
+will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty
+of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General
+Public License for more details. You should have received a copy of the GNU
+General Public License along with ultrafast. If not, see
+<http://www.gnu.org/licenses/>.
+
+Copyright © 2016 Marcelo J P Alcocer
+"""
+
+# Imports
+from math import factorial
+import numpy
+from . import core
+
+
+class Element:
+	"""Optical element base class"""
+
+	name = None
+	"""Element name"""
+
+	def __init__(self, name=None):
+		"""Element class init
+
+		:param name:	Element name
+		:type name:		string
+
+		Base class describing an optical element imparting a spectral phase.
+
+		Subclasses implement :meth:`_phase`, and call :meth:`_modified` whenever a
+		parameter affecting the phase changes.
+		"""
+		self.name = name
+		self._version = 0
+		self._cache = None
+
+	@property
+	def version(self):
+		"""Parameter version
+
+		Hashable token which changes whenever a parameter affecting the phase of
+		the element changes.
+		"""
+		return(self._version)
+
+	def _modified(self):
+		"""Mark element parameters as modified"""
+		self._version += 1
+
+	def _phase(self, omega):
+		"""Spectral phase (uncached)
+
+		:param omega:	Angular frequency in :math:`rad / fs`
+		:type omega:	array_like
+
+		Returns the spectral phase in :math:`rad`. To be implemented by subclasses.
+		"""
+		raise NotImplementedError
+
+	def phase(self, omega):
+		"""Spectral phase
+
+		:param omega:	Angular frequency grid in :math:`rad / fs`
+		:type omega:	array_like
+
+		Returns the spectral phase in :math:`rad` imparted by the element.
+
+		The result is cached against the identity of the grid *omega* and the
+		element :attr:`version`. Repeated calls with the same grid array and
+		unchanged parameters return the cached array, which must not be modified.
+		"""
+		version = self.version
+		cache = self._cache
+		if(cache is not None and cache[0] is omega and cache[1] == version):
+			return(cache[2])
+		phase = self._phase(omega)
+		self._cache = (omega, version, phase)
+		return(phase)
+
+	def gd(self, omega):
+		"""Group delay
+
+		:param omega:	Angular frequency grid in :math:`rad / fs`
+		:type omega:	array_like
+
+		Returns the group delay in :math:`fs`, calculated as the derivative of
+		:meth:`phase` along the one-dimensional grid *omega*.
+		"""
+		return(numpy.gradient(self.phase(omega), omega))
+
+	def gdd(self, omega):
+		"""Group delay dispersion
+
+		:param omega:	Angular frequency grid in :math:`rad / fs`
+		:type omega:	array_like
+
+		Returns the group delay dispersion in :math:`fs^2`, calculated as the
+		derivative of :meth:`gd` along the one-dimensional grid *omega*.
+		"""
+		return(numpy.gradient(self.gd(omega), omega))
+
+	def tod(self, omega):
+		"""Third order dispersion
+
+		:param omega:	Angular frequency grid in :math:`rad / fs`
+		:type omega:	array_like
+
+		Returns the third order dispersion in :math:`fs^3`, calculated as the
+		derivative of :meth:`gdd` along the one-dimensional grid *omega*.
+		"""
+		return(numpy.gradient(self.gdd(omega), omega))
+
+
+class Slab(Element):
+	"""Material slab class"""
+
+	_material = None
+	"""Slab material
+
+	Property attribute. See setter and getter methods for further details.
+	"""
+
+	_thickness = None
+	"""Slab thickness
+
+	Property attribute. See setter and getter methods for further details.
+	"""
+
+	def __init__(self, material, thickness, name=None):
+		"""Slab class init
+
+		:param material:	Slab material
+		:type material:	:class:`ultrafast.core.Material`
+		:param thickness:	Propagation length in :math:`\\mu m`
+		:type thickness:	float
+		:param name:	Element name
+		:type name:		string
+
+		Class describing propagation through a length *thickness* of a dispersive
+		material, e.g. a window, crystal or free-space path. The spectral phase is
+		:math:`k(\\omega) L`.
+
+		The material wavevector is cached against the frequency grid and material
+		version, such that changing only :attr:`thickness` costs a single array
+		multiplication.
+		"""
+		Element.__init__(self, name=name)
+		self._wavevector = None
+		self.material = material
+		self.thickness = thickness
+
+	@property
+	def material(self):
+		"""Slab material
+
+		:class:`ultrafast.core.Material` through which light propagates.
+		"""
+		return(self._material)
+
+	@material.setter
+	def material(self, value):
+		"""Slab material setter method
+
+		- Invalidates cached wavevector
+		"""
+		self._material = value
+		self._wavevector = None
+		self._modified()
+
+	@property
+	def thickness(self):
+		"""Slab thickness
+
+		Propagation length in :math:`\\mu m`.
+		"""
+		return(self._thickness)
+
+	@thickness.setter
+	def thickness(self, value):
+		"""Slab thickness setter method"""
+		self._thickness = value
+		self._modified()
+
+	@property
+	def version(self):
+		"""Parameter version
+
+		Token combining the version of the slab and of its material.
+		"""
+		return((self._version, self.material.version))
+
+	def _phase(self, omega):
+		"""Spectral phase (uncached)"""
+		version = self.material.version
+		cache = self._wavevector
+		if(cache is None or cache[0] is not omega or cache[1] != version):
+			cache = (omega, version, self.material.wavevector(omega))
+			self._wavevector = cache
+		return(self.thickness * cache[2])
+
+
+class AirPath(Slab):
+	"""Air path class"""
+
+	def __init__(self, length, name=None):
+		"""AirPath class init
+
+		:param length:	Propagation length in :math:`\\mu m`
+		:type length:	float
+		:param name:	Element name
+		:type name:		string
+
+		Class describing free-space propagation through :attr:`ultrafast.core.air`.
+		"""
+		Slab.__init__(self, core.air, length, name=name)
+
+
+class TaylorPhase(Element):
+	"""Taylor expanded phase class"""
+
+	_omega0 = None
+	"""Expansion frequency
+
+	Property attribute. See setter and getter methods for further details.
+	"""
+
+	_coefficients = None
+	"""Expansion coefficients
+
+	Property attribute. See setter and getter methods for further details.
+	"""
+
+	def __init__(self, omega0, coefficients, name=None):
+		"""TaylorPhase class init
+
+		:param omega0:	Expansion angular frequency in :math:`rad / fs`
+		:type omega0:	float
+		:param coefficients:	Phase derivatives (GD, GDD, TOD, ...) in
+								:math:`fs^k`
+		:type coefficients:	tuple
+		:param name:	Element name
+		:type name:		string
+
+		Class describing an element by the Taylor expansion of its spectral phase
+		about *omega0*, e.g. a prism or grating compressor specified by its GDD
+		and TOD. The phase is
+		:math:`\\sum_k \\phi_k (\\omega - \\omega_0)^k / k!` where
+		:math:`\\phi_1, \\phi_2, \\ldots` are the *coefficients*.
+		"""
+		Element.__init__(self, name=name)
+		self.omega0 = omega0
+		self.coefficients = coefficients
+
+	@property
+	def omega0(self):
+		"""Expansion frequency
+
+		Angular frequency in :math:`rad / fs` about which the phase is expanded.
+		"""
+		return(self._omega0)
+
+	@omega0.setter
+	def omega0(self, value):
+		"""Expansion frequency setter method"""
+		self._omega0 = value
+		self._modified()
+
+	@property
+	def coefficients(self):
+		"""Expansion coefficients
+
+		Tuple of phase derivatives (GD, GDD, TOD, ...) in :math:`fs^k`.
+		"""
+		return(self._coefficients)
+
+	@coefficients.setter
+	def coefficients(self, value):
+		"""Expansion coefficients setter method"""
+		self._coefficients = tuple(value)
+		self._modified()
+
+	def _phase(self, omega):
+		"""Spectral phase (uncached)"""
+		detuning = numpy.asarray(omega) - self.omega0
+		phase = numpy.zeros_like(detuning, dtype=float)
+		for k, coefficient in enumerate(self.coefficients, 1):
+			phase += coefficient * numpy.power(detuning, k) / factorial(k)
+		return(phase)
+
+
+class System(Element):
+	"""Optical system class"""
+
+	_elements = None
+	"""System elements
+
+	Property attribute. See setter and getter methods for further details.
+	"""
+
+	omega = None
+	"""Frequency grid
+
+	Default angular frequency grid in :math:`rad / fs` shared by all elements
+	"""
+
+	def __init__(self, elements=(), omega=None, name=None):
+		"""System class init
+
+		:param elements:	Optical elements, in beam order
+		:type elements:	list of :class:`ultrafast.elements.Element`
+		:param omega:	Angular frequency grid in :math:`rad / fs`
+		:type omega:	array_like
+		:param name:	System name
+		:type name:		string
+
+		Class describing a chain of optical elements (which may themselves be
+		systems). The total spectral phase is the sum of the element phases.
+
+		The system tracks the :attr:`version` of each element. On evaluation, only
+		elements whose parameters changed are re-evaluated, and the total phase is
+		re-summed from the cached element phases (avoiding the rounding drift of
+		incremental updates).
+
+		If *omega* is given, the methods :meth:`phase`, :meth:`gd`, :meth:`gdd` and
+		:meth:`tod` may be called without arguments.
+		"""
+		Element.__init__(self, name=name)
+		self._total = None
+		self.elements = elements
+		self.omega = omega
+
+	@property
+	def elements(self):
+		"""System elements
+
+		Tuple of :class:`ultrafast.elements.Element`, in beam order. Use
+		:meth:`append` or assign a new sequence to modify.
+		"""
+		return(self._elements)
+
+	@elements.setter
+	def elements(self, value):
+		"""System elements setter method
+
+		- Invalidates accumulated phase
+		"""
+		self._elements = tuple(value)
+		self._total = None
+		self._modified()
+
+	def append(self, element):
+		"""Append element
+
+		:param element:	Optical element
+		:type element:	:class:`ultrafast.elements.Element`
+
+		Appends *element* to the end of the system.
+		"""
+		self.elements = self.elements + (element,)
+
+	@property
+	def version(self):
+		"""Parameter version
+
+		Token combining the version of the system and all of its elements.
+		"""
+		return(
+			(self._version,) +
+			tuple(element.version for element in self.elements)
+		)
+
+	def _phase(self, omega):
+		"""Spectral phase (uncached, incremental)
+
+		Only modified elements are evaluated again (see :meth:`Element.phase`).
+		The total is summed again from the element phases whenever any has
+		changed, rather than updated by differences, such that it equals a fresh
+		sum however many updates accumulate.
+		"""
+		total = self._total
+		phases = [element.phase(omega) for element in self.elements]
+		if(
+			total is not None and total["omega"] is omega and
+			len(phases) == len(total["phases"]) and
+			all(a is b for a, b in zip(phases, total["phases"]))
+		):
+			return(total["phase"])
+		phase = numpy.zeros(numpy.shape(omega))
+		for element_phase in phases:
+			phase = phase + element_phase
+		self._total = {"omega": omega, "phases": phases, "phase": phase}
+		return(phase)
+
+	def phase(self, omega=None):
+		"""Spectral phase
+
+		:param omega:	Angular frequency grid in :math:`rad / fs`
+		:type omega:	array_like
+
+		Returns the total spectral phase in :math:`rad`. If None, *omega* is
+		assumed to be :attr:`omega`.
+		"""
+		return(Element.phase(self, self.omega if omega is None else omega))
+
+	def gd(self, omega=None):
+		"""Group delay
+
+		See :meth:`ultrafast.elements.Element.gd`. If None, *omega* is assumed to
+		be :attr:`omega`.
+		"""
+		return(Element.gd(self, self.omega if omega is None else omega))
+
+	def gdd(self, omega=None):
+		"""Group delay dispersion
+
+		See :meth:`ultrafast.elements.Element.gdd`. If None, *omega* is assumed to
+		be :attr:`omega`.
+		"""
+		return(Element.gdd(self, self.omega if omega is None else omega))
+
+	def tod(self, omega=None):
+		"""Third order dispersion
+
+		See :meth:`ultrafast.elements.Element.tod`. If None, *omega* is assumed to
+		be :attr:`omega`.
+		"""
+		return(Element.tod(self, self.omega if omega is None else omega))
@@ -0,0 +1,238 @@
+"""Ultrafast grids module
+
+This module contains the generation of non-uniform angular frequency grids on
+which the dispersion of one or more materials is sampled to a given accuracy:
+
+	>>> omega = ultrafast.grids.adaptive_grid(material, 1e-6)
+	>>> n = material.n(omega)
+
+Linear interpolation of the sampled refractive index between grid points is
+accurate to within the tolerance, such that the number of points scales with
+the structure of the dispersion (e.g. close to the poles of a Sellmeier
+formula), rather than with the uniform density required in the worst region of
+the range.
+
+This file is part of ultrafast. ultrafast is free software: you can
+redistribute it and/or modify it under the terms of the GNU General Public
+License as published by the Free Software Foundation, either version 3 of the
+License, or any later version. ultrafast is distributed in the hope that it
+will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty
+of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General
+Public License for more details. You should have received a copy of the GNU
+General Public License along with ultrafast. If not, see
+<http://www.gnu.org/licenses/>.
+
+Copyright © 2016 Marcelo J P Alcocer
+"""
+
+# Imports
+import numpy
+from .core import Material, UltrafastError
+from . import core
+
+_margins = {
+	quantity: 2 * core._stencils[order][2] * max(
+		abs(offset) for offset in core._stencils[order][0]
+	)
+	for quantity, order in (("group_index", 1), ("gvd", 2), ("tod", 3))
+}
+"""Relative margins of derived quantities (twice the relative extents of
+their finite difference stencils, see :data:`ultrafast.core._stencils`)"""
+
+
+def margin(quantity):
+	"""Relative frequency margin
+
+	:param quantity:	Quantity (name of a material method)
+	:type quantity:	string
+
+	Returns the relative margin by which angular frequencies at which
+	*quantity* is evaluated must clear invalid frequencies (see
+	:meth:`ultrafast.core.Material.valid_mask`), i.e. twice the relative extent
+	of the finite difference stencil of derived quantities (``group_index``,
+	``gvd`` and ``tod``), and 0 otherwise.
+	"""
+	return(_margins.get(quantity, 0.0))
+
+
+def _range(materials):
+	"""Common frequency range of materials"""
+	low = max(material.range_[0] for material in materials)
+	high = min(material.range_[1] for material in materials)
+	if(not low < high):
+		raise UltrafastError("Material frequency ranges do not overlap")
+	return((low, high))
+
+
+def _intervals(materials, range_, margin):
+	"""Valid intervals
+
+	Returns the sorted list of the (low, high) intervals within *range_* over
+	which all *materials* are valid (see
+	:attr:`ultrafast.core.RIIDMaterial.validity`), shrunk by the relative
+	*margin*.
+	"""
+	intervals = [tuple(range_)]
+	for material in materials:
+		valid = getattr(material, "validity", [material.range_])
+		intervals = [
+			(max(a, c), min(b, d)) for a, b in intervals for c, d in valid
+			if max(a, c) < min(b, d)
+		]
+	intervals = [(a * (1 + margin), b * (1 - margin)) for a, b in intervals]
+	return([(a, b) for a, b in intervals if a < b])
+
+
+def _seed(range_, poles, num):
+	"""Initial grid
+
+	Returns *num* uniformly spaced points across *range_*, together with points
+	spaced geometrically in distance from each pole in *poles*, such that the
+	seed density increases towards (and is finest at the range edge closest to)
+	each pole.
+	"""
+	low, high = range_
+	span = high - low
+	points = [numpy.linspace(low, high, num)]
+	for pole in poles:
+		if(pole <= low):
+			distance = low - pole
+		elif(pole >= high):
+			distance = pole - high
+		else:
+			distance = 1e-6 * span
+		steps = distance * numpy.geomspace(
+			1, 1 + span / distance, num=max(num, 2)
+		)
+		points.append(pole + steps)
+		points.append(pole - steps)
+	points = numpy.unique(numpy.concatenate(points))
+
+	# Interior points (excluding rounded duplicates of the edges)
+	margin = 1e-12 * span
+	points = points[(points > low + margin) & (points < high - margin)]
+	return(numpy.concatenate(([low], points, [high])))
+
+
+def adaptive_grid(
+	materials,
+	tolerance,
+	range_=None,
+	quantity="n",
+	num=17,
+	max_points=1000000
+):
+	"""Adaptive angular frequency grid
+
+	:param materials:	Material(s)
+	:type materials:	:class:`ultrafast.core.Material`, list
+	:param tolerance:	Absolute interpolation tolerance
+	:type tolerance:	float
+	:param range_:	Frequency range (low,high) in :math:`rad / fs`
+	:type range_:	tuple
+	:param quantity:	Sampled quantity (name of a material method)
+	:type quantity:	string
+	:param num:	Number of uniformly spaced seed points
+	:type num:	int
+	:param max_points:	Maximum number of grid points
+	:type max_points:	int
+
+	Returns a sorted array of angular frequencies (:math:`rad / fs`) across
+	*range_* (by default the common range of *materials*) on which linear
+	interpolation of *quantity* (by default the refractive index) is accurate to
+	within *tolerance* for every material.
+
+	Frequencies at which any material is invalid (see
+	:attr:`ultrafast.core.RIIDMaterial.validity`), e.g. close to poles within
+	*range_*, are excluded: the grid is built separately within each valid
+	interval (shrunk by the finite difference stencil extent of derived
+	quantities, e.g. GVD), and contains no points within the gaps between
+	them, across which it must not be interpolated.
+
+	Each interval is seeded uniformly and, for
+	:class:`ultrafast.core.RIIDMaterial` instances, with points clustered towards
+	the poles of the dispersion formula (see
+	:attr:`ultrafast.core.RIIDMaterial.poles`). It is then refined iteratively:
+	the interpolation error of each interval is estimated from the sample at its
+	midpoint, :math:`\\epsilon \\approx h^2 |f''| / 8`, and intervals exceeding
+	*tolerance* are subdivided into :math:`\\lceil \\sqrt{\\epsilon / tol}
+	\\rceil` (even, at most 64) equal parts. All materials are evaluated on
+	whole arrays of new points per iteration. Refinement stops once every
+	interval satisfies the tolerance, or raises UltrafastError if *max_points*
+	would be exceeded.
+	"""
+	if(isinstance(materials, Material)):
+		materials = (materials,)
+	materials = tuple(materials)
+	if(not materials):
+		raise UltrafastError("No materials given")
+	if(tolerance <= 0):
+		raise UltrafastError("Tolerance must be positive")
+	if(range_ is None):
+		range_ = _range(materials)
+	functions = [getattr(material, quantity) for material in materials]
+
+	def evaluate(omega):
+		with numpy.errstate(invalid="ignore", divide="ignore"):
+			return(numpy.array([
+				numpy.real_if_close(function(omega)).astype(float)
+				for function in functions
+			]).reshape(len(functions), -1))
+
+	intervals = _intervals(materials, range_, margin(quantity))
+	if(not intervals):
+		raise UltrafastError("No valid frequencies within range")
+	poles = numpy.unique(numpy.concatenate(
+		[getattr(material, "poles", ()) for material in materials] + [[]]
+	))
+	grids = []
+	for interval in intervals:
+		grids.append(_refine(
+			evaluate, _seed(interval, poles, num), tolerance,
+			max_points - sum(len(grid) for grid in grids)
+		))
+	return(numpy.concatenate(grids))
+
+
+def _refine(evaluate, omega, tolerance, max_points):
+	"""Refine grid
+
+	Returns the grid *omega* refined until linear interpolation of the values
+	returned by *evaluate* is accurate to within *tolerance* (see
+	:func:`adaptive_grid`), raising UltrafastError if *max_points* would be
+	exceeded. Intervals whose interpolation error is undefined (NaN values) are
+	not converged.
+	"""
+	values = evaluate(omega)
+	while(True):
+		# Midpoint interpolation error
+		midpoints = (omega[:-1] + omega[1:]) / 2
+		middle = evaluate(midpoints)
+		error = numpy.abs(middle - (values[:, :-1] + values[:, 1:]) / 2)
+		error = numpy.nan_to_num(error, nan=numpy.inf).max(axis=0)
+		refine = numpy.nonzero(error > tolerance)[0]
+		if(not refine.size):
+			return(omega)
+
+		# Subdivide failing intervals (midpoints already evaluated)
+		parts = numpy.ceil(
+			numpy.sqrt(numpy.minimum(error[refine] / tolerance, 4096))
+		).astype(int)
+		parts += parts % 2
+		if(omega.size + (parts - 1).sum() > max_points):
+			raise UltrafastError(
+				"Adaptive grid exceeds {} points".format(max_points)
+			)
+		fractions = numpy.concatenate([
+			numpy.arange(1, p) / p for p in parts
+		])
+		starts = numpy.repeat(refine, parts - 1)
+		new = omega[starts] + fractions * (omega[starts + 1] - omega[starts])
+		halves = fractions == 0.5
+		new_values = numpy.empty((len(values), new.size))
+		new_values[:, halves] = middle[:, starts[halves]]
+		if((~halves).any()):
+			new_values[:, ~halves] = evaluate(new[~halves])
+		order = numpy.argsort(numpy.concatenate((omega, new)), kind="stable")
+		omega = numpy.concatenate((omega, new))[order]
+		values = numpy.concatenate((values, new_values), axis=1)[:, order]
@@ -0,0 +1,298 @@
+"""Ultrafast jit module
+
+This module contains an optional accelerated backend for the RefractiveIndex.info
+dispersion formula kernels of :class:`ultrafast.core.RIIDMaterial`, compiled
+with `numba <http://numba.pydata.org>`_ if installed.
+
+Each formula is compiled to a single fused loop over frequencies, evaluating
+all terms per element without array temporaries. Group index, GVD and TOD are
+compiled to fused finite difference loops, evaluating all stencil points per
+element. Loops are parallelized across cores (see ``numba.set_num_threads``),
+and compiled lazily on first use.
+
+The backend is selected process-wide or per material:
+
+	>>> import ultrafast.jit
+	>>> ultrafast.jit.use("numba")			# All formula materials
+	>>> ultrafast.jit.use("numba", material)	# Single material
+
+If numba is not installed, the ``numba`` backend transparently falls back to the
+NumPy kernels (see :data:`available`). Scalar and small inputs, and coefficient
+arrays broadcast against frequency (e.g. :class:`ultrafast.uncertainty.Ensemble`),
+always use the NumPy kernels. See ``examples/jit_benchmark.py``.
+
+This file is part of ultrafast. ultrafast is free software: you can
+redistribute it and/or modify it under the terms of the GNU General Public
+License as published by the Free Software Foundation, either version 3 of the
+License, or any later version. ultrafast is distributed in the hope that it
+will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty
+of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General
+Public License for more details. You should have received a copy of the GNU
+General Public License along with ultrafast. If not, see
+<http://www.gnu.org/licenses/>.
+
+Copyright © 2016 Marcelo J P Alcocer
+"""
+
+# Imports
+from functools import lru_cache
+import math
+import numpy
+from .core import UltrafastError
+from . import core
+
+try:
+	import numba
+except ImportError:
+	numba = None
+
+available = numba is not None
+"""Compiled backend availability
+
+True if numba is installed, else the ``numba`` backend uses the NumPy kernels
+"""
+
+threshold = 64
+"""Minimum number of elements evaluated by compiled kernels"""
+
+_c = core.c
+"""Speed of light in :math:`\\mu m / fs`"""
+
+_2pic = core.c * 2 * core.pi
+"""Wavelength <-> angular frequency conversion constant"""
+
+
+# Scalar dispersion formulas (mirroring ultrafast.core._formula_*)
+
+def _power(x, p):
+	"""Power with integer exponent fast path
+
+	Catalogue exponents are mostly small integers, for which repeated
+	multiplication is much cheaper than a general power.
+	"""
+	if(p == math.floor(p) and abs(p) <= 16):
+		result = 1.0
+		for _ in range(int(abs(p))):
+			result *= x
+		return(result if p >= 0 else 1.0 / result)
+	return(x ** p)
+
+
+if(available):
+	_power = numba.njit(inline="always", error_model="numpy")(_power)
+
+
+def _formula_1(lambda_, c):
+	"""Formula 1 - Sellmeier (preferred)"""
+	lambda2 = lambda_ * lambda_
+	n2 = 1.0 + c[0]
+	for i in range(1, c.size - 1, 2):
+		n2 += (c[i] * lambda2) / (lambda2 - c[i + 1] * c[i + 1])
+	return(math.sqrt(n2))
+
+
+def _formula_2(lambda_, c):
+	"""Formula 2 - Sellmeier-2"""
+	lambda2 = lambda_ * lambda_
+	n2 = 1.0 + c[0]
+	for i in range(1, c.size - 1, 2):
+		n2 += (c[i] * lambda2) / (lambda2 - c[i + 1])
+	return(math.sqrt(n2))
+
+
+def _formula_3(lambda_, c):
+	"""Formula 3 - Polynomial"""
+	n2 = c[0]
+	for i in range(1, c.size - 1, 2):
+		n2 += c[i] * _power(lambda_, c[i + 1])
+	return(math.sqrt(n2))
+
+
+def _formula_4(lambda_, c):
+	"""Formula 4 - RefractiveIndex.info"""
+	lambda2 = lambda_ * lambda_
+	n2 = c[0]
+	for i in (1, 5):
+		if(i + 3 < c.size):
+			n2 += (
+				(c[i] * _power(lambda_, c[i + 1])) /
+				(lambda2 - _power(c[i + 2], c[i + 3]))
+			)
+	for i in range(9, c.size - 1, 2):
+		n2 += c[i] * _power(lambda_, c[i + 1])
+	return(math.sqrt(n2))
+
+
+def _formula_5(lambda_, c):
+	"""Formula 5 - Cauchy"""
+	n = c[0]
+	for i in range(1, c.size - 1, 2):
+		n += c[i] * _power(lambda_, c[i + 1])
+	return(n)
+
+
+def _formula_6(lambda_, c):
+	"""Formula 6 - Gases"""
+	sigma2 = 1.0 / (lambda_ * lambda_)
+	n = 1.0 + c[0]
+	for i in range(1, c.size - 1, 2):
+		n += c[i] / (c[i + 1] - sigma2)
+	return(n)
+
+
+def _formula_7(lambda_, c):
+	"""Formula 7 - Herzberger"""
+	lambda2 = lambda_ * lambda_
+	shifted = lambda2 - 0.028
+	n = c[0] + c[1] / shifted + c[2] / (shifted * shifted)
+	power = 1.0
+	for i in range(3, c.size):
+		power *= lambda2
+		n += c[i] * power
+	return(n)
+
+
+def _formula_8(lambda_, c):
+	"""Formula 8 - Retro"""
+	lambda2 = lambda_ * lambda_
+	alpha = c[0] + (c[1] * lambda2) / (lambda2 - c[2]) + c[3] * lambda2
+	return(math.sqrt(-((2.0 * alpha + 1.0) / (alpha - 1.0))))
+
+
+def _formula_9(lambda_, c):
+	"""Formula 9 - Exotic"""
+	d = lambda_ - c[4]
+	n2 = c[0] + c[1] / (lambda_ * lambda_ - c[2]) + (c[3] * d) / (d * d + c[5])
+	return(math.sqrt(n2))
+
+
+_scalars = {
+	1: _formula_1,
+	2: _formula_2,
+	3: _formula_3,
+	4: _formula_4,
+	5: _formula_5,
+	6: _formula_6,
+	7: _formula_7,
+	8: _formula_8,
+	9: _formula_9,
+}
+"""Scalar dispersion formulas, keyed by formula number"""
+
+
+@lru_cache(maxsize=None)
+def _loops(formula):
+	"""Compiled loops of a formula
+
+	Returns the 2-tuple of compiled (refractive index, wavevector derivative)
+	loops of the dispersion *formula*, compiling them on first use.
+	"""
+	options = {"error_model": "numpy", "nogil": True}
+	scalar = numba.njit(**options)(_scalars[formula])
+
+	@numba.njit(parallel=True, **options)
+	def index(lambda_, c, out):
+		for i in numba.prange(lambda_.size):
+			out[i] = scalar(lambda_[i], c)
+
+	@numba.njit(parallel=True, **options)
+	def derivative(omega, c, offsets, weights, step, order, out):
+		for i in numba.prange(omega.size):
+			h = step * omega[i]
+			total = 0.0
+			for j in range(offsets.size):
+				x = omega[i] + offsets[j] * h
+				total += weights[j] * (x * scalar(_2pic / x, c) / _c)
+			out[i] = total / h ** order
+
+	return((index, derivative))
+
+
+def _index_kernel(formula):
+	"""Refractive index kernel of a formula
+
+	Returns a kernel of the form ``kernel(lambda_, c)`` (see
+	:data:`ultrafast.core._formulas`) evaluating real floating point arrays of at
+	least :data:`threshold` elements, with one-dimensional coefficients, by the
+	compiled loop, and all other inputs by the NumPy kernel.
+	"""
+	fallback = core._formulas[formula]
+
+	def kernel(lambda_, c):
+		if(not (
+			isinstance(lambda_, numpy.ndarray) and
+			lambda_.dtype.kind == "f" and
+			lambda_.size >= threshold and
+			numpy.ndim(c) == 1
+		)):
+			return(fallback(lambda_, c))
+		values = numpy.ascontiguousarray(lambda_).reshape(-1)
+		out = numpy.empty_like(values)
+		_loops(formula)[0](
+			values, numpy.ascontiguousarray(c, dtype=values.dtype), out
+		)
+		return(out.reshape(lambda_.shape))
+
+	return(kernel)
+
+
+def _derivative_kernel(formula, order):
+	"""Wavevector derivative kernel of a formula
+
+	Returns a kernel of the form ``kernel(omega, c)`` evaluating the *order*-th
+	angular frequency derivative of the wavevector by the compiled finite
+	difference loop (see :data:`ultrafast.core._stencils`).
+	"""
+	offsets, weights, step = core._stencils[order]
+	offsets = numpy.array(offsets, dtype=float)
+	weights = numpy.array(weights, dtype=float)
+
+	def kernel(omega, c):
+		omega = numpy.asarray(omega, dtype=float)
+		values = numpy.ascontiguousarray(omega).reshape(-1)
+		out = numpy.empty_like(values)
+		_loops(formula)[1](
+			values, numpy.ascontiguousarray(c, dtype=float),
+			offsets, weights, step, order, out
+		)
+		return(out.reshape(omega.shape)[()])
+
+	return(kernel)
+
+
+def use(backend="numba", material=None):
+	"""Select formula kernel backend
+
+	:param backend:	Backend name (``numpy`` or ``numba``)
+	:type backend:	string
+	:param material:	Material
+	:type material:	:class:`ultrafast.core.RIIDMaterial`,
+		:class:`ultrafast.thermal.TemperatureSellmeierMaterial`
+
+	Selects the formula kernel *backend* for *material*, or process-wide if
+	None. Per material selections take precedence over the process-wide
+	selection; pass *backend* None to revert a material to the process-wide
+	selection.
+	"""
+	if(backend is not None and backend not in core._backends):
+		raise UltrafastError("Unknown backend: {}".format(backend))
+	if(material is None):
+		if(backend is None):
+			raise UltrafastError("Process-wide backend must be named")
+		core._backend = backend
+	elif(getattr(material, "formula", None) is None):
+		raise UltrafastError("Backend selection requires a formula material")
+	else:
+		material.backend = backend
+
+
+# Register backend
+_kernels = {}
+for _formula in core._formulas:
+	if(available):
+		_kernels[_formula] = _index_kernel(_formula)
+		for _order in core._stencils:
+			_kernels[(_formula, _order)] = _derivative_kernel(_formula, _order)
+	else:
+		_kernels[_formula] = core._formulas[_formula]
+core._backends["numba"] = _kernels
@@ -0,0 +1,258 @@
+"""Ultrafast kramerskronig module
+
+This module contains Kramers-Kronig transforms between the refractive index
+:math:`n` and extinction coefficient :math:`k` on uniform angular frequency
+grids, e.g. to derive the dispersion of a material known only by its absorption,
+or to check the causality of a fitted dispersion:
+
+	>>> n = ultrafast.kramerskronig.n_from_k(omega, k, anchors=[(2.35, 1.45)])
+	>>> k = ultrafast.kramerskronig.k_from_n(omega, material.n(omega))
+
+The principal value integrals are discretized by Maclaurin's formula (Ohta and
+Ishida, Appl. Spectrosc. 42, 952 (1988)), summing alternate grid points. The
+sums are discrete convolutions, evaluated by FFT in :math:`O(N \\log N)`
+operations, such that grids of :math:`10^6` points transform in about a second.
+
+The transforms only integrate over the grid, i.e. assume no absorption
+(dispersion) outside it. Given the transformed quantity at one or more anchor
+frequencies, the truncation error is instead reduced by multiply subtractive
+Kramers-Kronig (Palmer et al., Opt. Commun. 151, 217 (1998)), with the data
+continued by their edge values outside the grid to remove the logarithmic
+singularities at the grid edges.
+
+This file is part of ultrafast. ultrafast is free software: you can
+redistribute it and/or modify it under the terms of the GNU General Public
+License as published by the Free Software Foundation, either version 3 of the
+License, or any later version. ultrafast is distributed in the hope that it
+will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty
+of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General
+Public License for more details. You should have received a copy of the GNU
+General Public License along with ultrafast. If not, see
+<http://www.gnu.org/licenses/>.
+
+Copyright © 2016 Marcelo J P Alcocer
+"""
+
+# Imports
+import numpy
+from scipy.signal import fftconvolve
+from .core import UltrafastError, pi
+
+
+def _grid(omega):
+	"""Uniform grid origin and spacing
+
+	Asserts *omega* is a uniform, ascending, non-negative angular frequency grid
+	of at least 3 points, returning its (first frequency, spacing).
+	"""
+	omega = numpy.asarray(omega, dtype=float)
+	if(omega.ndim != 1 or len(omega) < 3):
+		raise UltrafastError("Angular frequency grid must be 1-D (3+ points)")
+	delta = (omega[-1] - omega[0]) / (len(omega) - 1)
+	if(
+		delta <= 0 or omega[0] < 0 or
+		numpy.abs(numpy.diff(omega) - delta).max() > 1e-6 * delta
+	):
+		raise UltrafastError(
+			"Angular frequency grid must be uniform, ascending and non-negative"
+		)
+	return((omega[0], delta))
+
+
+def _transform(values, origin, delta, sign):
+	"""Truncated Kramers-Kronig sum
+
+	Returns :math:`(2 / \\pi) \\sum_j f_j [1 / (j - i) + s \\Delta /
+	(\\omega_i + \\omega_j)]` over grid points :math:`j` with :math:`i - j` odd,
+	for the *values* :math:`f` on the uniform grid of first frequency *origin*
+	and spacing *delta*, and *sign* :math:`s`.
+	"""
+	size = len(values)
+
+	# Difference (Hilbert) kernel 1 / m, m odd
+	m = numpy.arange(-(size - 1), size)
+	difference = numpy.zeros(len(m))
+	odd = m % 2 == 1
+	difference[odd] = 1 / m[odd]
+
+	# Sum kernel delta / (2 * origin + m * delta), m odd
+	m = numpy.arange(2 * size - 1)
+	total = numpy.zeros(len(m))
+	odd = m % 2 == 1
+	total[odd] = delta / (2 * origin + m[odd] * delta)
+
+	return((2 / pi) * (
+		-fftconvolve(values, difference)[size - 1:2 * size - 1] +
+		sign * fftconvolve(values[::-1], total)[size - 1:2 * size - 1]
+	))
+
+
+def _continued(values, origin, delta, sign):
+	"""Continued Kramers-Kronig sum
+
+	Returns :func:`_transform` of the *values* continued by their edge values
+	outside the grid, i.e. over as many points again either side (down to zero
+	frequency), and analytically beyond. The logarithmic singularities at the
+	grid edges of the truncated transform are thereby moved away from the grid,
+	leaving a smooth error (up to an additive constant for *sign* 1, whose
+	continued integral diverges).
+	"""
+	size = len(values)
+	lower = min(size, int(origin / delta + 1e-9))
+	extended = numpy.concatenate((
+		numpy.full(lower, values[0]), values, numpy.full(size, values[-1])
+	))
+	result = _transform(extended, origin - lower * delta, delta, sign)
+	result = result[lower:lower + size]
+
+	# Analytic continuation beyond extended grid
+	omega = origin + delta * numpy.arange(size)
+	low = origin - lower * delta
+	high = origin + (2 * size - 1) * delta
+	if(sign < 0):
+		result += values[-1] / pi * numpy.log((high + omega) / (high - omega))
+		if(low > 0):
+			result += values[0] / pi * numpy.log((omega - low) / (omega + low))
+	else:
+		result -= values[-1] / pi * numpy.log(
+			(high ** 2 - omega ** 2) / high ** 2
+		)
+		if(low > 0):
+			result += values[0] / pi * numpy.log(
+				(omega ** 2 - low ** 2) / omega ** 2
+			)
+	return(result)
+
+
+def _anchor(omega, transformed, anchors, scale):
+	"""Multiply subtractive correction
+
+	Adds to the truncated transform *transformed* (divided by *scale*) the
+	polynomial in :math:`\\omega^2` interpolating its error at the (frequency,
+	value) *anchors*, returning the corrected transform.
+	"""
+	anchors = numpy.asarray(anchors, dtype=float).reshape(-1, 2)
+	x = numpy.power(anchors[:, 0], 2)
+	if(len(numpy.unique(x)) != len(x)):
+		raise UltrafastError("Anchor frequencies must be distinct")
+	error = (
+		anchors[:, 1] / scale(anchors[:, 0]) -
+		numpy.interp(anchors[:, 0], omega, transformed / scale(omega))
+	)
+	x_ = numpy.power(omega, 2)
+	correction = numpy.zeros(len(omega))
+	for j in range(len(x)):
+		basis = numpy.ones(len(omega))
+		for m in range(len(x)):
+			if(m != j):
+				basis *= (x_ - x[m]) / (x[j] - x[m])
+		correction += error[j] * basis
+	return(transformed + correction * scale(omega))
+
+
+def n_from_k(omega, k, anchors=None):
+	"""Refractive index from extinction coefficient
+
+	:param omega:	Angular frequency in :math:`rad / fs`
+	:type omega:	array_like
+	:param k:	Extinction coefficient
+	:type k:	array_like
+	:param anchors:	Known refractive indices
+	:type anchors:	list of (float, float)
+
+	Returns the refractive index on the uniform angular frequency grid *omega*
+	given by the Kramers-Kronig transform of the extinction coefficient *k* on
+	the same grid:
+
+	.. math::
+
+		n(\\omega) - 1 = \\frac{2}{\\pi} P \\int \\frac{\\omega' k(\\omega')}
+		{\\omega'^2 - \\omega^2} d\\omega'
+
+	*anchors* is a list of (angular frequency, refractive index) pairs. If
+	given, the transform is multiply subtractive, else assumes no absorption
+	outside the grid.
+	"""
+	origin, delta = _grid(omega)
+	omega = numpy.asarray(omega, dtype=float)
+	k = numpy.asarray(k, dtype=float)
+	if(anchors is None):
+		n = 1 + _transform(k, origin, delta, 1)
+	else:
+		n = _anchor(
+			omega, 1 + _continued(k, origin, delta, 1), anchors,
+			numpy.ones_like
+		)
+	return(n)
+
+
+def k_from_n(omega, n, anchors=None):
+	"""Extinction coefficient from refractive index
+
+	:param omega:	Angular frequency in :math:`rad / fs`
+	:type omega:	array_like
+	:param n:	Refractive index
+	:type n:	array_like
+	:param anchors:	Known extinction coefficients
+	:type anchors:	list of (float, float)
+
+	Returns the extinction coefficient on the uniform angular frequency grid
+	*omega* given by the Kramers-Kronig transform of the refractive index *n* on
+	the same grid:
+
+	.. math::
+
+		k(\\omega) = -\\frac{2 \\omega}{\\pi} P \\int \\frac{n(\\omega') - 1}
+		{\\omega'^2 - \\omega^2} d\\omega'
+
+	*anchors* is a list of (angular frequency, extinction coefficient) pairs.
+	If given, the transform is multiply subtractive (in :math:`k / \\omega`),
+	else assumes no dispersion outside the grid.
+	"""
+	origin, delta = _grid(omega)
+	omega = numpy.asarray(omega, dtype=float)
+	n = numpy.asarray(n, dtype=float)
+	if(anchors is None):
+		k = -_transform(n - 1, origin, delta, -1)
+	else:
+		k = _anchor(
+			omega, -_continued(n - 1, origin, delta, -1), anchors,
+			lambda x: numpy.asarray(x, dtype=float)
+		)
+	return(k)
+
+
+def extinction(material, omega, anchors=None):
+	"""Material extinction coefficient
+
+	:param material:	Material
+	:type material:	:class:`ultrafast.core.Material`
+	:param omega:	Angular frequency in :math:`rad / fs`
+	:type omega:	array_like
+	:param anchors:	Known extinction coefficients
+	:type anchors:	list of (float, float)
+
+	Returns the extinction coefficient of *material* consistent (by
+	:func:`k_from_n`) with its refractive index on the grid *omega*.
+	"""
+	return(k_from_n(omega, material.n(omega), anchors))
+
+
+def residual(material, omega, k, anchors=None):
+	"""Causality residual
+
+	:param material:	Material
+	:type material:	:class:`ultrafast.core.Material`
+	:param omega:	Angular frequency in :math:`rad / fs`
+	:type omega:	array_like
+	:param k:	Extinction coefficient
+	:type k:	array_like
+	:param anchors:	Known refractive indices
+	:type anchors:	list of (float, float)
+
+	Returns the difference between the refractive index of *material* and that
+	given by the Kramers-Kronig transform (see :func:`n_from_k`) of the
+	extinction coefficient *k*, on the grid *omega*. Small for causal
+	dispersion.
+	"""
+	return(material.n(omega) - n_from_k(omega, k, anchors))
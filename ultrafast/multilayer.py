@@ -0,0 +1,458 @@
+"""Ultrafast multilayer module
+
+This module contains tools for calculating the optical response of thin-film
+stacks (e.g. dielectric and chirped mirrors) using the characteristic (2x2
+transfer) matrix method.
+
+Calculations are vectorized across angular frequency and angle of incidence.
+The product over layers is accumulated as a batched matrix-vector product, such
+that the cost scales linearly with the number of layers and frequencies.
+
+This file is part of ultrafast. ultrafast is free software: you can
+redistribute it and/or modify it under the terms of the GNU General Public
+License as published by the Free Software Foundation, either version 3 of the
+License, or any later version. ultrafast is distributed in the hope that it
+will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty
+of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General
+Public License for more details. You should have received a copy of the GNU
+General Public License along with ultrafast. If not, see
+<http://www.gnu.org/licenses/>.
+
+Copyright © 2016 Marcelo J P Alcocer
+"""
+
+# Imports
+from collections import Counter
+import numpy
+from numpy.lib import scimath
+from . import core
+from .core import c, PropertySetError, UltrafastError
+
+
+class Stack:
+	"""Thin-film stack class"""
+
+	name = None
+	"""Stack name"""
+
+	_layers = None
+	"""Layer materials
+
+	Property attribute. See setter and getter methods for further details.
+	"""
+
+	_thicknesses = None
+	"""Layer thicknesses
+
+	Property attribute. See setter and getter methods for further details.
+	"""
+
+	_substrate = None
+	"""Substrate material
+
+	Property attribute. See setter and getter methods for further details.
+	"""
+
+	_incident = None
+	"""Incident material
+
+	Property attribute. See setter and getter methods for further details.
+	"""
+
+	def __init__(
+		self,
+		layers,
+		thicknesses,
+		substrate,
+		incident=None,
+		name=None
+	):
+		"""Stack class init
+
+		:param layers:	Layer materials, ordered from the incident side
+		:type layers:	list of :class:`ultrafast.core.Material`
+		:param thicknesses:	Layer thicknesses in :math:`\\mu m`
+		:type thicknesses:	array_like
+		:param substrate:	Substrate material
+		:type substrate:	:class:`ultrafast.core.Material`
+		:param incident:	Incident material
+		:type incident:	:class:`ultrafast.core.Material`
+		:param name:	Stack name
+		:type name:		string
+
+		Class describing a stack of homogeneous, isotropic thin films deposited on
+		a semi-infinite *substrate*, illuminated from the semi-infinite *incident*
+		material. If None, *incident* is assumed to be :attr:`ultrafast.core.air`.
+
+		Refractive indices are evaluated once per distinct material and cached
+		against the frequency grid and material version, such that changing only
+		:attr:`thicknesses` (e.g. during optimization) does not re-evaluate any
+		dispersion function, and modifying a material (e.g. its coefficients) only
+		re-evaluates that material.
+		"""
+		self._cache = None
+		self.layers = layers
+		self.thicknesses = thicknesses
+		self.substrate = substrate
+		self.incident = core.air if incident is None else incident
+		self.name = name
+
+	@property
+	def layers(self):
+		"""Layer materials
+
+		List of :class:`ultrafast.core.Material`, ordered from the incident side.
+		"""
+		return(self._layers)
+
+	@layers.setter
+	def layers(self, value):
+		"""Layer materials setter method
+
+		- Invalidates cached refractive indices
+		"""
+		self._layers = list(value)
+		self._cache = None
+
+	@property
+	def substrate(self):
+		"""Substrate material
+
+		Semi-infinite :class:`ultrafast.core.Material` on the transmitted side.
+		"""
+		return(self._substrate)
+
+	@substrate.setter
+	def substrate(self, value):
+		"""Substrate material setter method
+
+		- Invalidates cached refractive indices
+		"""
+		self._substrate = value
+		self._cache = None
+
+	@property
+	def incident(self):
+		"""Incident material
+
+		Semi-infinite :class:`ultrafast.core.Material` on the incident side.
+		"""
+		return(self._incident)
+
+	@incident.setter
+	def incident(self, value):
+		"""Incident material setter method
+
+		- Invalidates cached refractive indices
+		"""
+		self._incident = value
+		self._cache = None
+
+	@property
+	def thicknesses(self):
+		"""Layer thicknesses
+
+		Array of layer thicknesses in :math:`\\mu m`, one per layer.
+		"""
+		return(self._thicknesses)
+
+	@thicknesses.setter
+	def thicknesses(self, value):
+		"""Layer thicknesses setter method
+
+		- Asserts one thickness per layer
+		"""
+		value = numpy.array(value, dtype=float)
+		if(value.shape != (len(self.layers),)):
+			raise PropertySetError(
+				"thicknesses",
+				"Number of thicknesses does not match number of layers"
+			)
+		self._thicknesses = value
+
+	def _admittances(self, omega, theta):
+		"""Normalized z-components of the wavevector
+
+		:param omega:	Angular frequency in :math:`rad / fs`
+		:type omega:	array_like
+		:param theta:	Angle of incidence in :math:`rad`
+		:type theta:	array_like
+
+		Returns a 3-tuple of incident, substrate and per-distinct-material
+		:math:`(n, n \\cos\\theta)` pairs. Results are cached against *omega*,
+		*theta* and material versions.
+		"""
+		omega = numpy.asarray(omega, dtype=float)
+		theta = numpy.asarray(theta, dtype=float)
+		cache = self._cache
+		if(cache is not None and not numpy.array_equal(cache["omega"], omega)):
+			cache = None
+		distinct = {}
+		for material in [self.incident, self.substrate] + self.layers:
+			distinct.setdefault(id(material), material)
+		versions = {key: material.version for key, material in distinct.items()}
+		if(
+			cache is not None and
+			cache["versions"] == versions and
+			numpy.array_equal(cache["theta"], theta)
+		):
+			return(cache["admittances"])
+
+		# Refractive indices (evaluated once per material, grid and version)
+		previous = {} if cache is None else cache["materials"]
+		materials = {}
+		for key, material in distinct.items():
+			if(
+				key in previous and previous[key][0] is material and
+				cache["versions"].get(key) == versions[key]
+			):
+				materials[key] = previous[key]
+			else:
+				materials[key] = (material, material.n(omega))
+		cache = {
+			"omega": omega.copy(),
+			"materials": materials,
+			"versions": versions
+		}
+
+		# Invariant tangential wavevector (Snell)
+		s2 = numpy.power(
+			materials[id(self.incident)][1] * numpy.sin(theta), 2
+		)
+
+		def admittance(material):
+			n = materials[id(material)][1]
+			return(n, scimath.sqrt(numpy.power(n, 2) - s2))
+
+		admittances = (
+			admittance(self.incident),
+			admittance(self.substrate),
+			{key: admittance(value[0]) for key, value in materials.items()}
+		)
+		cache["theta"] = theta.copy()
+		cache["admittances"] = admittances
+		self._cache = cache
+		return(admittances)
+
+	def amplitudes(self, omega, theta=0, polarization="s"):
+		"""Reflection and transmission amplitude coefficients
+
+		:param omega:	Angular frequency in :math:`rad / fs`
+		:type omega:	array_like
+		:param theta:	Angle of incidence in :math:`rad`
+		:type theta:	float, array_like
+		:param polarization:	Polarization (``s`` or ``p``)
+		:type polarization:	string
+
+		Returns the 2-tuple (r, t) of complex amplitude coefficients. *omega* and
+		*theta* are broadcast against each other, e.g. a (angle, frequency) grid is
+		evaluated by passing *theta* of shape (M, 1) and *omega* of shape (N,).
+
+		The phase convention is that of :meth:`ultrafast.core.Material.wavevector`,
+		i.e. propagation through a thickness :math:`L` accumulates a phase
+		:math:`+kL`.
+
+		Lossless stacks are evaluated in real arithmetic, in place, in cache sized
+		blocks of :data:`ultrafast.core._block` elements, with the characteristic
+		matrix of each distinct (material, thickness) layer computed once per
+		block, such that periodic stacks (e.g. quarter-wave mirrors) cost one
+		sine and cosine per distinct layer rather than per layer.
+		"""
+		if(polarization not in ("s", "p")):
+			raise UltrafastError(
+				"Unknown polarization: {}".format(polarization)
+			)
+		incident, substrate, layers = self._admittances(omega, theta)
+		omega = numpy.asarray(omega, dtype=float)
+
+		def eta(n, q):
+			"""Tilted optical admittance"""
+			return(q if polarization == "s" else numpy.power(n, 2) / q)
+
+		# Tilted admittances, evaluated once per distinct material
+		eta_0 = eta(*incident)
+		eta_s = eta(*substrate)
+		etas = {key: eta(*value) for key, value in layers.items()}
+		k_0 = omega / c
+
+		# Accumulate (B, C) = M_1 ... M_N (1, eta_s) from the substrate outwards
+		if(not any(
+			numpy.iscomplexobj(value) for value in [eta_s] + list(etas.values())
+		)):
+			b, c_ = self._lossless(k_0, eta_s, etas, layers)
+		else:
+			b = 1 + 0j
+			c_ = eta_s + 0j
+			for material, thickness in zip(
+				reversed(self.layers), reversed(self.thicknesses)
+			):
+				key = id(material)
+				delta = (k_0 * thickness) * layers[key][1]
+				cos = numpy.cos(delta)
+				isin = 1j * numpy.sin(delta)
+				b, c_ = (
+					cos * b - (isin / etas[key]) * c_,
+					cos * c_ - (isin * etas[key]) * b
+				)
+
+		# Amplitude coefficients
+		denominator = eta_0 * b + c_
+		return(
+			(eta_0 * b - c_) / denominator,
+			2 * eta_0 / denominator
+		)
+
+	def _lossless(self, k_0, eta_s, etas, layers):
+		"""Lossless characteristic matrix product
+
+		Returns the 2-tuple (B, C) of :meth:`amplitudes` for real tilted
+		admittances *eta_s* (substrate) and *etas* (per distinct material), given
+		the vacuum wavenumber *k_0* and the per distinct material admittances
+		*layers*.
+		"""
+		keys = [
+			(id(material), thickness) for material, thickness in
+			zip(reversed(self.layers), reversed(self.thicknesses.tolist()))
+		]
+		counts = Counter(keys)
+		shape = numpy.broadcast_shapes(
+			numpy.shape(k_0), numpy.shape(eta_s),
+			*(numpy.shape(layers[key][1]) for key, _ in counts),
+			*(numpy.shape(etas[key]) for key, _ in counts)
+		)
+
+		def flat(value):
+			return(numpy.broadcast_to(value, shape).ravel())
+
+		k_0 = flat(k_0)
+		eta_s = flat(eta_s)
+		q = {key: flat(layers[key][1]) for key, _ in counts}
+		etas = {key: flat(etas[key]) for key, _ in counts}
+		b = numpy.empty(k_0.size, dtype=complex)
+		c_ = numpy.empty(k_0.size, dtype=complex)
+
+		# Accumulate (B, C) = M_1 ... M_N (1, eta_s) from the substrate outwards
+		for start in range(0, k_0.size, core._block):
+			part = slice(start, start + core._block)
+			size = len(k_0[part])
+			b_r, b_i = numpy.ones(size), numpy.zeros(size)
+			c_r, c_i = eta_s[part].copy(), numpy.zeros(size)
+			t_1, t_2 = numpy.empty(size), numpy.empty(size)
+			matrices = {}
+			for key in keys:
+				matrix = matrices.get(key)
+				if(matrix is None):
+					delta = (k_0[part] * key[1]) * q[key[0]][part]
+					sin = numpy.sin(delta)
+					matrix = (
+						numpy.cos(delta),
+						sin / etas[key[0]][part],
+						sin * etas[key[0]][part]
+					)
+					if(counts[key] > 1):
+						matrices[key] = matrix
+				cos, sin_eta, eta_sin = matrix
+				numpy.multiply(sin_eta, c_i, out=t_1)
+				numpy.multiply(eta_sin, b_r, out=t_2)
+				numpy.multiply(cos, b_r, out=b_r)
+				b_r += t_1
+				numpy.multiply(cos, c_i, out=c_i)
+				c_i -= t_2
+				numpy.multiply(sin_eta, c_r, out=t_1)
+				numpy.multiply(eta_sin, b_i, out=t_2)
+				numpy.multiply(cos, b_i, out=b_i)
+				b_i -= t_1
+				numpy.multiply(cos, c_r, out=c_r)
+				c_r += t_2
+			b.real[part], b.imag[part] = b_r, b_i
+			c_.real[part], c_.imag[part] = c_r, c_i
+		return((b.reshape(shape), c_.reshape(shape)))
+
+	def reflectance(self, omega, theta=0, polarization="s"):
+		"""Reflectance
+
+		:param omega:	Angular frequency in :math:`rad / fs`
+		:type omega:	array_like
+		:param theta:	Angle of incidence in :math:`rad`
+		:type theta:	float, array_like
+		:param polarization:	Polarization (``s`` or ``p``)
+		:type polarization:	string
+
+		Returns the intensity reflectance. See :meth:`amplitudes`.
+		"""
+		r = self.amplitudes(omega, theta, polarization)[0]
+		return(numpy.abs(r) ** 2)
+
+	def transmittance(self, omega, theta=0, polarization="s"):
+		"""Transmittance
+
+		:param omega:	Angular frequency in :math:`rad / fs`
+		:type omega:	array_like
+		:param theta:	Angle of incidence in :math:`rad`
+		:type theta:	float, array_like
+		:param polarization:	Polarization (``s`` or ``p``)
+		:type polarization:	string
+
+		Returns the intensity transmittance into the substrate. See
+		:meth:`amplitudes`.
+		"""
+		incident, substrate, _ = self._admittances(omega, theta)
+		t = self.amplitudes(omega, theta, polarization)[1]
+		if(polarization == "s"):
+			ratio = substrate[1] / incident[1]
+		else:
+			ratio = (
+				(numpy.power(substrate[0], 2) / substrate[1]) /
+				(numpy.power(incident[0], 2) / incident[1])
+			)
+		return(numpy.real(ratio) * numpy.abs(t) ** 2)
+
+	def phase(self, omega, theta=0, polarization="s"):
+		"""Reflected phase
+
+		:param omega:	Angular frequencies in :math:`rad / fs`
+		:type omega:	array_like
+		:param theta:	Angle of incidence in :math:`rad`
+		:type theta:	float, array_like
+		:param polarization:	Polarization (``s`` or ``p``)
+		:type polarization:	string
+
+		Returns the reflected spectral phase in :math:`rad`, unwrapped along the
+		last (frequency) axis. See :meth:`amplitudes`.
+		"""
+		r = self.amplitudes(omega, theta, polarization)[0]
+		return(numpy.unwrap(numpy.angle(r), axis=-1))
+
+	def gd(self, omega, theta=0, polarization="s"):
+		"""Group delay on reflection
+
+		:param omega:	Angular frequency grid in :math:`rad / fs`
+		:type omega:	array_like
+		:param theta:	Angle of incidence in :math:`rad`
+		:type theta:	float, array_like
+		:param polarization:	Polarization (``s`` or ``p``)
+		:type polarization:	string
+
+		Returns the group delay in :math:`fs`, calculated as the derivative of
+		:meth:`phase` along the one-dimensional frequency grid *omega*.
+		"""
+		return(numpy.gradient(
+			self.phase(omega, theta, polarization), omega, axis=-1
+		))
+
+	def gdd(self, omega, theta=0, polarization="s"):
+		"""Group delay dispersion on reflection
+
+		:param omega:	Angular frequency grid in :math:`rad / fs`
+		:type omega:	array_like
+		:param theta:	Angle of incidence in :math:`rad`
+		:type theta:	float, array_like
+		:param polarization:	Polarization (``s`` or ``p``)
+		:type polarization:	string
+
+		Returns the group delay dispersion in :math:`fs^2`, calculated as the
+		derivative of :meth:`gd` along the one-dimensional frequency grid *omega*.
+		"""
+		return(numpy.gradient(
+			self.gd(omega, theta, polarization), omega, axis=-1
+		))
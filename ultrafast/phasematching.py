@@ -0,0 +1,298 @@
+"""Ultrafast phase-matching module
+
+This module contains tools for calculating the phase-matching of three-wave
+mixing processes (SHG, SFG, OPA) in birefringent crystals described by
+:class:`ultrafast.core.BiaxialMaterial` and
+:class:`ultrafast.core.UniaxialMaterial`.
+
+All functions are vectorized. Frequency and angle arguments are broadcast
+against each other, such that whole (angle, pump, signal) grids are evaluated
+in a single call.
+
+Throughout, the three waves are labelled pump (*p*), signal (*s*) and idler
+(*i*), with energy conservation :math:`\\omega_p = \\omega_s + \\omega_i`.
+For SHG of a fundamental at :math:`\\omega`, pump and signal are
+:math:`2\\omega` and :math:`\\omega` respectively. For SFG of
+:math:`\\omega_1` and :math:`\\omega_2`, pump and signal are
+:math:`\\omega_1 + \\omega_2` and :math:`\\omega_1` respectively.
+
+This file is part of ultrafast. ultrafast is free software: you can
+redistribute it and/or modify it under the terms of the GNU General Public
+License as published by the Free Software Foundation, either version 3 of the
+License, or any later version. ultrafast is distributed in the hope that it
+will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty
+of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General
+Public License for more details. You should have received a copy of the GNU
+General Public License along with ultrafast. If not, see
+<http://www.gnu.org/licenses/>.
+
+Copyright © 2016 Marcelo J P Alcocer
+"""
+
+# Imports
+from math import ceil, log2
+import numpy
+from scipy.constants import pi
+from .core import c, UltrafastError
+
+types = {
+	"I": ("slow", "slow", "fast"),
+	"II": ("slow", "fast", "fast"),
+}
+"""Phase-matching types
+
+Dictionary mapping phase-matching type names to the (signal, idler, pump)
+eigenpolarizations. Polarizations are named ``slow`` (higher refractive index)
+and ``fast`` (lower refractive index). For a negative uniaxial crystal these
+correspond to the ordinary and extraordinary waves respectively.
+"""
+
+_fwhm = 4 * 1.391557377
+"""Full width of the :math:`sinc^2(\\Delta k L / 2)` curve in :math:`\\Delta k L`"""
+
+
+def _polarizations(type_):
+	"""Phase-matching polarizations
+
+	:param type_:	Phase-matching type
+	:type type_:	string, tuple
+
+	Returns the (signal, idler, pump) polarizations for the phase-matching type
+	*type_*, either a key of :data:`types` or an explicit 3-tuple of ``slow`` and
+	``fast`` strings.
+	"""
+	if(type_ in types):
+		return(types[type_])
+	if(
+		len(type_) == 3 and
+		all(polarization in ("slow", "fast") for polarization in type_)
+	):
+		return(tuple(type_))
+	raise UltrafastError("Unknown phase-matching type: {}".format(type_))
+
+
+def _inverse_squares(crystal, omega_p, omega_s):
+	"""Principal inverse square indices of the three waves
+
+	Evaluated once per wave so that angular scans reuse them.
+	"""
+	omega_p = numpy.asarray(omega_p, dtype=float)
+	omega_s = numpy.asarray(omega_s, dtype=float)
+	omega_i = omega_p - omega_s
+	return(
+		(omega_s, omega_i, omega_p),
+		tuple(
+			crystal._inverse_squares(omega)
+			for omega in (omega_s, omega_i, omega_p)
+		)
+	)
+
+
+def _mismatch(crystal, omegas, inverse_squares, theta, phi, polarizations):
+	"""Wavevector mismatch from precomputed principal indices"""
+	k = []
+	for omega, a, polarization in zip(omegas, inverse_squares, polarizations):
+		slow, fast = crystal._eigenindices(a, theta, phi)
+		k.append(omega * (slow if polarization == "slow" else fast) / c)
+	return(k[2] - k[0] - k[1])
+
+
+def delta_k(crystal, omega_p, omega_s, theta, phi=0, type_="I"):
+	"""Wavevector mismatch
+
+	:param crystal:	Nonlinear crystal
+	:type crystal:	:class:`ultrafast.core.BiaxialMaterial`
+	:param omega_p:	Pump angular frequency in :math:`rad / fs`
+	:type omega_p:	float, array_like
+	:param omega_s:	Signal angular frequency in :math:`rad / fs`
+	:type omega_s:	float, array_like
+	:param theta:	Polar angle to the z axis in :math:`rad`
+	:type theta:	float, array_like
+	:param phi:	Azimuthal angle from the x axis in :math:`rad`
+	:type phi:	float, array_like
+	:param type_:	Phase-matching type (see :data:`types`)
+	:type type_:	string, tuple
+
+	Returns the wavevector mismatch :math:`\\Delta k = k_p - k_s - k_i` in
+	:math:`rad / \\mu m`. All arguments are broadcast against each other.
+	"""
+	omegas, inverse_squares = _inverse_squares(crystal, omega_p, omega_s)
+	return(_mismatch(
+		crystal, omegas, inverse_squares, theta, phi, _polarizations(type_)
+	))
+
+
+def delta_k_map(crystal, theta, omega_p, omega_s, phi=0, type_="I"):
+	"""Wavevector mismatch map
+
+	:param crystal:	Nonlinear crystal
+	:type crystal:	:class:`ultrafast.core.BiaxialMaterial`
+	:param theta:	Polar angles to the z axis in :math:`rad`
+	:type theta:	array_like
+	:param omega_p:	Pump angular frequencies in :math:`rad / fs`
+	:type omega_p:	array_like
+	:param omega_s:	Signal angular frequencies in :math:`rad / fs`
+	:type omega_s:	array_like
+	:param phi:	Azimuthal angle from the x axis in :math:`rad`
+	:type phi:	float
+	:param type_:	Phase-matching type (see :data:`types`)
+	:type type_:	string, tuple
+
+	Returns the wavevector mismatch :math:`\\Delta k` in :math:`rad / \\mu m` on
+	the full grid spanned by the one-dimensional arrays *theta*, *omega_p* and
+	*omega_s*, as an array of shape (theta, pump, signal).
+	"""
+	theta, omega_p, omega_s = numpy.ix_(
+		numpy.ravel(theta), numpy.ravel(omega_p), numpy.ravel(omega_s)
+	)
+	return(delta_k(crystal, omega_p, omega_s, theta, phi, type_))
+
+
+def angle(
+	crystal,
+	omega_p,
+	omega_s,
+	phi=0,
+	type_="I",
+	bracket=(0, pi / 2),
+	tolerance=1e-10
+):
+	"""Phase-matching angle
+
+	:param crystal:	Nonlinear crystal
+	:type crystal:	:class:`ultrafast.core.BiaxialMaterial`
+	:param omega_p:	Pump angular frequency in :math:`rad / fs`
+	:type omega_p:	float, array_like
+	:param omega_s:	Signal angular frequency in :math:`rad / fs`
+	:type omega_s:	float, array_like
+	:param phi:	Azimuthal angle from the x axis in :math:`rad`
+	:type phi:	float, array_like
+	:param type_:	Phase-matching type (see :data:`types`)
+	:type type_:	string, tuple
+	:param bracket:	Polar angle search interval in :math:`rad` (low,high)
+	:type bracket:	tuple
+	:param tolerance:	Angular tolerance in :math:`rad`
+	:type tolerance:	float
+
+	Returns the polar angle *theta* for which :math:`\\Delta k = 0`, found by
+	vectorized bisection over *bracket*. The principal refractive indices are
+	evaluated once, such that e.g. a complete OPA tuning curve is solved in a
+	single call. Elements for which :math:`\\Delta k` does not change sign
+	across *bracket* are not phase-matchable and are returned as NaN.
+	"""
+	polarizations = _polarizations(type_)
+	omegas, inverse_squares = _inverse_squares(crystal, omega_p, omega_s)
+
+	def mismatch(theta):
+		return(_mismatch(
+			crystal, omegas, inverse_squares, theta, phi, polarizations
+		))
+
+	# Bracket
+	shape = numpy.broadcast(*omegas, phi).shape
+	low = numpy.full(shape, float(min(bracket)))
+	high = numpy.full(shape, float(max(bracket)))
+	f_low = mismatch(low)
+	valid = numpy.sign(f_low) != numpy.sign(mismatch(high))
+
+	# Bisect
+	for _ in range(max(1, ceil(log2((high.max() - low.min()) / tolerance)))):
+		mid = (low + high) / 2
+		f_mid = mismatch(mid)
+		lower = numpy.sign(f_mid) == numpy.sign(f_low)
+		low = numpy.where(lower, mid, low)
+		f_low = numpy.where(lower, f_mid, f_low)
+		high = numpy.where(lower, high, mid)
+
+	return(numpy.where(valid, (low + high) / 2, numpy.nan))
+
+
+def shg_angle(crystal, omega, phi=0, type_="I", **kwargs):
+	"""Second harmonic generation phase-matching angle
+
+	:param crystal:	Nonlinear crystal
+	:type crystal:	:class:`ultrafast.core.BiaxialMaterial`
+	:param omega:	Fundamental angular frequency in :math:`rad / fs`
+	:type omega:	float, array_like
+	:param phi:	Azimuthal angle from the x axis in :math:`rad`
+	:type phi:	float, array_like
+	:param type_:	Phase-matching type (see :data:`types`)
+	:type type_:	string, tuple
+
+	Convenience wrapper of :func:`angle` for SHG of the fundamental *omega*.
+	Further keyword arguments are passed to :func:`angle`.
+	"""
+	omega = numpy.asarray(omega, dtype=float)
+	return(angle(crystal, 2 * omega, omega, phi, type_, **kwargs))
+
+
+def acceptance(
+	crystal,
+	omega_p,
+	omega_s,
+	theta,
+	length,
+	phi=0,
+	type_="I",
+	parameter="theta"
+):
+	"""Acceptance bandwidth
+
+	:param crystal:	Nonlinear crystal
+	:type crystal:	:class:`ultrafast.core.BiaxialMaterial`
+	:param omega_p:	Pump angular frequency in :math:`rad / fs`
+	:type omega_p:	float, array_like
+	:param omega_s:	Signal angular frequency in :math:`rad / fs`
+	:type omega_s:	float, array_like
+	:param theta:	Polar angle to the z axis in :math:`rad`
+	:type theta:	float, array_like
+	:param length:	Crystal length in :math:`\\mu m`
+	:type length:	float, array_like
+	:param phi:	Azimuthal angle from the x axis in :math:`rad`
+	:type phi:	float, array_like
+	:param type_:	Phase-matching type (see :data:`types`)
+	:type type_:	string, tuple
+	:param parameter:	Detuned parameter (``theta``, ``phi``, ``pump``,
+						``signal``)
+	:type parameter:	string
+
+	Returns the full width at half maximum of the
+	:math:`sinc^2(\\Delta k L / 2)` phase-matching curve with respect to
+	*parameter*, to first order in :math:`\\Delta k`. Angular widths are in
+	:math:`rad` and spectral widths in :math:`rad / fs`. When detuning the signal,
+	the pump is held fixed (and vice versa) with the idler following energy
+	conservation.
+
+	Where the first derivative of :math:`\\Delta k` vanishes (e.g. degenerate
+	type I interactions), the first order width is infinite.
+	"""
+	arguments = {
+		"omega_p": numpy.asarray(omega_p, dtype=float),
+		"omega_s": numpy.asarray(omega_s, dtype=float),
+		"theta": numpy.asarray(theta, dtype=float),
+		"phi": numpy.asarray(phi, dtype=float),
+	}
+	keys = {
+		"theta": "theta",
+		"phi": "phi",
+		"pump": "omega_p",
+		"signal": "omega_s",
+	}
+	if(parameter not in keys):
+		raise UltrafastError("Unknown acceptance parameter: {}".format(parameter))
+	key = keys[parameter]
+
+	# Central difference of mismatch
+	step = 1e-6 if key in ("theta", "phi") else 1e-6 * arguments[key]
+	f = []
+	for sign in (1, -1):
+		detuned = dict(arguments)
+		detuned[key] = arguments[key] + sign * step
+		f.append(delta_k(
+			crystal, detuned["omega_p"], detuned["omega_s"],
+			detuned["theta"], detuned["phi"], type_
+		))
+	derivative = (f[0] - f[1]) / (2 * step)
+
+	with numpy.errstate(divide="ignore"):
+		return(_fwhm / (numpy.asarray(length) * numpy.abs(derivative)))
@@ -0,0 +1,282 @@
+"""Ultrafast profiling module
+
+This module contains opt-in instrumentation of the hot paths of
+:class:`ultrafast.core.Material` (dispersion function evaluation, wavevector,
+Brewster angle and frequency range assertions) and of the load phases of
+:class:`ultrafast.core.RIIDMaterial` (fetch, YAML parse and coefficient parse).
+
+Instrumentation is disabled by default, in which case each instrumented call
+only costs a single flag check. When enabled, per-material call counts, number
+of points evaluated, cumulative (inclusive) time and failure counts are
+recorded for each operation:
+
+	>>> import ultrafast.profiling
+	>>> with ultrafast.profiling.profile() as profile:
+	... 	ultrafast.air.n(omega)
+	>>> profile.snapshot()
+	{'...Ciddor.yml': {'n': {'calls': 1, 'points': 1000, ...}, ...}}
+
+Alternatively, :func:`enable` and :func:`disable` toggle process-wide recording,
+queried with :func:`snapshot` and cleared with :func:`reset`.
+
+This file is part of ultrafast. ultrafast is free software: you can
+redistribute it and/or modify it under the terms of the GNU General Public
+License as published by the Free Software Foundation, either version 3 of the
+License, or any later version. ultrafast is distributed in the hope that it
+will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty
+of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General
+Public License for more details. You should have received a copy of the GNU
+General Public License along with ultrafast. If not, see
+<http://www.gnu.org/licenses/>.
+
+Copyright © 2016 Marcelo J P Alcocer
+"""
+
+# Imports
+from contextlib import contextmanager
+from functools import wraps
+from time import perf_counter
+import threading
+import numpy
+
+enabled = False
+"""Instrumentation state
+
+True if any recording (process-wide or scoped) is active. Read-only; use
+:func:`enable`, :func:`disable` or :func:`profile`.
+"""
+
+_global = False
+"""Process-wide recording state"""
+
+_lock = threading.Lock()
+"""Recording lock"""
+
+
+class Stats:
+	"""Instrumentation statistics class"""
+
+	def __init__(self):
+		"""Stats class init
+
+		Class accumulating per-material, per-operation call counts, points
+		evaluated, cumulative time (:math:`s`) and failure counts.
+		"""
+		self._records = {}
+
+	def _record(self, key, operation, points, elapsed, failed):
+		"""Accumulate a single call"""
+		record = self._records.setdefault(key, {}).setdefault(
+			operation,
+			{"calls": 0, "points": 0, "time": 0.0, "failures": 0}
+		)
+		record["calls"] += 1
+		record["points"] += points
+		record["time"] += elapsed
+		record["failures"] += failed
+
+	def snapshot(self):
+		"""Statistics snapshot
+
+		Returns a copy of the statistics as a nested dictionary of the form
+		``{material: {operation: {"calls", "points", "time", "failures"}}}``.
+		"""
+		with _lock:
+			return({
+				key: {
+					operation: dict(record)
+					for operation, record in operations.items()
+				}
+				for key, operations in self._records.items()
+			})
+
+	def reset(self):
+		"""Clear statistics"""
+		with _lock:
+			self._records = {}
+
+
+_stats = Stats()
+"""Process-wide statistics"""
+
+_scopes = []
+"""Active scoped statistics (process-wide, see :func:`profile`)"""
+
+
+def _update():
+	"""Update instrumentation state"""
+	global enabled
+	enabled = _global or bool(_scopes)
+
+
+def enable():
+	"""Enable process-wide recording"""
+	global _global
+	_global = True
+	_update()
+
+
+def disable():
+	"""Disable process-wide recording"""
+	global _global
+	_global = False
+	_update()
+
+
+def reset():
+	"""Clear process-wide statistics"""
+	_stats.reset()
+
+
+def snapshot():
+	"""Process-wide statistics snapshot
+
+	See :meth:`Stats.snapshot`.
+	"""
+	return(_stats.snapshot())
+
+
+@contextmanager
+def profile():
+	"""Scoped profiling context manager
+
+	Records all instrumented operations executed within the context into a new
+	:class:`Stats` instance, which is returned by the context manager. Scopes
+	may be nested, and are independent of process-wide recording.
+
+	Scopes are process-wide rather than thread-local: while a scope is active,
+	operations executed by any thread are recorded into it, including those
+	delegated to worker threads (e.g. loads of :mod:`ultrafast.aio` in its
+	executor). Concurrent scopes opened by different threads thus each record
+	the operations of all threads.
+	"""
+	stats = Stats()
+	with _lock:
+		_scopes.append(stats)
+		_update()
+	try:
+		yield(stats)
+	finally:
+		with _lock:
+			_scopes.remove(stats)
+			_update()
+
+
+def _key(material):
+	"""Statistics key of a material
+
+	The material name if set, else the class name and identity.
+	"""
+	if(isinstance(material, str)):
+		return(material)
+	name = getattr(material, "name", None)
+	if(name is not None):
+		return(str(name))
+	return("{}@{:#x}".format(type(material).__name__, id(material)))
+
+
+def record(material, operation, points=0, elapsed=0.0, failed=False):
+	"""Record a single call
+
+	:param material:	Material (or material key)
+	:type material:	:class:`ultrafast.core.Material`, string
+	:param operation:	Operation name
+	:type operation:	string
+	:param points:	Number of points evaluated
+	:type points:	int
+	:param elapsed:	Elapsed time in :math:`s`
+	:type elapsed:	float
+	:param failed:	Call failed
+	:type failed:	bool
+
+	Records a call into all active statistics. Has no effect if disabled.
+	"""
+	if(not enabled):
+		return
+	key = _key(material)
+	with _lock:
+		if(_global):
+			_stats._record(key, operation, points, elapsed, failed)
+		for stats in _scopes:
+			stats._record(key, operation, points, elapsed, failed)
+
+
+def _timed(material, operation, function, args, kwargs):
+	"""Call and record *function*"""
+	points = numpy.size(args[0]) if args else 0
+	start = perf_counter()
+	try:
+		result = function(*args, **kwargs)
+	except Exception:
+		record(material, operation, points, perf_counter() - start, True)
+		raise
+	record(material, operation, points, perf_counter() - start)
+	return(result)
+
+
+def instrument(operation):
+	"""Method instrumentation decorator
+
+	:param operation:	Operation name
+	:type operation:	string
+
+	Decorates a material method such that, when enabled, calls are recorded
+	against the material under *operation*. The number of points is taken as
+	the size of the first positional argument.
+	"""
+	def decorator(method):
+		@wraps(method)
+		def wrapper(self, *args, **kwargs):
+			if(not enabled):
+				return(method(self, *args, **kwargs))
+			return(_timed(
+				self, operation, lambda *a, **k: method(self, *a, **k),
+				args, kwargs
+			))
+		return(wrapper)
+	return(decorator)
+
+
+def wrap(material, operation, function):
+	"""Function instrumentation wrapper
+
+	:param material:	Material
+	:type material:	:class:`ultrafast.core.Material`
+	:param operation:	Operation name
+	:type operation:	string
+	:param function:	Function
+	:type function:	callable
+
+	Returns a wrapper of *function* which, when enabled, records calls against
+	*material* under *operation*. See :func:`instrument`.
+	"""
+	@wraps(function)
+	def wrapper(*args, **kwargs):
+		if(not enabled):
+			return(function(*args, **kwargs))
+		return(_timed(material, operation, function, args, kwargs))
+	return(wrapper)
+
+
+@contextmanager
+def phase(material, operation):
+	"""Phase instrumentation context manager
+
+	:param material:	Material (or material key)
+	:type material:	:class:`ultrafast.core.Material`, string
+	:param operation:	Operation name
+	:type operation:	string
+
+	Records the execution of the context against *material* under *operation*,
+	e.g. the load phases of :class:`ultrafast.core.RIIDMaterial`.
+	"""
+	if(not enabled):
+		yield
+		return
+	start = perf_counter()
+	try:
+		yield
+	except Exception:
+		record(material, operation, 0, perf_counter() - start, True)
+		raise
+	record(material, operation, 0, perf_counter() - start)
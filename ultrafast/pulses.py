@@ -0,0 +1,297 @@
+"""Ultrafast pulses module
+
+This module contains estimates of the duration, chirp and peak power of pulses
+after propagation through materials, e.g. to answer "what pulse duration do I
+get after 10 mm of BK7 at this bandwidth?":
+
+	>>> duration, gdd, tod, peak = ultrafast.pulses.gaussian(
+	...	[bk7], [1e4], wavelength=0.8, bandwidth=0.03
+	... )
+
+:func:`gaussian` gives analytic results for Gaussian spectra, with the GDD and
+TOD of each material at the centre wavelength. All arguments are broadcast
+against each other, and material dispersion is only evaluated at the distinct
+centre wavelengths, such that :math:`10^5` scenarios evaluate in milliseconds.
+:func:`fourier` instead propagates arbitrary spectra through the full material
+phase by FFT, in batches of spectra.
+
+Thicknesses are in :math:`\\mu m`, wavelengths and bandwidths (FWHM of the
+spectral intensity) in :math:`\\mu m`, and durations (FWHM of the temporal
+intensity) in :math:`fs`.
+
+This file is part of ultrafast. ultrafast is free software: you can
+redistribute it and/or modify it under the terms of the GNU General Public
+License as published by the Free Software Foundation, either version 3 of the
+License, or any later version. ultrafast is distributed in the hope that it
+will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty
+of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General
+Public License for more details. You should have received a copy of the GNU
+General Public License along with ultrafast. If not, see
+<http://www.gnu.org/licenses/>.
+
+Copyright © 2016 Marcelo J P Alcocer
+"""
+
+# Imports
+from math import log
+import numpy
+from .core import c, pi, frequency, UltrafastError
+
+_ln2 = log(2)
+"""Natural logarithm of 2"""
+
+
+def _dispersion(materials, thicknesses, omega):
+	"""Total GDD and TOD
+
+	Returns the 2-tuple of the GDD and TOD of the *materials* of *thicknesses*
+	at the angular frequency *omega*, evaluated once per material at the
+	distinct angular frequencies and broadcast against the thicknesses.
+	"""
+	if(len(materials) != len(thicknesses)):
+		raise UltrafastError("Materials and thicknesses must match in number")
+	omega = numpy.asarray(omega, dtype=float)
+	distinct, inverse = numpy.unique(omega, return_inverse=True)
+	gdd = 0.0
+	tod = 0.0
+	for material, thickness in zip(materials, thicknesses):
+		thickness = numpy.asarray(thickness, dtype=float)
+		gdd = gdd + thickness * numpy.real(
+			material.gvd(distinct)
+		)[inverse].reshape(omega.shape)
+		tod = tod + thickness * numpy.real(
+			material.tod(distinct)
+		)[inverse].reshape(omega.shape)
+	return((gdd, tod))
+
+
+def transform_limit(wavelength, bandwidth):
+	"""Transform limited duration
+
+	:param wavelength:	Centre wavelength in :math:`\\mu m`
+	:type wavelength:	float, array_like
+	:param bandwidth:	Spectral intensity FWHM in :math:`\\mu m`
+	:type bandwidth:	float, array_like
+
+	Returns the duration (intensity FWHM) in :math:`fs` of the transform
+	limited Gaussian pulse of *bandwidth* at *wavelength*.
+	"""
+	wavelength = numpy.asarray(wavelength, dtype=float)
+	omega = 2 * pi * c * bandwidth / numpy.power(wavelength, 2)
+	return(4 * _ln2 / omega)
+
+
+def gaussian(
+	materials,
+	thicknesses,
+	wavelength,
+	bandwidth,
+	gdd=0.0,
+	tod=0.0
+):
+	"""Gaussian pulse propagation
+
+	:param materials:	Materials
+	:type materials:	list of :class:`ultrafast.core.Material`
+	:param thicknesses:	Material thicknesses in :math:`\\mu m`
+	:type thicknesses:	list of float, array_like
+	:param wavelength:	Centre wavelength in :math:`\\mu m`
+	:type wavelength:	float, array_like
+	:param bandwidth:	Spectral intensity FWHM in :math:`\\mu m`
+	:type bandwidth:	float, array_like
+	:param gdd:	Input GDD (chirp) in :math:`fs^2`
+	:type gdd:	float, array_like
+	:param tod:	Input TOD in :math:`fs^3`
+	:type tod:	float, array_like
+
+	Returns the 4-tuple of the output duration (:math:`fs`), GDD
+	(:math:`fs^2`), TOD (:math:`fs^3`) and peak power relative to the input
+	pulse of a Gaussian spectrum of *bandwidth* at *wavelength*, with input
+	chirp (*gdd*, *tod*), through the *materials* of *thicknesses* (one per
+	material). All arguments are broadcast against each other.
+
+	The RMS duration :math:`\\sigma_t` follows exactly from the variance of the
+	group delay across the spectrum:
+
+	.. math::
+
+		\\sigma_t^2 = \\sigma_0^2 + \\phi_2^2 \\sigma_\\omega^2 +
+		\\frac{1}{2} \\phi_3^2 \\sigma_\\omega^4
+
+	where :math:`\\sigma_0 = 1 / 2 \\sigma_\\omega` is that of the transform
+	limited pulse, and :math:`\\sigma_\\omega` is the RMS width of the spectral
+	intensity. Durations are FWHM (:math:`\\sqrt{8 \\ln 2} \\, \\sigma_t`) and
+	peak powers scale as :math:`1 / \\sigma_t`, both exact without TOD (the
+	pulse remains Gaussian) and RMS equivalents otherwise.
+	"""
+	wavelength = numpy.asarray(wavelength, dtype=float)
+	gdd_0, tod_0 = _dispersion(materials, thicknesses, frequency(wavelength))
+	gdd_1 = gdd + gdd_0
+	tod_1 = tod + tod_0
+
+	# RMS widths
+	variance = numpy.power(
+		2 * pi * c * numpy.asarray(bandwidth, dtype=float) /
+		numpy.power(wavelength, 2), 2
+	) / (8 * _ln2)
+	limit = 1 / (4 * variance)
+
+	def width(gdd, tod):
+		"""RMS duration"""
+		return(numpy.sqrt(
+			limit + numpy.power(gdd, 2) * variance +
+			numpy.power(tod, 2) * numpy.power(variance, 2) / 2
+		))
+
+	output = width(gdd_1, tod_1)
+	return((
+		numpy.sqrt(8 * _ln2) * output,
+		gdd_1 + 0 * output,
+		tod_1 + 0 * output,
+		width(gdd, tod) / output
+	))
+
+
+def _fwhm(time, intensity):
+	"""Full width at half maximum
+
+	Returns the FWHM of the *intensity* (along its last axis) sampled at the
+	ascending uniform *time*, between the outermost half maximum crossings
+	(linearly interpolated).
+	"""
+	half = intensity.max(axis=-1, keepdims=True) / 2
+	above = intensity >= half
+	size = intensity.shape[-1]
+	first = numpy.argmax(above, axis=-1)[..., None]
+	last = size - 1 - numpy.argmax(above[..., ::-1], axis=-1)[..., None]
+
+	def crossing(inside, outside):
+		"""Interpolated crossing time between samples"""
+		outside = numpy.clip(outside, 0, size - 1)
+		i_in = numpy.take_along_axis(intensity, inside, axis=-1)
+		i_out = numpy.take_along_axis(intensity, outside, axis=-1)
+		with numpy.errstate(invalid="ignore", divide="ignore"):
+			fraction = numpy.where(
+				i_in != i_out, (i_in - half) / (i_in - i_out), 0
+			)
+		return(time[inside] + fraction * (time[outside] - time[inside]))
+
+	return((crossing(last, last + 1) - crossing(first, first - 1))[..., 0])
+
+
+def fourier(
+	materials,
+	thicknesses,
+	omega,
+	spectrum,
+	phase=0.0,
+	padding=4,
+	block=256
+):
+	"""Numerical pulse propagation
+
+	:param materials:	Materials
+	:type materials:	list of :class:`ultrafast.core.Material`
+	:param thicknesses:	Material thicknesses in :math:`\\mu m`
+	:type thicknesses:	list of float, array_like
+	:param omega:	Angular frequency grid in :math:`rad / fs`
+	:type omega:	array_like
+	:param spectrum:	Spectral intensity
+	:type spectrum:	array_like
+	:param phase:	Input spectral phase in :math:`rad`
+	:type phase:	float, array_like
+	:param padding:	Time grid oversampling factor
+	:type padding:	int
+	:param block:	Number of spectra per FFT batch
+	:type block:	int
+
+	Returns the 4-tuple of the output duration (:math:`fs`), GDD
+	(:math:`fs^2`), TOD (:math:`fs^3`) and peak power relative to the input
+	pulse of arbitrary spectra through the *materials* of *thicknesses* (one
+	per material), as :func:`gaussian`.
+
+	*spectrum* and *phase* are sampled on the uniform grid *omega* along their
+	last axis, and their leading axes are broadcast against the thicknesses.
+	The material phase is evaluated once on the grid. Constant and linear
+	(group delay) phase components are removed, and the time domain intensity
+	is evaluated by FFT of the spectral field, zero padded by *padding*, in
+	batches of *block* spectra. The grid spacing must be fine enough for the
+	time window (:math:`2 \\pi / \\Delta\\omega`) to contain the output pulses.
+	GDD and TOD are those of the cubic phase fit weighted by *spectrum*.
+	"""
+	omega = numpy.asarray(omega, dtype=float)
+	if(omega.ndim != 1 or len(omega) < 4):
+		raise UltrafastError("Angular frequency grid must be 1-D (4+ points)")
+	delta = (omega[-1] - omega[0]) / (len(omega) - 1)
+	if(
+		delta <= 0 or
+		numpy.abs(numpy.diff(omega) - delta).max() > 1e-6 * delta
+	):
+		raise UltrafastError(
+			"Angular frequency grid must be uniform and ascending"
+		)
+	if(len(materials) != len(thicknesses)):
+		raise UltrafastError("Materials and thicknesses must match in number")
+	spectrum = numpy.asarray(spectrum, dtype=float)
+	phase = numpy.asarray(phase, dtype=float)
+
+	# Broadcast batch
+	thicknesses = [numpy.asarray(x, dtype=float) for x in thicknesses]
+	shape = numpy.broadcast_shapes(
+		spectrum.shape[:-1], phase.shape[:-1] if phase.ndim else (),
+		*(x.shape for x in thicknesses)
+	)
+	count = int(numpy.prod(shape))
+	spectrum = numpy.broadcast_to(spectrum, shape + omega.shape).reshape(
+		count, len(omega)
+	)
+	phase = numpy.broadcast_to(phase, shape + omega.shape).reshape(
+		count, len(omega)
+	)
+	lengths = numpy.zeros((count, len(materials)))
+	wavevectors = numpy.zeros((len(materials), len(omega)))
+	for i, material in enumerate(materials):
+		lengths[:, i] = numpy.broadcast_to(thicknesses[i], shape).reshape(count)
+		wavevectors[i] = numpy.real(material.wavevector(omega))
+
+	# Cubic phase fit basis
+	offset = omega - omega.mean()
+	basis = numpy.stack(
+		(numpy.ones(len(omega)), offset, offset ** 2 / 2, offset ** 3 / 6)
+	)
+	size = len(omega) * padding
+	time = numpy.fft.fftshift(numpy.fft.fftfreq(size, delta / (2 * pi)))
+
+	results = numpy.empty((4, count))
+	for start in range(0, count, block):
+		stop = min(start + block, count)
+		weights = spectrum[start:stop]
+		weights = weights / weights.sum(axis=-1, keepdims=True)
+		phases = (
+			phase[start:stop],
+			phase[start:stop] + lengths[start:stop] @ wavevectors
+		)
+
+		# Weighted cubic fits (normal equations)
+		gram = numpy.einsum("bk,ik,jk->bij", weights, basis, basis)
+		fits = []
+		intensities = []
+		for phase_ in phases:
+			moments = numpy.einsum("bk,ik,bk->bi", weights, basis, phase_)
+			fit = numpy.linalg.solve(gram, moments[..., None])[..., 0]
+			fits.append(fit)
+
+			# Temporal intensity (without constant and linear phase)
+			phase_ = phase_ - fit[:, :2] @ basis[:2]
+			field = numpy.fft.fftshift(numpy.fft.fft(
+				numpy.sqrt(spectrum[start:stop]) * numpy.exp(1j * phase_),
+				n=size, axis=-1
+			), axes=-1)
+			intensities.append(numpy.power(numpy.abs(field), 2))
+		results[0, start:stop] = _fwhm(time, intensities[1])
+		results[1, start:stop] = fits[1][:, 2]
+		results[2, start:stop] = fits[1][:, 3]
+		results[3, start:stop] = (
+			intensities[1].max(axis=-1) / intensities[0].max(axis=-1)
+		)
+	return(tuple(x.reshape(shape)[()] for x in results))
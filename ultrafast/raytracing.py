@@ -0,0 +1,364 @@
+"""Ultrafast raytracing module
+
+This module contains tools for tracing rays through sequences of refracting
+surfaces between dispersive materials (e.g. prisms, wedges and lenses), in the
+plane of incidence. Unlike the spectral phase of a material slab, traced rays
+capture the angular dispersion of tilted and curved surfaces, and hence the
+pulse-front tilt and spatial chirp they introduce:
+
+	>>> tracer = ultrafast.raytracing.Tracer(
+	...	ultrafast.raytracing.prism(sf10, pi / 3, (0, 0), rotation=0.1)
+	...	+ [ultrafast.raytracing.Plane((1e4, 0), -0.8, ultrafast.air)]
+	... )
+	>>> tracer.tilt(omega, height=-1000)
+
+Rays start at :math:`x = 0`, at a *height* :math:`y` and an angle *theta* to
+the :math:`x` axis, and are refracted by the vector form of Snell's law.
+Calculations are vectorized across angular frequency and ray (height and
+angle), such that :math:`10^6` ray-frequency pairs trace in a fraction of a
+second. Refractive indices are evaluated once per distinct material and
+frequency. Frequency derivatives (group delay, angular dispersion, etc.) are
+central finite differences of traces at neighbouring frequencies.
+
+This file is part of ultrafast. ultrafast is free software: you can
+redistribute it and/or modify it under the terms of the GNU General Public
+License as published by the Free Software Foundation, either version 3 of the
+License, or any later version. ultrafast is distributed in the hope that it
+will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty
+of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General
+Public License for more details. You should have received a copy of the GNU
+General Public License along with ultrafast. If not, see
+<http://www.gnu.org/licenses/>.
+
+Copyright © 2016 Marcelo J P Alcocer
+"""
+
+# Imports
+import numpy
+from . import core
+from .core import c, pi, UltrafastError
+
+
+class Surface:
+	"""Refracting surface base class"""
+
+	material = None
+	"""Material beyond the surface"""
+
+	aperture = None
+	"""Aperture half-width in :math:`\\mu m`"""
+
+	name = None
+	"""Surface name"""
+
+	def __init__(self, material, aperture=None, name=None):
+		"""Surface class init
+
+		:param material:	Material beyond the surface
+		:type material:	:class:`ultrafast.core.Material`
+		:param aperture:	Aperture half-width in :math:`\\mu m`
+		:type aperture:	float
+		:param name:	Surface name
+		:type name:		string
+
+		Base class describing a surface refracting rays into *material*. Rays
+		missing the surface or its *aperture* (unbounded if None) are lost.
+		"""
+		self.material = material
+		self.aperture = aperture
+		self.name = name
+
+	def _intersect(self, x, y, dx, dy):
+		"""Ray intersection
+
+		Returns the 3-tuple of the distance to the surface along the rays of
+		position (*x*, *y*) and unit direction (*dx*, *dy*), and the (*x*, *y*)
+		components of the unit surface normal there. Distances of rays missing
+		the surface are NaN.
+		"""
+		raise NotImplementedError
+
+
+class Plane(Surface):
+	"""Plane surface class"""
+
+	def __init__(self, point, angle, material, aperture=None, name=None):
+		"""Plane class init
+
+		:param point:	Point on the plane (x, y) in :math:`\\mu m`
+		:type point:	tuple
+		:param angle:	Normal angle to the :math:`x` axis in :math:`rad`
+		:type angle:	float
+		:param material:	Material beyond the surface
+		:type material:	:class:`ultrafast.core.Material`
+		:param aperture:	Aperture half-width about *point* in :math:`\\mu m`
+		:type aperture:	float
+		:param name:	Surface name
+		:type name:		string
+
+		Class describing a plane surface through *point*, with normal at *angle*
+		to the :math:`x` axis (0 for a surface normal to the axis).
+		"""
+		Surface.__init__(self, material, aperture=aperture, name=name)
+		self.point = tuple(float(x) for x in point)
+		self.angle = float(angle)
+
+	def _intersect(self, x, y, dx, dy):
+		nx, ny = numpy.cos(self.angle), numpy.sin(self.angle)
+		distance = (
+			((self.point[0] - x) * nx + (self.point[1] - y) * ny) /
+			(dx * nx + dy * ny)
+		)
+		if(self.aperture is not None):
+			offset = (
+				-(x + distance * dx - self.point[0]) * ny +
+				(y + distance * dy - self.point[1]) * nx
+			)
+			distance = numpy.where(
+				numpy.abs(offset) <= self.aperture, distance, numpy.nan
+			)
+		return((distance, nx, ny))
+
+
+class Sphere(Surface):
+	"""Spherical surface class"""
+
+	def __init__(self, vertex, radius, material, aperture=None, name=None):
+		"""Sphere class init
+
+		:param vertex:	Vertex position on the :math:`x` axis in :math:`\\mu m`
+		:type vertex:	float
+		:param radius:	Radius of curvature in :math:`\\mu m`
+		:type radius:	float
+		:param material:	Material beyond the surface
+		:type material:	:class:`ultrafast.core.Material`
+		:param aperture:	Aperture half-height in :math:`\\mu m`
+		:type aperture:	float
+		:param name:	Surface name
+		:type name:		string
+
+		Class describing a spherical surface centred on the :math:`x` axis.
+		*radius* is positive for a centre of curvature beyond the vertex (a
+		surface convex towards incident rays), negative otherwise. Rays meet the
+		surface on the side of the vertex.
+		"""
+		Surface.__init__(self, material, aperture=aperture, name=name)
+		self.vertex = float(vertex)
+		self.radius = float(radius)
+
+	def _intersect(self, x, y, dx, dy):
+		centre = self.vertex + self.radius
+		b = (x - centre) * dx + y * dy
+		discriminant = (
+			b ** 2 - (x - centre) ** 2 - y ** 2 + self.radius ** 2
+		)
+		distance = -b - numpy.sign(self.radius) * numpy.sqrt(discriminant)
+		height = y + distance * dy
+		if(self.aperture is not None):
+			distance = numpy.where(
+				numpy.abs(height) <= self.aperture, distance, numpy.nan
+			)
+		return((
+			distance,
+			(x + distance * dx - centre) / self.radius,
+			height / self.radius
+		))
+
+
+def prism(material, apex, point, rotation=0.0, inverted=False, medium=None):
+	"""Prism surfaces
+
+	:param material:	Prism material
+	:type material:	:class:`ultrafast.core.Material`
+	:param apex:	Apex angle in :math:`rad`
+	:type apex:	float
+	:param point:	Apex position (x, y) in :math:`\\mu m`
+	:type point:	tuple
+	:param rotation:	Rotation about the apex in :math:`rad`
+	:type rotation:	float
+	:param inverted:	Apex below base
+	:type inverted:	bool
+	:param medium:	Material beyond the prism
+	:type medium:	:class:`ultrafast.core.Material`
+
+	Returns the list of the entrance and exit :class:`Plane` surfaces of a prism
+	of apex angle *apex*, with apex at *point* (above the base, or below if
+	*inverted*) and base normal to the :math:`y` axis, rotated counterclockwise
+	by *rotation*. If None, *medium* is assumed to be :attr:`ultrafast.core.air`.
+	"""
+	sign = -1 if inverted else 1
+	return([
+		Plane(point, sign * (pi - apex / 2) + rotation, material),
+		Plane(
+			point, sign * apex / 2 + rotation,
+			core.air if medium is None else medium
+		),
+	])
+
+
+class Tracer:
+	"""Ray tracer class"""
+
+	def __init__(self, surfaces, material=None):
+		"""Tracer class init
+
+		:param surfaces:	Refracting surfaces, in ray order
+		:type surfaces:	list of :class:`ultrafast.raytracing.Surface`
+		:param material:	Incident material
+		:type material:	:class:`ultrafast.core.Material`
+
+		Class describing the propagation of rays from :math:`x = 0` in
+		*material* through a sequence of *surfaces*, ending on the last surface.
+		For pulse quantities (group delay, pulse-front tilt), the last surface
+		should be normal to the output rays. If None, *material* is assumed to be
+		:attr:`ultrafast.core.air`.
+		"""
+		self.surfaces = list(surfaces)
+		self.material = core.air if material is None else material
+		if(not self.surfaces):
+			raise UltrafastError("Tracer requires at least one surface")
+
+	def trace(self, omega, height=0.0, theta=0.0):
+		"""Trace rays
+
+		:param omega:	Angular frequency in :math:`rad / fs`
+		:type omega:	float, array_like
+		:param height:	Initial ray height in :math:`\\mu m`
+		:type height:	float, array_like
+		:param theta:	Initial ray angle to the :math:`x` axis in :math:`rad`
+		:type theta:	float, array_like
+
+		Returns the 4-tuple of the (x, y) position in :math:`\\mu m` and angle
+		(in :math:`rad`) of the rays on the last surface, and their optical path
+		length in :math:`\\mu m`. *omega*, *height* and *theta* are broadcast
+		against each other, e.g. a (frequency, height) grid is evaluated by
+		passing *omega* of shape (N, 1) and *height* of shape (M,). Quantities of
+		rays lost (missing a surface or totally internally reflected) are NaN.
+		"""
+		omega = numpy.asarray(omega, dtype=float)
+		height = numpy.asarray(height, dtype=float)
+		theta = numpy.asarray(theta, dtype=float)
+
+		# Refractive indices, evaluated once per distinct material
+		indices = {}
+		for material in [self.material] + [
+			surface.material for surface in self.surfaces
+		]:
+			if(id(material) not in indices):
+				indices[id(material)] = numpy.real(material.n(omega))
+
+		x = numpy.zeros(numpy.broadcast_shapes(height.shape, theta.shape))
+		y = height + x
+		dx = numpy.cos(theta) + x
+		dy = numpy.sin(theta) + x
+		path = 0.0
+		n = indices[id(self.material)]
+		with numpy.errstate(invalid="ignore", divide="ignore"):
+			for surface in self.surfaces:
+				distance, nx, ny = surface._intersect(x, y, dx, dy)
+				distance = numpy.where(distance > 0, distance, numpy.nan)
+				x = x + distance * dx
+				y = y + distance * dy
+				path = path + n * distance
+
+				# Snell's law (normal facing incident rays)
+				cos_i = -(nx * dx + ny * dy)
+				nx = numpy.where(cos_i < 0, -nx, nx)
+				ny = numpy.where(cos_i < 0, -ny, ny)
+				cos_i = numpy.abs(cos_i)
+				ratio = n / indices[id(surface.material)]
+				cos_t = numpy.sqrt(1 - ratio ** 2 * (1 - cos_i ** 2))
+				lost = numpy.isnan(cos_t)
+				x = numpy.where(lost, numpy.nan, x)
+				y = numpy.where(lost, numpy.nan, y)
+				path = numpy.where(lost, numpy.nan, path)
+				dx = ratio * dx + (ratio * cos_i - cos_t) * nx
+				dy = ratio * dy + (ratio * cos_i - cos_t) * ny
+				n = indices[id(surface.material)]
+		return((x, y, numpy.arctan2(dy, dx), path))
+
+	def path(self, omega, height=0.0, theta=0.0):
+		"""Optical path length
+
+		Returns the optical path length in :math:`\\mu m` of the rays to the last
+		surface. See :meth:`trace` for arguments.
+		"""
+		return(self.trace(omega, height, theta)[3])
+
+	def phase(self, omega, height=0.0, theta=0.0):
+		"""Spectral phase
+
+		Returns the spectral phase in :math:`rad` accumulated along the rays to
+		the last surface. See :meth:`trace` for arguments.
+		"""
+		omega = numpy.asarray(omega, dtype=float)
+		return(omega * self.path(omega, height, theta) / c)
+
+	def _derivative(self, quantity, omega, height, theta, order):
+		"""Frequency derivative
+
+		Returns the *order* frequency derivative of *quantity* (a function of
+		frequency, height and angle) at fixed input rays.
+		"""
+		omega = numpy.asarray(omega, dtype=float)
+		ndim = numpy.broadcast(omega, height, theta).ndim
+		omega = omega.reshape((1,) * (ndim - omega.ndim) + omega.shape)
+		return(core._derivative(
+			lambda x: quantity(x, height, theta), omega, order
+		)[()])
+
+	def gd(self, omega, height=0.0, theta=0.0):
+		"""Group delay
+
+		Returns the group delay (:math:`d\\phi / d\\omega`) in :math:`fs` along
+		the rays to the last surface. See :meth:`trace` for arguments.
+		"""
+		return(self._derivative(self.phase, omega, height, theta, 1))
+
+	def gdd(self, omega, height=0.0, theta=0.0):
+		"""Group delay dispersion
+
+		Returns the group delay dispersion (:math:`d^2\\phi / d\\omega^2`) in
+		:math:`fs^2` along the rays to the last surface. See :meth:`trace` for
+		arguments.
+		"""
+		return(self._derivative(self.phase, omega, height, theta, 2))
+
+	def angular_dispersion(self, omega, height=0.0, theta=0.0):
+		"""Angular dispersion
+
+		Returns the angular dispersion (:math:`d\\theta / d\\omega`) in
+		:math:`rad \\, fs` of the output rays. See :meth:`trace` for arguments.
+		"""
+		return(self._derivative(
+			lambda *args: self.trace(*args)[2], omega, height, theta, 1
+		))
+
+	def spatial_chirp(self, omega, height=0.0, theta=0.0):
+		"""Spatial chirp
+
+		Returns the spatial chirp (:math:`dy / d\\omega`) in :math:`\\mu m \\, fs`
+		of the output rays on the last surface. See :meth:`trace` for arguments.
+		"""
+		return(self._derivative(
+			lambda *args: self.trace(*args)[1], omega, height, theta, 1
+		))
+
+	def tilt(self, omega, height=0.0, theta=0.0):
+		"""Pulse-front tilt
+
+		Returns the pulse-front tilt angle :math:`\\gamma` in :math:`rad` of the
+		output rays, given by their angular dispersion in the last material:
+
+		.. math::
+
+			\\tan \\gamma = \\frac{n}{n_g} \\omega \\frac{d\\theta}{d\\omega}
+
+		See :meth:`trace` for arguments.
+		"""
+		omega = numpy.asarray(omega, dtype=float)
+		material = self.surfaces[-1].material
+		return(numpy.arctan(
+			numpy.real(material.n(omega) / material.group_index(omega)) *
+			omega * self.angular_dispersion(omega, height, theta)
+		))
@@ -0,0 +1,211 @@
+"""Ultrafast registry module
+
+This module contains a process-wide registry of materials, interning instances
+by database entry, such that all parts of a program requesting the same entry
+share a single instance (and hence its caches):
+
+	>>> bk7 = ultrafast.registry.get("database/glass/schott/N-BK7.yml")
+	>>> bk7 is ultrafast.registry.get("./database/glass/../glass/schott/N-BK7.yml")
+	True
+
+Entries are keyed by normalized source (see :func:`normalize`), material
+factory and factory arguments. The registry only holds weak references, such
+that materials no longer referenced elsewhere are garbage collected (and
+reloaded on the next request). Requests are thread-safe: concurrent requests
+for the same entry load it once, while requests for different entries load
+concurrently.
+
+This file is part of ultrafast. ultrafast is free software: you can
+redistribute it and/or modify it under the terms of the GNU General Public
+License as published by the Free Software Foundation, either version 3 of the
+License, or any later version. ultrafast is distributed in the hope that it
+will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty
+of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General
+Public License for more details. You should have received a copy of the GNU
+General Public License along with ultrafast. If not, see
+<http://www.gnu.org/licenses/>.
+
+Copyright © 2016 Marcelo J P Alcocer
+"""
+
+# Imports
+import os
+import posixpath
+import threading
+from urllib.parse import quote, unquote, urlsplit, urlunsplit
+from urllib.request import url2pathname
+import weakref
+from .core import RIIDMaterial
+from . import core
+
+_instances = weakref.WeakValueDictionary()
+"""Registered materials, keyed by entry key"""
+
+_loading = weakref.WeakValueDictionary()
+"""Load locks of entries being requested, keyed by entry key"""
+
+_lock = threading.Lock()
+"""Registry lock"""
+
+
+class _Load:
+	"""Entry load lock (weak referenceable)"""
+
+	def __init__(self):
+		self.lock = threading.Lock()
+
+
+def normalize(source):
+	"""Normalize database entry source
+
+	:param source:	Database entry (path or URL)
+	:type source:	string
+
+	Returns the canonical form of *source*. Local paths (including ``file`` URLs)
+	are made absolute, with symbolic links, ``.`` and ``..`` components resolved.
+	URLs have their scheme and host lower cased, their path normalized and
+	percent encoding made consistent, and any fragment removed.
+	"""
+	parts = urlsplit(source)
+	if(parts.scheme == "file"):
+		source = url2pathname(parts.path)
+	elif(len(parts.scheme) > 1):
+		path = posixpath.normpath(unquote(parts.path)) if parts.path else ""
+		if(parts.path.endswith("/") and not path.endswith("/")):
+			path += "/"
+		return(urlunsplit((
+			parts.scheme.lower(),
+			parts.netloc.lower(),
+			quote(path),
+			parts.query,
+			""
+		)))
+	return(os.path.normcase(os.path.realpath(os.path.expanduser(source))))
+
+
+def key(source, factory=RIIDMaterial, *args, **kwargs):
+	"""Entry key
+
+	:param source:	Database entry (path or URL)
+	:type source:	string
+	:param factory:	Material factory
+	:type factory:	callable
+
+	Returns the registry key of the material built as ``factory(source, *args,
+	**kwargs)``. All arguments must be hashable.
+	"""
+	return(
+		(normalize(source), factory, args, tuple(sorted(kwargs.items())))
+	)
+
+
+def get(source, factory=RIIDMaterial, *args, **kwargs):
+	"""Shared material
+
+	:param source:	Database entry (path or URL)
+	:type source:	string
+	:param factory:	Material factory
+	:type factory:	callable
+
+	Returns the registered material built as ``factory(source, *args,
+	**kwargs)``, building and registering it if not already registered. By
+	default *factory* is :class:`ultrafast.core.RIIDMaterial`.
+	"""
+	key_ = key(source, factory, *args, **kwargs)
+
+	# Registered (lock free)
+	material = _instances.get(key_)
+	if(material is not None):
+		return(material)
+
+	# Load once per entry
+	with _lock:
+		load = _loading.get(key_)
+		if(load is None):
+			load = _Load()
+			_loading[key_] = load
+	with load.lock:
+		material = _instances.get(key_)
+		if(material is None):
+			material = factory(source, *args, **kwargs)
+			with _lock:
+				material = _instances.setdefault(key_, material)
+	return(material)
+
+
+def lookup(source, factory=RIIDMaterial, *args, **kwargs):
+	"""Registered material
+
+	:param source:	Database entry (path or URL)
+	:type source:	string
+	:param factory:	Material factory
+	:type factory:	callable
+
+	Returns the registered material built as ``factory(source, *args,
+	**kwargs)``, or None if not registered. Never builds the material.
+	"""
+	with _lock:
+		return(_instances.get(key(source, factory, *args, **kwargs)))
+
+
+def setdefault(source, material, factory=RIIDMaterial, *args, **kwargs):
+	"""Register material if not registered
+
+	:param source:	Database entry (path or URL)
+	:type source:	string
+	:param material:	Material
+	:type material:	:class:`ultrafast.core.Material`
+	:param factory:	Material factory
+	:type factory:	callable
+
+	Registers *material* as the instance built as ``factory(source, *args,
+	**kwargs)`` unless an instance is already registered (e.g. built
+	concurrently by :func:`get`). Returns the registered instance, such that
+	all callers share one instance per entry.
+	"""
+	key_ = key(source, factory, *args, **kwargs)
+	with _lock:
+		return(_instances.setdefault(key_, material))
+
+
+def register(source, material, factory=RIIDMaterial, *args, **kwargs):
+	"""Register material
+
+	:param source:	Database entry (path or URL)
+	:type source:	string
+	:param material:	Material
+	:type material:	:class:`ultrafast.core.Material`
+	:param factory:	Material factory
+	:type factory:	callable
+
+	Registers an existing *material* as the instance built as ``factory(source,
+	*args, **kwargs)``, replacing any registered instance. Returns *material*.
+	"""
+	with _lock:
+		_instances[key(source, factory, *args, **kwargs)] = material
+	return(material)
+
+
+def registered():
+	"""Registered entry keys
+
+	Returns the list of keys of the materials currently registered (i.e. still
+	referenced elsewhere).
+	"""
+	with _lock:
+		return(list(_instances.keys()))
+
+
+def clear():
+	"""Clear registry
+
+	Subsequent requests build new instances, except for
+	:attr:`ultrafast.core.air`, which remains registered. Existing instances are
+	unaffected.
+	"""
+	with _lock:
+		_instances.clear()
+	register(core.air.name, core.air)
+
+
+clear()
@@ -0,0 +1,354 @@
+"""Ultrafast thermal module
+
+This module contains classes describing materials whose dispersion depends
+upon temperature, e.g. nonlinear crystals in ovens or windows heated under high
+average power.
+
+The dispersion function of these materials takes an optional second argument,
+the temperature in :math:`°C`, which defaults to the reference temperature of
+the material. Frequency and temperature are broadcast against each other, such
+that e.g. a (frequency, temperature) grid is evaluated in one call by passing
+arrays of shape (N, 1) and (M,).
+
+This file is part of ultrafast. ultrafast is free software: you can
+redistribute it and/or modify it under the terms of the GNU General Public
+License as published by the Free Software Foundation, either version 3 of the
+License, or any later version. ultrafast is distributed in the hope that it
+will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty
+of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General
+Public License for more details. You should have received a copy of the GNU
+General Public License along with ultrafast. If not, see
+<http://www.gnu.org/licenses/>.
+
+Copyright © 2016 Marcelo J P Alcocer
+"""
+
+# Imports
+from collections import OrderedDict
+import threading
+import numpy
+from .core import (
+	Material, PropertySetError, RangeError, UltrafastError, wavelength
+)
+from . import core
+
+
+class _ThermalMaterial(Material):
+	"""Temperature dependent material base class"""
+
+	temperature0 = None
+	"""Reference temperature
+
+	Temperature in :math:`°C` at which the material is evaluated if no
+	temperature is given
+	"""
+
+	temperature_range = None
+	"""Temperature range
+
+	Range of temperatures (:math:`°C`) over which the temperature dependence is
+	valid. A numeric tuple of the form (low,high), or None if unbounded.
+	"""
+
+	def _assert_temperature(self, temperature):
+		"""Temperature assertion
+
+		:param temperature:	Temperature in :math:`°C`
+		:type temperature:	numeric, array_like
+
+		Asserts the temperature *temperature* is within :attr:`temperature_range`
+		"""
+		if(self.temperature_range is None):
+			return
+		temperature = numpy.asarray(temperature)
+		if(temperature.size == 0):
+			return
+		if(not (
+			self.temperature_range[0] <= temperature.min() and
+			temperature.max() <= self.temperature_range[1]
+		)):
+			raise RangeError(
+				temperature,
+				self.temperature_range,
+				"Temperature out of material range"
+			)
+
+	def _snapshot(self):
+		"""Refuse snapshot (temperature dependence not snapshotted)"""
+		raise UltrafastError("Temperature dependent materials cannot be frozen")
+
+	def _delta_temperature(self, temperature):
+		"""Temperature difference to reference temperature
+
+		Asserts the temperature range, and returns :math:`T - T_0`.
+		"""
+		if(temperature is None):
+			return(0.0)
+		self._assert_temperature(temperature)
+		return(numpy.asarray(temperature, dtype=float) - self.temperature0)
+
+
+class ThermoOpticMaterial(_ThermalMaterial):
+	"""Thermo-optic material class"""
+
+	material = None
+	"""Reference material
+
+	:class:`ultrafast.core.Material` describing the dispersion at the reference
+	temperature
+	"""
+
+	dndT = None
+	"""Thermo-optic coefficients
+
+	Tuple of polynomial coefficients :math:`(a_1, a_2, \\ldots)` of the
+	refractive index change in powers of :math:`T - T_0`
+	"""
+
+	def __init__(
+		self,
+		material,
+		dndT,
+		temperature0=20.0,
+		temperature_range=None,
+		name=None,
+		references=None,
+		comments=None
+	):
+		"""ThermoOpticMaterial class init
+
+		:param material:	Reference material
+		:type material:	:class:`ultrafast.core.Material`
+		:param dndT:	Thermo-optic coefficients :math:`(a_1, a_2, \\ldots)`
+		:type dndT:	tuple
+		:param temperature0:	Reference temperature in :math:`°C`
+		:type temperature0:	float
+		:param temperature_range:	Valid temperature range in :math:`°C`
+		:type temperature_range:	tuple
+		:param name:	Material name
+		:type name:		string
+		:param references:	Reference(s) for material properties
+		:type references:	string
+		:param comments:	Comments
+		:type comments:		string
+
+		Class describing a material whose refractive index varies with temperature
+		as
+
+		.. math::	n(\\omega, T) = n_0(\\omega) + \\sum_k a_k(\\omega) (T - T_0)^k
+
+		where :math:`n_0` is the dispersion of *material* at the reference
+		temperature *temperature0*. Each coefficient :math:`a_k` is either a
+		constant (in :math:`K^{-k}`) or a callable of the angular frequency, for
+		wavelength dependent thermo-optic coefficients.
+		"""
+		self.material = material
+		self.dndT = tuple(dndT)
+		self.temperature0 = temperature0
+		self.temperature_range = temperature_range
+
+		def n(omega, temperature=None):
+			delta = self._delta_temperature(temperature)
+			n = self.material.n(omega)
+			for k, a in enumerate(self.dndT, 1):
+				if(callable(a)):
+					a = a(omega)
+				n = n + a * numpy.power(delta, k)
+			return(n)
+
+		# Call Material constructor
+		Material.__init__(
+			self, n, material.range_,
+			name=material.name if name is None else name,
+			references=references, comments=comments
+		)
+
+	@property
+	def version(self):
+		"""Dispersion version
+
+		Token combining the version of the material and of the reference
+		material.
+		"""
+		return((self._version, self.material.version))
+
+
+class TemperatureSellmeierMaterial(_ThermalMaterial):
+	"""Temperature dependent Sellmeier material class"""
+
+	formula = None
+	"""Dispersion formula
+
+	RefractiveIndex.info dispersion formula number (1-9)
+	"""
+
+	backend = None
+	"""Formula kernel backend
+
+	Name of the formula kernel backend (see :mod:`ultrafast.jit`) used by the
+	material, or None for the process-wide default
+	"""
+
+	_coefficients = None
+	"""Temperature polynomial coefficients
+
+	Property attribute. See setter and getter methods for further details.
+	"""
+
+	_cache_size = 64
+	"""Maximum number of cached coefficient sets"""
+
+	def __init__(
+		self,
+		formula,
+		coefficients,
+		range_,
+		temperature0=20.0,
+		temperature_range=None,
+		name=None,
+		references=None,
+		comments=None
+	):
+		"""TemperatureSellmeierMaterial class init
+
+		:param formula:	RefractiveIndex.info dispersion formula number
+		:type formula:	int
+		:param coefficients:	Temperature polynomial coefficients
+		:type coefficients:	array_like
+		:param range_:	Valid frequency range (low,high)
+		:type range_:	tuple
+		:param temperature0:	Reference temperature in :math:`°C`
+		:type temperature0:	float
+		:param temperature_range:	Valid temperature range in :math:`°C`
+		:type temperature_range:	tuple
+		:param name:	Material name
+		:type name:		string
+		:param references:	Reference(s) for material properties
+		:type references:	string
+		:param comments:	Comments
+		:type comments:		string
+
+		Class describing a material whose dispersion formula coefficients depend
+		upon temperature, as is common in nonlinear crystal datasets. Each of the
+		m coefficients :math:`c_i` of the RefractiveIndex.info dispersion
+		*formula* is a polynomial in the temperature difference
+
+		.. math::	c_i(T) = \\sum_j p_{ij} (T - T_0)^j
+
+		where :math:`p_{ij}` are the elements of the (m, order) array
+		*coefficients*. Temperature functions such as
+		:math:`(T - T_0)(T + T_0 + 546)` are expanded into this form.
+
+		Coefficient sets are cached per scalar temperature, such that repeated
+		evaluation at a fixed temperature (e.g. an oven set point) only costs the
+		dispersion formula. Array temperatures evaluate all coefficient sets at
+		once.
+		"""
+		if(formula not in core._formulas):
+			raise RangeError(
+				formula,
+				(1, 9),
+				"RIID dispersion formula out of range"
+			)
+		self.formula = formula
+		coefficients = numpy.array(coefficients, dtype=float)
+		if(coefficients.ndim == 1):
+			coefficients = coefficients[:, numpy.newaxis]
+		if(coefficients.ndim != 2):
+			raise UltrafastError("Coefficients must be of shape (m, order)")
+		self._coefficients = coefficients
+		self.temperature0 = temperature0
+		self.temperature_range = temperature_range
+		self._cache = OrderedDict()
+		self._cache_lock = threading.Lock()
+
+		def n(omega, temperature=None):
+			lambda_ = wavelength(omega)
+			return(self._kernels()[self.formula](
+				lambda_,
+				core._precision(self.formula_coefficients(temperature), lambda_)
+			))
+
+		# Call Material constructor
+		Material.__init__(
+			self, n, range_, name=name,
+			references=references, comments=comments
+		)
+
+	def _kernels(self):
+		"""Formula kernels of the selected backend"""
+		return(core._backends[
+			core._backend if self.backend is None else self.backend
+		])
+
+	@property
+	def coefficients(self):
+		"""Temperature polynomial coefficients
+
+		Read-only array view of shape (m, order) of the polynomial coefficients
+		(in powers of :math:`T - T_0`) of each of the m dispersion formula
+		coefficients. Coefficients are updated by assignment, which replaces the
+		array, clears cached coefficient sets and increments :attr:`version`.
+		"""
+		view = self._coefficients.view()
+		view.flags.writeable = False
+		return(view)
+
+	@coefficients.setter
+	def coefficients(self, value):
+		"""Temperature polynomial coefficients setter method
+
+		- Asserts shape unchanged
+		- Replaces coefficient array (copy)
+		- Clears cached coefficient sets
+		- Increments version
+		"""
+		value = numpy.array(value, dtype=float)
+		if(value.shape != self._coefficients.shape):
+			raise PropertySetError(
+				"coefficients",
+				"Coefficients shape does not match"
+			)
+		with core._lock:
+			with self._cache_lock:
+				self._coefficients = value
+				self._cache.clear()
+			self._modified()
+
+	def formula_coefficients(self, temperature=None):
+		"""Dispersion formula coefficients
+
+		:param temperature:	Temperature in :math:`°C`
+		:type temperature:	float, array_like
+
+		Returns the dispersion formula coefficients at the temperature
+		*temperature*, as an array of shape (m,) + shape(*temperature*). If None,
+		*temperature* is assumed to be :attr:`temperature0`.
+		"""
+		key = None
+		if(numpy.ndim(temperature) == 0):
+			key = None if temperature is None else float(temperature)
+			with self._cache_lock:
+				if(key in self._cache):
+					self._cache.move_to_end(key)
+					return(self._cache[key])
+
+		# Evaluate polynomials (Horner)
+		source = self._coefficients
+		delta = self._delta_temperature(temperature)
+		coefficients = numpy.zeros((len(source),) + numpy.shape(delta))
+		delta = numpy.asarray(delta)[numpy.newaxis]
+		for p in source.T[::-1]:
+			coefficients = coefficients * delta + p.reshape(
+				(-1,) + (1,) * (delta.ndim - 1)
+			)
+
+		# Cache unless coefficients replaced during evaluation
+		if(numpy.ndim(temperature) == 0):
+			with self._cache_lock:
+				if(self._coefficients is not source):
+					return(coefficients)
+				self._cache[key] = coefficients
+				while(len(self._cache) > self._cache_size):
+					self._cache.popitem(last=False)
+		return(coefficients)
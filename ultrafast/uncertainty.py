@@ -0,0 +1,175 @@
+"""Ultrafast uncertainty module
+
+This module contains the Monte Carlo propagation of dispersion formula
+coefficient uncertainties to the refractive index and its derivatives, e.g. for
+error bars on the GDD of a compressor design:
+
+	>>> material.covariance = numpy.diag(sigma ** 2)
+	>>> ensemble = ultrafast.uncertainty.Ensemble(material, samples=10000)
+	>>> gdd = ensemble.gvd(omega) * length
+	>>> gdd.std(axis=0)
+
+All sampled coefficient sets are evaluated at once by the vectorized
+RefractiveIndex.info formula kernels of :mod:`ultrafast.core`, returning arrays
+of shape (samples, frequencies).
+
+This file is part of ultrafast. ultrafast is free software: you can
+redistribute it and/or modify it under the terms of the GNU General Public
+License as published by the Free Software Foundation, either version 3 of the
+License, or any later version. ultrafast is distributed in the hope that it
+will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty
+of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General
+Public License for more details. You should have received a copy of the GNU
+General Public License along with ultrafast. If not, see
+<http://www.gnu.org/licenses/>.
+
+Copyright © 2016 Marcelo J P Alcocer
+"""
+
+# Imports
+import numpy
+from .core import UltrafastError, c, wavelength
+from . import core
+
+
+class Ensemble:
+	"""Coefficient ensemble class"""
+
+	material = None
+	"""Nominal material
+
+	:class:`ultrafast.core.RIIDMaterial` whose coefficients are sampled
+	"""
+
+	coefficients = None
+	"""Sampled coefficients
+
+	Array of shape (samples, m) of the sampled dispersion formula coefficients
+	"""
+
+	def __init__(self, material, samples=1000, covariance=None, seed=None):
+		"""Ensemble class init
+
+		:param material:	Nominal material
+		:type material:	:class:`ultrafast.core.RIIDMaterial`
+		:param samples:	Number of coefficient sets
+		:type samples:	int
+		:param covariance:	Coefficient covariance matrix, or standard deviations
+		:type covariance:	array_like
+		:param seed:	Random number generator seed
+		:type seed:	int
+
+		Class describing an ensemble of *samples* coefficient sets drawn from a
+		multivariate normal distribution about the coefficients of the
+		formula-based *material*. *covariance* is either an (m, m) covariance
+		matrix or a length m array of independent standard deviations, and
+		defaults to :attr:`ultrafast.core.RIIDMaterial.covariance`.
+
+		The methods of this class mirror those of
+		:class:`ultrafast.core.Material`, but return arrays of shape (*samples*,)
+		+ shape(*omega*) for one dimensional (or scalar) *omega*.
+		"""
+		if(material.formula not in core._formulas):
+			raise UltrafastError("Ensemble requires a dispersion formula")
+		if(covariance is None):
+			covariance = material.covariance
+		if(covariance is None):
+			raise UltrafastError("No coefficient covariance given")
+		covariance = numpy.asarray(covariance, dtype=float)
+		if(covariance.ndim == 1):
+			covariance = numpy.diag(numpy.power(covariance, 2))
+		m = len(material.coefficients)
+		if(covariance.shape != (m, m)):
+			raise UltrafastError(
+				"Covariance must be of shape ({0}, {0})".format(m)
+			)
+		self.material = material
+		self.coefficients = numpy.random.default_rng(seed).multivariate_normal(
+			material.coefficients, covariance, size=samples
+		)
+		self._kernel = core._formulas[material.formula]
+
+		# Coefficient axis first, sample axis broadcast against frequency
+		self._coefficients = self.coefficients.T[:, :, numpy.newaxis]
+
+	def __len__(self):
+		return(len(self.coefficients))
+
+	def _n(self, omega):
+		"""Ensemble dispersion function
+
+		Evaluates the refractive index of all coefficient sets at the angular
+		frequencies *omega* (last axis), inserting the sample axis before it.
+		"""
+		self.material._assert_frequency(omega)
+		omega = numpy.expand_dims(omega, -2)
+		return(self._kernel(wavelength(omega), self._coefficients))
+
+	def _wavevector(self, omega):
+		"""Ensemble wavevector"""
+		return(numpy.expand_dims(omega, -2) * self._n(omega) / c)
+
+	def _evaluate(self, fun, omega, order=0):
+		"""Evaluate *fun* (or its *order*-th derivative) on (samples, omega)"""
+		omega = numpy.asarray(omega, dtype=float)
+		if(omega.ndim > 1):
+			raise UltrafastError("Angular frequency must be scalar or 1-D")
+		values = fun(numpy.atleast_1d(omega)) if order == 0 else (
+			core._derivative(fun, numpy.atleast_1d(omega), order)
+		)
+		return(values[..., 0] if omega.ndim == 0 else values)
+
+	def n(self, omega):
+		"""Refractive index
+
+		:param omega:	Angular frequency in :math:`rad / fs`
+		:type omega:	float, array_like
+
+		Returns the refractive index of every coefficient set at the angular
+		frequency *omega*
+		"""
+		return(self._evaluate(self._n, omega))
+
+	def wavevector(self, omega):
+		"""Wavevector
+
+		:param omega:	Angular frequency in :math:`rad / fs`
+		:type omega:	float, array_like
+
+		Returns the wavevector (:math:`rad / \\mu m`) of every coefficient set at
+		the angular frequency *omega*
+		"""
+		return(self._evaluate(self._wavevector, omega))
+
+	def group_index(self, omega):
+		"""Group index
+
+		:param omega:	Angular frequency in :math:`rad / fs`
+		:type omega:	float, array_like
+
+		Returns the group index of every coefficient set at the angular frequency
+		*omega*
+		"""
+		return(c * self._evaluate(self._wavevector, omega, 1))
+
+	def gvd(self, omega):
+		"""Group velocity dispersion
+
+		:param omega:	Angular frequency in :math:`rad / fs`
+		:type omega:	float, array_like
+
+		Returns the group velocity dispersion in :math:`fs^2 / \\mu m` of every
+		coefficient set at the angular frequency *omega*
+		"""
+		return(self._evaluate(self._wavevector, omega, 2))
+
+	def tod(self, omega):
+		"""Third order dispersion
+
+		:param omega:	Angular frequency in :math:`rad / fs`
+		:type omega:	float, array_like
+
+		Returns the third order dispersion in :math:`fs^3 / \\mu m` of every
+		coefficient set at the angular frequency *omega*
+		"""
+		return(self._evaluate(self._wavevector, omega, 3))
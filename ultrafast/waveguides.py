@@ -0,0 +1,438 @@
+"""Ultrafast waveguides module
+
+This module contains the dispersion and loss of gas-filled hollow capillary
+waveguides (e.g. for hollow-core fibre pulse compression) according to the
+Marcatili-Schmeltzer model:
+
+	>>> capillary = ultrafast.waveguides.Capillary(ultrafast.air, radius=125)
+	>>> capillary.gvd(omega, pressure=numpy.array([[1e5], [2e5]]))
+
+The gas is described by a :class:`ultrafast.core.Material` (e.g. a formula 6
+"Gases" RefractiveIndex.info entry such as :attr:`ultrafast.core.air`) at
+reference conditions, scaled to the operating pressure and temperature by the
+Lorentz-Lorenz relation for an ideal gas. Frequency, pressure, core radius and
+temperature arguments are broadcast against each other, such that e.g. the GVD
+over a frequency × pressure × radius grid, and the zero dispersion frequency or
+operating pressure over a pressure × radius (or frequency × radius) grid, are
+evaluated in one call.
+
+This file is part of ultrafast. ultrafast is free software: you can
+redistribute it and/or modify it under the terms of the GNU General Public
+License as published by the Free Software Foundation, either version 3 of the
+License, or any later version. ultrafast is distributed in the hope that it
+will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty
+of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General
+Public License for more details. You should have received a copy of the GNU
+General Public License along with ultrafast. If not, see
+<http://www.gnu.org/licenses/>.
+
+Copyright © 2016 Marcelo J P Alcocer
+"""
+
+# Imports
+import numpy
+from scipy.special import jn_zeros
+from .core import Material, UltrafastError, c, pi, wavelength
+from . import core
+
+_zero = 273.15
+"""Zero degrees Celsius in Kelvin"""
+
+_iterations = 200
+"""Maximum number of bisection iterations"""
+
+_steps = {1: 1e-5, 2: 1e-3, 3: 4e-3}
+"""Relative finite difference steps of dispersion, keyed by derivative order
+
+Balance the rounding (about 1e-12 relative, from the gas refractive index) and
+truncation errors of the excess propagation constant (see
+:meth:`Capillary._excess`), such that the GVD carries a noise floor of about
+1e-10 :math:`fs^2 / \\mu m` (against about 1e-7 at the material stencil
+steps, see :data:`ultrafast.core._stencils`).
+"""
+
+
+def _eigenvalue(mode):
+	"""Mode eigenvalue
+
+	Returns the Marcatili-Schmeltzer eigenvalue :math:`u_{nm}` of the *mode*
+	3-tuple (kind, n, m): the m-th zero of :math:`J_{n-1}` for hybrid ``EH``
+	modes, and of :math:`J_1` for ``TE`` and ``TM`` (n = 0) modes.
+	"""
+	kind, n, m = mode
+	if(kind == "EH" and n >= 1 and m >= 1):
+		return(jn_zeros(n - 1, m)[-1])
+	if(kind in ("TE", "TM") and n == 0 and m >= 1):
+		return(jn_zeros(1, m)[-1])
+	raise UltrafastError("Unknown capillary mode: {}{}{}".format(*mode))
+
+
+class Capillary:
+	"""Gas-filled hollow capillary waveguide class"""
+
+	gas = None
+	"""Filling gas at reference conditions (:class:`ultrafast.core.Material`)"""
+
+	radius = None
+	"""Default core radius in :math:`\\mu m`"""
+
+	pressure = None
+	"""Default gas pressure in :math:`Pa`"""
+
+	temperature = None
+	"""Default gas temperature in :math:`°C`"""
+
+	cladding = None
+	"""Cladding material, or constant cladding refractive index"""
+
+	mode = None
+	"""Mode (kind, n, m), e.g. ``("EH", 1, 1)`` for the fundamental mode"""
+
+	reference = None
+	"""Gas reference conditions (pressure in :math:`Pa`, temperature in :math:`°C`)"""
+
+	def __init__(
+		self,
+		gas=None,
+		radius=75.0,
+		pressure=101325.0,
+		temperature=15.0,
+		cladding=1.45,
+		mode=("EH", 1, 1),
+		reference=(101325.0, 15.0),
+		name=None
+	):
+		"""Capillary class init
+
+		:param gas:	Filling gas at reference conditions
+		:type gas:	:class:`ultrafast.core.Material`
+		:param radius:	Core radius in :math:`\\mu m`
+		:type radius:	float
+		:param pressure:	Gas pressure in :math:`Pa`
+		:type pressure:	float
+		:param temperature:	Gas temperature in :math:`°C`
+		:type temperature:	float
+		:param cladding:	Cladding material or refractive index
+		:type cladding:	:class:`ultrafast.core.Material`, float
+		:param mode:	Mode (kind, n, m)
+		:type mode:	tuple
+		:param reference:	Gas reference conditions (pressure, temperature)
+		:type reference:	tuple
+		:param name:	Capillary name
+		:type name:	string
+
+		Class describing a hollow capillary of core *radius*, filled with *gas*
+		(by default :attr:`ultrafast.core.air`) at *pressure* and *temperature*,
+		guiding the *mode* (``EH`` n m, ``TE`` 0 m or ``TM`` 0 m). The gas
+		dispersion describes the gas at the *reference* conditions. *radius*,
+		*pressure* and *temperature* are defaults, and may be overridden per call.
+
+		The propagation constant is given by the Marcatili-Schmeltzer model
+		:math:`\\beta = \\sqrt{k^2 n^2 - u_{nm}^2 / a^2}`, valid for core radii much
+		larger than the wavelength. Frequencies below the mode cutoff return NaN.
+		"""
+		self.gas = core.air if gas is None else gas
+		self.radius = radius
+		self.pressure = pressure
+		self.temperature = temperature
+		self.cladding = cladding
+		self.mode = tuple(mode)
+		self.reference = tuple(reference)
+		self.name = name
+		self._u = _eigenvalue(self.mode)
+
+	def _defaults(self, omega, pressure, radius, temperature):
+		"""Broadcast arguments, substituting defaults for None"""
+		return(numpy.broadcast_arrays(
+			numpy.asarray(omega, dtype=float),
+			numpy.asarray(self.pressure if pressure is None else pressure, dtype=float),
+			numpy.asarray(self.radius if radius is None else radius, dtype=float),
+			numpy.asarray(
+				self.temperature if temperature is None else temperature, dtype=float
+			)
+		))
+
+	def _polarizability(self, omega, pressure, temperature):
+		"""Gas Lorentz-Lorenz polarizability :math:`(n^2 - 1) / (n^2 + 2)`
+		(unchecked)"""
+		n = self.gas._function(omega)
+		density = (
+			(pressure / self.reference[0]) *
+			(self.reference[1] + _zero) / (temperature + _zero)
+		)
+		return(density * (n * n - 1) / (n * n + 2))
+
+	def _n(self, omega, pressure, temperature):
+		"""Gas refractive index (unchecked)"""
+		polarizability = self._polarizability(omega, pressure, temperature)
+		return(numpy.sqrt((1 + 2 * polarizability) / (1 - polarizability)))
+
+	def _beta(self, omega, pressure, radius, temperature):
+		"""Propagation constant (unchecked)"""
+		k = omega * self._n(omega, pressure, temperature) / c
+		with numpy.errstate(invalid="ignore"):
+			return(numpy.sqrt(k * k - numpy.power(self._u / radius, 2)))
+
+	def _excess(self, omega, pressure, radius, temperature):
+		"""Propagation constant in excess of the vacuum wavenumber (unchecked)
+
+		Evaluated as :math:`(k^2 - k_0^2 - (u / a)^2) / (\\beta + k_0)`, with
+		:math:`k^2 - k_0^2` from the polarizability, i.e. without the cancellation
+		of :math:`\\beta - k_0`. Its finite differences are thus about
+		:math:`1 / (n - 1)` times less affected by rounding than those of
+		:meth:`_beta`.
+		"""
+		k0 = omega / c
+		polarizability = self._polarizability(omega, pressure, temperature)
+		return((
+			k0 * k0 * 3 * polarizability / (1 - polarizability) -
+			numpy.power(self._u / radius, 2)
+		) / (self._beta(omega, pressure, radius, temperature) + k0))
+
+	def n(self, omega, pressure=None, temperature=None):
+		"""Gas refractive index
+
+		:param omega:	Angular frequency in :math:`rad / fs`
+		:type omega:	float, array_like
+		:param pressure:	Gas pressure in :math:`Pa`
+		:type pressure:	float, array_like
+		:param temperature:	Gas temperature in :math:`°C`
+		:type temperature:	float, array_like
+
+		Returns the refractive index of the filling gas at *pressure* and
+		*temperature*
+		"""
+		omega, pressure, _, temperature = self._defaults(
+			omega, pressure, None, temperature
+		)
+		self.gas._assert_frequency(omega)
+		return(self._n(omega, pressure, temperature)[()])
+
+	def beta(self, omega, pressure=None, radius=None, temperature=None):
+		"""Propagation constant
+
+		:param omega:	Angular frequency in :math:`rad / fs`
+		:type omega:	float, array_like
+		:param pressure:	Gas pressure in :math:`Pa`
+		:type pressure:	float, array_like
+		:param radius:	Core radius in :math:`\\mu m`
+		:type radius:	float, array_like
+		:param temperature:	Gas temperature in :math:`°C`
+		:type temperature:	float, array_like
+
+		Returns the mode propagation constant (:math:`rad / \\mu m`)
+		"""
+		arguments = self._defaults(omega, pressure, radius, temperature)
+		self.gas._assert_frequency(arguments[0])
+		return(self._beta(*arguments)[()])
+
+	def effective_index(self, omega, pressure=None, radius=None, temperature=None):
+		"""Effective index
+
+		Returns the mode effective index :math:`\\beta c / \\omega`. See
+		:meth:`beta` for arguments.
+		"""
+		omega = numpy.asarray(omega, dtype=float)
+		return(self.beta(omega, pressure, radius, temperature) * c / omega)
+
+	def _dispersion(self, omega, pressure, radius, temperature, order):
+		"""*order*-th angular frequency derivative of the propagation constant"""
+		omega, pressure, radius, temperature = self._defaults(
+			omega, pressure, radius, temperature
+		)
+		offsets, _, _ = core._stencils[order]
+		step = _steps[order]
+		if(omega.size > 0):
+			self.gas._assert_frequency(numpy.array((
+				omega.min() * (1 + min(offsets) * step),
+				omega.max() * (1 + max(offsets) * step)
+			)))
+		derivative = core._derivative(
+			lambda x: self._excess(x, pressure, radius, temperature), omega, order,
+			_steps[order]
+		)
+		if(order == 1):
+			derivative = derivative + 1 / c
+		return(derivative[()])
+
+	def group_index(self, omega, pressure=None, radius=None, temperature=None):
+		"""Group index
+
+		Returns the mode group index (:math:`c \\, d\\beta / d\\omega`). See
+		:meth:`beta` for arguments.
+		"""
+		return(c * self._dispersion(omega, pressure, radius, temperature, 1))
+
+	def gvd(self, omega, pressure=None, radius=None, temperature=None):
+		"""Group velocity dispersion
+
+		Returns the mode group velocity dispersion (:math:`d^2\\beta /
+		d\\omega^2`) in :math:`fs^2 / \\mu m`. See :meth:`beta` for arguments.
+		"""
+		return(self._dispersion(omega, pressure, radius, temperature, 2))
+
+	def tod(self, omega, pressure=None, radius=None, temperature=None):
+		"""Third order dispersion
+
+		Returns the mode third order dispersion (:math:`d^3\\beta / d\\omega^3`)
+		in :math:`fs^3 / \\mu m`. See :meth:`beta` for arguments.
+		"""
+		return(self._dispersion(omega, pressure, radius, temperature, 3))
+
+	def loss(self, omega, radius=None):
+		"""Loss
+
+		:param omega:	Angular frequency in :math:`rad / fs`
+		:type omega:	float, array_like
+		:param radius:	Core radius in :math:`\\mu m`
+		:type radius:	float, array_like
+
+		Returns the mode power attenuation coefficient in :math:`1 / \\mu m`,
+		:math:`2 (u_{nm} / 2 \\pi)^2 \\lambda^2 \\mathrm{Re}(\\nu_n) / a^3`, where
+		:math:`\\nu_n` depends on the cladding permittivity and the mode kind.
+		"""
+		omega, radius = numpy.broadcast_arrays(
+			numpy.asarray(omega, dtype=float),
+			numpy.asarray(self.radius if radius is None else radius, dtype=float)
+		)
+		if(isinstance(self.cladding, Material)):
+			epsilon = numpy.power(self.cladding.n(omega), 2)
+		else:
+			epsilon = numpy.full(omega.shape, self.cladding ** 2)
+		root = numpy.sqrt(epsilon - 1 + 0j)
+		nu = {
+			"EH": (epsilon + 1) / (2 * root),
+			"TE": 1 / root,
+			"TM": epsilon / root,
+		}[self.mode[0]]
+		return((
+			2 * numpy.power(self._u / (2 * pi), 2) *
+			numpy.power(wavelength(omega), 2) * numpy.real(nu) /
+			numpy.power(radius, 3)
+		)[()])
+
+	def zero_dispersion(
+		self,
+		pressure=None,
+		radius=None,
+		temperature=None,
+		num=1024,
+		tolerance=1e-9
+	):
+		"""Zero dispersion frequency
+
+		:param pressure:	Gas pressure in :math:`Pa`
+		:type pressure:	float, array_like
+		:param radius:	Core radius in :math:`\\mu m`
+		:type radius:	float, array_like
+		:param temperature:	Gas temperature in :math:`°C`
+		:type temperature:	float, array_like
+		:param num:	Number of frequency samples
+		:type num:	int
+		:param tolerance:	Relative frequency tolerance
+		:type tolerance:	float
+
+		Returns the lowest angular frequency (:math:`rad / fs`) within the gas
+		frequency range at which the GVD vanishes, or NaN if none. The GVD is
+		sampled at *num* frequencies for all conditions at once, and each zero
+		refined by false position (Illinois), until within the (positive)
+		*tolerance* or the bracket can no longer be split.
+
+		The accuracy is ultimately limited by the noise floor of the finite
+		difference GVD (about 1e-10 :math:`fs^2 / \\mu m`, see :data:`_steps`)
+		divided by the GVD slope, i.e. about 1e-6 relative for a 125
+		:math:`\\mu m` radius capillary of air at 1 bar.
+		"""
+		if(not tolerance > 0):
+			raise UltrafastError("Tolerance must be positive")
+		_, pressure, radius, temperature = self._defaults(
+			0, pressure, radius, temperature
+		)
+		shape = pressure.shape
+		offsets, _, _ = core._stencils[2]
+		margin = 2 * _steps[2] * max(numpy.abs(offsets))
+		low, high = self.gas.range_
+		omega = numpy.geomspace(
+			low * (1 + margin), high * (1 - margin), num
+		).reshape((num,) + (1,) * len(shape))
+		gvd = self.gvd(omega, pressure, radius, temperature)
+		change = numpy.diff(numpy.signbit(gvd), axis=0)
+		found = change.any(axis=0)
+		index = numpy.argmax(change, axis=0)[numpy.newaxis]
+
+		# Bracket and refine (Illinois false position)
+		a = numpy.take_along_axis(omega * numpy.ones(gvd.shape), index, axis=0)[0]
+		b = numpy.take_along_axis(
+			omega * numpy.ones(gvd.shape), index + 1, axis=0
+		)[0]
+		fa = numpy.take_along_axis(gvd, index, axis=0)[0]
+		fb = numpy.take_along_axis(gvd, index + 1, axis=0)[0]
+		side = numpy.zeros(shape, dtype=int)
+		for _ in range(_iterations):
+			if(not numpy.any(found & (b - a > tolerance * b))):
+				break
+			x = numpy.where(found, b - fb * (b - a) / (fb - fa), a)
+			if(numpy.all(~found | (x <= a) | (x >= b))):
+				break
+			x = numpy.clip(x, a, b)
+			fx = self.gvd(x, pressure, radius, temperature)
+			left = numpy.signbit(fx) == numpy.signbit(fa)
+
+			# Halve the retained end value if retained twice in a row
+			fb = numpy.where(left & (side == 1), fb / 2, fb)
+			fa = numpy.where(~left & (side == -1), fa / 2, fa)
+			a, fa = numpy.where(left, x, a), numpy.where(left, fx, fa)
+			b, fb = numpy.where(left, b, x), numpy.where(left, fb, fx)
+			side = numpy.where(left, 1, -1)
+		x = numpy.where(found, b - fb * (b - a) / (fb - fa), numpy.nan)
+		return(x[()])
+
+	def zero_dispersion_pressure(
+		self,
+		omega,
+		radius=None,
+		temperature=None,
+		bounds=(0.0, 1e7),
+		tolerance=1e-9
+	):
+		"""Zero dispersion pressure
+
+		:param omega:	Angular frequency in :math:`rad / fs`
+		:type omega:	float, array_like
+		:param radius:	Core radius in :math:`\\mu m`
+		:type radius:	float, array_like
+		:param temperature:	Gas temperature in :math:`°C`
+		:type temperature:	float, array_like
+		:param bounds:	Pressure search interval in :math:`Pa`
+		:type bounds:	tuple
+		:param tolerance:	Relative pressure tolerance
+		:type tolerance:	float
+
+		Returns the gas pressure (:math:`Pa`) within *bounds* at which the GVD
+		vanishes at the angular frequency *omega*, e.g. to design the operating
+		pressure of a compressor, or NaN if the GVD does not change sign within
+		*bounds*. All arguments are bisected at once, until within the (positive)
+		*tolerance* or the bracket can no longer be split.
+		"""
+		if(not tolerance > 0):
+			raise UltrafastError("Tolerance must be positive")
+		omega, _, radius, temperature = self._defaults(
+			omega, 0, radius, temperature
+		)
+		a = numpy.full(omega.shape, float(bounds[0]))
+		b = numpy.full(omega.shape, float(bounds[1]))
+		fa = self.gvd(omega, a, radius, temperature)
+		found = numpy.signbit(fa) != numpy.signbit(
+			self.gvd(omega, b, radius, temperature)
+		)
+		for _ in range(_iterations):
+			if(not numpy.any(b - a > tolerance * b)):
+				break
+			x = (a + b) / 2
+			if(numpy.all((x == a) | (x == b))):
+				break
+			fx = self.gvd(omega, x, radius, temperature)
+			left = numpy.signbit(fx) == numpy.signbit(fa)
+			a, fa = numpy.where(left, x, a), numpy.where(left, fx, fa)
+			b = numpy.where(left, b, x)
+		return(numpy.where(found, (a + b) / 2, numpy.nan)[()])